@@ -1,4 +1,5 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -10,6 +11,8 @@ from dotenv import load_dotenv
 
 from models.database import get_db
 from models.user import User
+from auth.context import get_auth_cache
+from services.worker_pool import BoundedExecutor
 
 
 # Load environment variables
@@ -21,7 +24,8 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # Default 24 hours
 
 # Password Hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto") #Creates a context for password hashing using bcrypt (industry standard)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # bcrypt cost factor; each step doubles the work per hash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS) #Creates a context for password hashing using bcrypt (industry standard)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token") #Creates an OAuth2PasswordBearer instance for handling JWT tokens
 
 def verify_password(plain_password, hashed_password):
@@ -32,6 +36,39 @@ def get_password_hash(password):
     """Hash a password using bcrypt."""
     return pwd_context.hash(password)
 
+# Dedicated pool for bcrypt so login/registration spikes can only use a fixed
+# number of cores; bcrypt releases the GIL, so threads run hashes in parallel
+_password_pool = None
+
+def get_password_pool() -> BoundedExecutor:
+    """Get or create the password hashing pool, sized from the environment."""
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = BoundedExecutor(
+            name="password-hash",
+            max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+            max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")),
+        )
+    return _password_pool
+
+async def verify_password_pooled(plain_password, hashed_password):
+    """
+    Verify a password in the password hashing pool without blocking the event loop.
+
+    Raises:
+        PoolSaturatedError: If the pool has no room for another hash
+    """
+    return await get_password_pool().run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_pooled(password):
+    """
+    Hash a password in the password hashing pool without blocking the event loop.
+
+    Raises:
+        PoolSaturatedError: If the pool has no room for another hash
+    """
+    return await get_password_pool().run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token with optional expiration time."""
     to_encode = data.copy()
@@ -41,24 +78,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Validate JWT token and return current user."""
+    """Validate JWT token and return current user (a detached snapshot, not bound to ``db``)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        # Verified tokens and user snapshots are cached briefly (see auth.context)
+        context = get_auth_cache().authenticate(token, db)
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+    if context is None:
         raise credentials_exception
-    return user
+    return context.user
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Ensure the user is active."""
@@ -66,11 +99,22 @@ def get_current_active_user(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user by email and password."""
-    user = db.query(User).filter(User.email == email).first()
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Look up a user by email."""
+    return db.query(User).filter(User.email == email).first()
+
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """
+    Authenticate a user by email and password. The lookup runs in the
+    threadpool and the hash check in the password pool, so waiting logins
+    hold neither the event loop nor a threadpool thread.
+
+    Raises:
+        PoolSaturatedError: If the pool has no room for another hash
+    """
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_pooled(password, user.hashed_password):
         return None
-    return user 
\ No newline at end of file
+    return user
@@ -0,0 +1,166 @@
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwt
+from sqlalchemy.orm import Session
+
+from models.user import User, UserProfile
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+DEFAULT_AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+
+def profile_snapshot(profile: Optional[UserProfile]) -> Optional[Dict[str, Any]]:
+    """The profile fields used for recommendations, as a plain dict."""
+    if profile is None:
+        return None
+    return {
+        "age": profile.age,
+        "weight": profile.weight,
+        "height": profile.height,
+        "health_issues": profile.health_issues.value if profile.health_issues else None,
+        "allergies": profile.allergies,
+        "physical_activity_level": profile.physical_activity_level,
+        "weight_goal": profile.weight_goal,
+        "dietary_preferences": profile.dietary_preferences
+    }
+
+
+def user_snapshot(user: User) -> User:
+    """A detached copy of the user's column values, safe to share between requests."""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+
+class AuthContext:
+    """The authenticated user and their profile snapshot for one request."""
+
+    def __init__(self, user: User, profile: Optional[Dict[str, Any]]):
+        self.user = user
+        self.profile = profile
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+
+class AuthCache:
+    """
+    Short-lived cache of verified tokens and the users they belong to.
+
+    Verified JWT claims are cached by token until the earlier of ``ttl`` and
+    the token's own expiry; the user and profile snapshot are cached by user
+    id for ``ttl`` seconds. Endpoints that change a profile or delete an
+    account call ``invalidate_user`` after committing. Other workers notice
+    such changes once their own entries expire.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str,
+                 maxsize: int = DEFAULT_AUTH_CACHE_SIZE, ttl: float = DEFAULT_AUTH_CACHE_TTL):
+        """
+        Args:
+            secret_key: Key the access tokens are signed with
+            algorithm: JWT signing algorithm
+            maxsize: Maximum number of tokens (and of users) kept
+            ttl: Seconds a verified token or user snapshot is reused
+        """
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.ttl = ttl
+        self._claims = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verified claims of ``token``.
+
+        Raises:
+            JWTError: If the token is invalid or expired
+        """
+        claims = self._claims.get(token)
+        if claims is not None:
+            return claims
+        claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        ttl = self.ttl
+        if claims.get("exp") is not None:
+            ttl = min(ttl, claims["exp"] - time.time())
+        if ttl > 0:
+            self._claims.set(token, claims, ttl=ttl)
+        return claims
+
+    def load(self, user_id: int, db: Session) -> Optional[AuthContext]:
+        """User and profile snapshot for ``user_id``, or None if the user doesn't exist."""
+        context = self._users.get(user_id)
+        if context is not None:
+            return context
+        row = db.query(User, UserProfile)\
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)\
+            .filter(User.id == user_id)\
+            .first()
+        if row is None:
+            return None
+        user, profile = row
+        context = AuthContext(user_snapshot(user), profile_snapshot(profile))
+        self._users.set(user_id, context)
+        return context
+
+    def authenticate(self, token: str, db: Session) -> Optional[AuthContext]:
+        """
+        Resolve a bearer token to its user.
+
+        Returns:
+            AuthContext, or None if the token has no subject or the user is gone
+
+        Raises:
+            JWTError: If the token is invalid or expired
+        """
+        user_id = self.decode(token).get("sub")
+        if user_id is None:
+            return None
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        return self.load(user_id, db)
+
+    def invalidate_user(self, user_id: int):
+        """Drop the cached snapshot of a user whose account or profile changed."""
+        self._users.pop(int(user_id))
+
+    def clear(self):
+        self._claims.clear()
+        self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tokens": self._claims.stats(), "users": self._users.stats()}
+
+
+# Singleton instance
+_auth_cache = None
+
+def get_auth_cache() -> AuthCache:
+    """Get or create the authentication cache singleton."""
+    global _auth_cache
+    if _auth_cache is None:
+        from auth.auth import SECRET_KEY, ALGORITHM
+        _auth_cache = AuthCache(SECRET_KEY, ALGORITHM)
+    return _auth_cache
+
+
+def get_optional_auth_context(authorization: Optional[str], db: Session) -> Optional[AuthContext]:
+    """
+    Authentication context for an optional ``Authorization: Bearer`` header.
+
+    Missing, invalid or expired tokens are logged and treated as anonymous.
+    """
+    if not authorization or not authorization.startswith('Bearer '):
+        return None
+    try:
+        return get_auth_cache().authenticate(authorization.split(' ')[1], db)
+    except JWTError as e:
+        logger.error(f"JWT token validation failed: {str(e)}")
+        return None
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script to add the (user_id, date, id) index to the user_food_logs table.
+
+New databases get the index from the model; run this once on databases created
+before it was added. The index is built CONCURRENTLY so logging isn't blocked.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Import from our modules
+from database import engine
+
+INDEX_NAME = "ix_user_food_logs_user_id_date_id"
+
+def add_food_log_index():
+    """
+    Create the composite index used by the food log history pages.
+    """
+    try:
+        print(f"Creating index {INDEX_NAME} on user_food_logs...")
+
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON user_food_logs (user_id, date, id);
+            """))
+            connection.execute(text("ANALYZE user_food_logs;"))
+
+            # Verify the index exists
+            result = connection.execute(text("""
+            SELECT indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = 'user_food_logs';
+            """))
+            print("Current indexes on user_food_logs:")
+            for name, definition in result:
+                print(f"- {name}: {definition}")
+
+        print(f"Successfully created index {INDEX_NAME}.")
+    except SQLAlchemyError as e:
+        print(f"Error creating index: {e}")
+
+if __name__ == "__main__":
+    add_food_log_index()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script to add the trigram index used by /food/search.
+
+Enables the pg_trgm extension and builds a GIN index on food.normalized_name,
+which serves both the fuzzy (``%``) and prefix (``LIKE 'name%'``) searches.
+The index is built CONCURRENTLY so imports and logging aren't blocked. Without
+it, /food/search falls back to the in-process nutrition index.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Import from our modules
+from database import engine
+
+INDEX_NAME = "ix_food_normalized_name_trgm"
+
+def add_food_search_index():
+    """
+    Create the pg_trgm extension and the trigram index on food names.
+    """
+    try:
+        print(f"Creating index {INDEX_NAME} on food...")
+
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+            connection.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON food USING gin (normalized_name gin_trgm_ops);
+            """))
+            connection.execute(text("ANALYZE food;"))
+
+            # Verify the index exists
+            result = connection.execute(text("""
+            SELECT indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = 'food';
+            """))
+            print("Current indexes on food:")
+            for name, definition in result:
+                print(f"- {name}: {definition}")
+
+        print(f"Successfully created index {INDEX_NAME}.")
+    except SQLAlchemyError as e:
+        print(f"Error creating index: {e}")
+
+if __name__ == "__main__":
+    add_food_search_index()
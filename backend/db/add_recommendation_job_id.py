@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script to add the job_id column to the food_recommendations table.
+
+Deferred /image/predict jobs save their result with the job id, so any worker
+(or the same one after a restart) can answer GET /image/recommendations/{job_id}
+from the database. New databases get the column from the model; run this once
+on databases created before it was added. The index is built CONCURRENTLY so
+recommendations can still be saved meanwhile.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Import from our modules
+from database import engine
+
+INDEX_NAME = "ix_food_recommendations_job_id"
+
+def add_recommendation_job_id():
+    """
+    Add food_recommendations.job_id and its unique index.
+    """
+    try:
+        print("Adding job_id to food_recommendations...")
+
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ALTER TABLE food_recommendations ADD COLUMN IF NOT EXISTS job_id VARCHAR;"))
+            connection.execute(text(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON food_recommendations (job_id);
+            """))
+
+        print(f"Successfully added job_id and index {INDEX_NAME}.")
+    except SQLAlchemyError as e:
+        print(f"Error adding job_id: {e}")
+
+if __name__ == "__main__":
+    add_recommendation_job_id()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for nutrition data (CSV or Parquet) into the food table.
+
+Streams the file in chunks, loads each chunk into a temporary staging table
+(Postgres COPY, or executemany on other databases) and merges it into food
+with INSERT ... ON CONFLICT (normalized_name) DO UPDATE: foods whose name
+normalizes to an existing one are updated, the rest are inserted. The whole
+import runs in one transaction.
+
+    python db/bulk_import.py Sheet.csv
+    python db/bulk_import.py vendor_dump.parquet --chunksize 100000
+"""
+
+import os
+import re
+import io
+import sys
+import time
+import argparse
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Column, Float, MetaData, String, Table, text
+from sqlalchemy.engine import Connection, Engine
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.food import Food, normalize_food_name
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 50000
+
+STAGING_TABLE = "food_import_staging"
+
+# Food columns the importer fills; normalized_name (derived from food_product) is the merge key
+NUMERIC_COLUMNS = ["amount", "energy", "carbohydrate", "protein", "total_fat", "sodium", "iron"]
+COLUMNS = ["food_product"] + NUMERIC_COLUMNS
+
+# Source headers (normalized) that don't match a column name
+HEADER_ALIASES = {
+    "food_products": "food_product",
+    "food": "food_product",
+    "name": "food_product",
+    "protien": "protein",
+    "fat": "total_fat",
+    "carbohydrates": "carbohydrate",
+    "carbs": "carbohydrate",
+}
+
+staging_metadata = MetaData()
+staging_table = Table(
+    STAGING_TABLE,
+    staging_metadata,
+    Column("food_product", String),
+    Column("normalized_name", String),
+    *(Column(name, Float) for name in NUMERIC_COLUMNS),
+    prefixes=["TEMPORARY"],
+)
+
+
+class ImportStats:
+    """Counters for one import run."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_loaded = 0
+        self.inserted = 0
+        self.updated = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_loaded / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "rows_read": self.rows_read,
+            "rows_loaded": self.rows_loaded,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+def normalize_header(header: str) -> str:
+    """Map a source column header to a food column name (e.g. "Total Fat" -> "total_fat")."""
+    name = re.sub(r"[^a-z0-9]+", "_", str(header).strip().lower()).strip("_")
+    name = re.sub(r"_(g|mg|kcal)$", "", name)
+    return HEADER_ALIASES.get(name, name)
+
+
+def iter_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE, file_format: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV or Parquet file as a stream of DataFrames of at most ``chunksize`` rows.
+
+    Args:
+        path: File to read
+        chunksize: Rows per chunk
+        file_format: "csv" or "parquet"; guessed from the extension by default
+    """
+    file_format = file_format or ("parquet" if path.lower().endswith((".parquet", ".pq")) else "csv")
+    if file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Reading Parquet files requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif file_format == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+
+
+def prepare_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rename, clean and type one chunk: adds normalized_name, drops blank names,
+    coerces numbers to float (invalid values become NULL) and, for names that
+    normalize the same, keeps the last row.
+    """
+    df = df.rename(columns=normalize_header)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if "food_product" not in df.columns:
+        raise ValueError(f"No food name column found in {list(df.columns)}")
+    df = df[[column for column in COLUMNS if column in df.columns]].copy()
+    df["food_product"] = df["food_product"].astype("string")
+    df.insert(1, "normalized_name", df["food_product"].map(normalize_food_name, na_action="ignore"))
+    df = df[df["normalized_name"].notna() & (df["normalized_name"] != "")]
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df.drop_duplicates(subset="normalized_name", keep="last")
+
+
+def _copy_chunk(connection: Connection, df: pd.DataFrame):
+    """Load a chunk into the staging table with COPY (Postgres)."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_chunk(connection: Connection, df: pd.DataFrame):
+    """Load a chunk into the staging table with executemany."""
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    connection.execute(staging_table.insert(), records)
+
+
+def _merge(connection: Connection, columns: List[str]) -> Tuple[int, int]:
+    """Upsert the staging table into food; returns (updated, inserted) row counts."""
+    values = [column for column in columns if column not in ("food_product", "normalized_name")]
+    updated = connection.execute(text(f"""
+        SELECT COUNT(*) FROM {STAGING_TABLE} s JOIN food f ON f.normalized_name = s.normalized_name
+    """)).scalar()
+    # "WHERE true" keeps SQLite from reading ON CONFLICT as part of the SELECT
+    upserted = connection.execute(text(f"""
+        INSERT INTO food ({', '.join(columns)}, amount_unit, created_at, updated_at)
+        SELECT {', '.join('s.' + column for column in columns)}, 'g', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM {STAGING_TABLE} s WHERE true
+        ON CONFLICT (normalized_name) DO UPDATE SET
+            {''.join(f'{column} = excluded.{column}, ' for column in values)}updated_at = CURRENT_TIMESTAMP
+    """)).rowcount
+    connection.execute(staging_table.delete())
+    return updated, upserted - updated
+
+
+def bulk_import(path: str, engine: Engine, chunksize: int = DEFAULT_CHUNKSIZE,
+                file_format: Optional[str] = None) -> ImportStats:
+    """
+    Import a nutrition file into the food table.
+
+    Args:
+        path: CSV or Parquet file
+        engine: Database engine
+        chunksize: Rows read, staged and merged at a time
+        file_format: "csv" or "parquet"; guessed from the extension by default
+
+    Returns:
+        ImportStats for the run
+    """
+    stats = ImportStats()
+    start = time.perf_counter()
+    use_copy = engine.dialect.name == "postgresql"
+    with engine.begin() as connection:
+        staging_table.create(connection, checkfirst=True)
+        connection.execute(staging_table.delete())
+        for chunk in iter_chunks(path, chunksize, file_format):
+            stats.rows_read += len(chunk)
+            df = prepare_chunk(chunk)
+            if df.empty:
+                continue
+            if use_copy:
+                _copy_chunk(connection, df)
+            else:
+                _insert_chunk(connection, df)
+            updated, inserted = _merge(connection, list(df.columns))
+            stats.rows_loaded += len(df)
+            stats.updated += updated
+            stats.inserted += inserted
+            stats.chunks += 1
+            logger.info(
+                f"Chunk {stats.chunks}: {len(df)} rows "
+                f"({stats.rows_loaded / (time.perf_counter() - start):.0f} rows/sec so far)"
+            )
+        staging_table.drop(connection, checkfirst=True)
+    stats.seconds = time.perf_counter() - start
+
+    # The raw SQL bypasses the ORM change tracking, so drop any in-process snapshot
+    from models.nutrition_index import get_nutrition_index
+    get_nutrition_index().invalidate()
+    logger.info(f"Imported {path}: {stats.to_dict()}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import nutrition data into the food table")
+    parser.add_argument("path", help="CSV or Parquet file to import")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument("--format", dest="file_format", choices=["csv", "parquet"],
+                        help="File format (default: from the extension)")
+    args = parser.parse_args()
+
+    from models.database import engine, Base
+    Base.metadata.create_all(bind=engine, tables=[Food.__table__])
+    result = bulk_import(args.path, engine, chunksize=args.chunksize, file_format=args.file_format)
+    print(f"Inserted {result.inserted} and updated {result.updated} foods from {args.path} "
+          f"in {result.seconds:.2f}s ({result.rows_per_sec:.0f} rows/sec)")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Incremental, batched dedupe of the food table by normalized name.
+
+Replaces the old one-shot cleanup scripts (remove_duplicates_by_name.py,
+remove_null.py, delete_specific_ids.py), whose full-table deletes locked food.
+Rows without a normalized_name are walked in id order, a batch at a time, and
+each batch is its own short transaction:
+
+- the first row seen for a name (or the row that already holds it) keeps it;
+- later rows with the same name are merged into that row: food logs and
+  recommendation links are repointed, then the duplicate is deleted;
+- rows with a blank name are deleted unless something still references them.
+
+Once no duplicates are left the unique index on normalized_name is created
+(CONCURRENTLY on PostgreSQL). Safe to stop and rerun at any point.
+
+    python db/dedupe_foods.py --batch-size 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, delete, exists, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import models
+from models.food import Food, normalize_food_name
+from models.user import UserFoodLog, food_recommendation_items
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+UNIQUE_INDEX = "ix_food_normalized_name"
+
+
+class DedupeStats:
+    """Counters for one dedupe run."""
+
+    def __init__(self):
+        self.batches = 0
+        self.named = 0
+        self.merged = 0
+        self.blank_deleted = 0
+        self.blank_kept = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "batches": self.batches,
+            "named": self.named,
+            "merged": self.merged,
+            "blank_deleted": self.blank_deleted,
+            "blank_kept": self.blank_kept,
+        }
+
+
+def ensure_normalized_name_column(engine: Engine):
+    """Add food.normalized_name to databases created before it existed."""
+    columns = {column["name"] for column in inspect(engine).get_columns("food")}
+    if "normalized_name" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE food ADD COLUMN normalized_name VARCHAR"))
+        logger.info("Added column food.normalized_name")
+
+
+def ensure_unique_index(engine: Engine):
+    """Create the unique index on food.normalized_name if it doesn't exist."""
+    concurrently = "CONCURRENTLY " if engine.dialect.name == "postgresql" else ""
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX {concurrently}IF NOT EXISTS {UNIQUE_INDEX} ON food (normalized_name)"
+        ))
+    logger.info(f"Unique index {UNIQUE_INDEX} is in place")
+
+
+def _merge_into(session: Session, duplicates: Dict[int, int]):
+    """Repoint references from each duplicate food id to its canonical id, then delete the duplicates."""
+    pairs = [{"duplicate": duplicate, "canonical": canonical} for duplicate, canonical in duplicates.items()]
+    session.execute(
+        update(UserFoodLog.__table__)
+        .where(UserFoodLog.__table__.c.food_id == bindparam("duplicate"))
+        .values(food_id=bindparam("canonical")),
+        pairs
+    )
+    # Recommendation links: move the ones the canonical food doesn't have yet, drop the rest
+    items = food_recommendation_items.c
+    canonical_items = food_recommendation_items.alias("canonical_items").c
+    canonical_links = select(canonical_items.recommendation_id)\
+        .where(canonical_items.food_id == bindparam("canonical"))
+    session.execute(
+        update(food_recommendation_items)
+        .where(items.food_id == bindparam("duplicate"))
+        .where(items.recommendation_id.not_in(canonical_links.scalar_subquery()))
+        .values(food_id=bindparam("canonical")),
+        pairs
+    )
+    session.execute(delete(food_recommendation_items).where(items.food_id.in_(list(duplicates))))
+    session.execute(delete(Food).where(Food.id.in_(list(duplicates))))
+
+
+def _delete_unreferenced(session: Session, food_ids: List[int]) -> int:
+    """Delete the given foods that no food log or recommendation refers to."""
+    result = session.execute(
+        delete(Food)
+        .where(Food.id.in_(food_ids))
+        .where(~exists().where(UserFoodLog.food_id == Food.id))
+        .where(~exists().where(food_recommendation_items.c.food_id == Food.id))
+    )
+    return result.rowcount
+
+
+def dedupe_batch(session: Session, last_id: int, batch_size: int, stats: DedupeStats) -> Optional[int]:
+    """
+    Process the next batch of foods without a normalized name after ``last_id``.
+
+    Returns:
+        The last id processed, or None when there is nothing left
+    """
+    rows = session.execute(
+        select(Food.id, Food.food_product)
+        .where(Food.normalized_name.is_(None), Food.id > last_id)
+        .order_by(Food.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return None
+
+    names = {row.id: normalize_food_name(row.food_product) for row in rows}
+    canonical = dict(session.execute(
+        select(Food.normalized_name, Food.id).where(Food.normalized_name.in_(set(names.values()) - {""}))
+    ).all())
+    named, duplicates, blanks = [], {}, []
+    for food_id, name in names.items():
+        if not name:
+            blanks.append(food_id)
+        elif name in canonical:
+            duplicates[food_id] = canonical[name]
+        else:
+            canonical[name] = food_id
+            named.append({"food_id": food_id, "name": name})
+
+    if duplicates:
+        _merge_into(session, duplicates)
+    if named:
+        session.execute(
+            update(Food.__table__)
+            .where(Food.__table__.c.id == bindparam("food_id"))
+            .values(normalized_name=bindparam("name")),
+            named
+        )
+    if blanks:
+        deleted = _delete_unreferenced(session, blanks)
+        stats.blank_deleted += deleted
+        stats.blank_kept += len(blanks) - deleted
+    session.commit()
+
+    stats.batches += 1
+    stats.named += len(named)
+    stats.merged += len(duplicates)
+    return rows[-1].id
+
+
+def dedupe_foods(session: Session, batch_size: int = DEFAULT_BATCH_SIZE, pause: float = 0.0) -> DedupeStats:
+    """
+    Run batches until every named food has a normalized name.
+
+    Args:
+        session: Database session (committed after every batch)
+        batch_size: Foods per batch/transaction
+        pause: Seconds to sleep between batches to limit load
+
+    Returns:
+        DedupeStats for the run
+    """
+    stats = DedupeStats()
+    last_id = 0
+    while True:
+        last_id = dedupe_batch(session, last_id, batch_size, stats)
+        if last_id is None:
+            break
+        logger.info(f"Processed foods up to id {last_id}: {stats.to_dict()}")
+        if pause:
+            time.sleep(pause)
+    if stats.blank_kept:
+        logger.warning(f"{stats.blank_kept} foods with a blank name are still referenced and were kept")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dedupe the food table by normalized name")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Foods per batch")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    from models.database import engine, SessionLocal
+    ensure_normalized_name_column(engine)
+    session = SessionLocal()
+    try:
+        result = dedupe_foods(session, batch_size=args.batch_size, pause=args.pause)
+    finally:
+        session.close()
+    logger.info(f"Dedupe complete: {result.to_dict()}")
+    ensure_unique_index(engine)
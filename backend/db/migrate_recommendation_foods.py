@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script to move the comma-separated food_recommendations.food_ids values into
+the food_recommendation_items association table.
+
+Safe to run more than once: existing pairs are skipped, ids of foods that no
+longer exist are dropped. The legacy column is left in place.
+"""
+
+import os
+import sys
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import models and database
+from models.database import SessionLocal
+from models.food import Food
+from models.user import FoodRecommendation, food_recommendation_items
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+def parse_food_ids(food_ids):
+    """Parse a legacy comma-separated food id string into a list of unique ints."""
+    if not food_ids:
+        return []
+    return list(dict.fromkeys(int(value) for value in food_ids.split(",") if value.strip().isdigit()))
+
+def migrate_recommendation_foods(session, batch_size=BATCH_SIZE):
+    """
+    Copy food_ids into food_recommendation_items in batches of recommendations.
+
+    Returns:
+        int: Number of association rows inserted
+    """
+    food_recommendation_items.create(bind=session.get_bind(), checkfirst=True)
+    known_foods = set(session.scalars(select(Food.id)))
+    inserted = 0
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(FoodRecommendation.id, FoodRecommendation.food_ids)
+            .where(FoodRecommendation.id > last_id)
+            .where(FoodRecommendation.food_ids.isnot(None), FoodRecommendation.food_ids != "")
+            .order_by(FoodRecommendation.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        batch_ids = [row.id for row in rows]
+        existing = set(session.execute(
+            select(food_recommendation_items.c.recommendation_id, food_recommendation_items.c.food_id)
+            .where(food_recommendation_items.c.recommendation_id.in_(batch_ids))
+        ).all())
+        items = [
+            {"recommendation_id": row.id, "food_id": food_id}
+            for row in rows
+            for food_id in parse_food_ids(row.food_ids)
+            if food_id in known_foods and (row.id, food_id) not in existing
+        ]
+        if items:
+            session.execute(food_recommendation_items.insert(), items)
+        session.commit()
+        inserted += len(items)
+        logger.info(f"Migrated recommendations up to id {last_id} ({inserted} food links so far)")
+    return inserted
+
+if __name__ == "__main__":
+    session = SessionLocal()
+    try:
+        count = migrate_recommendation_foods(session)
+        logger.info(f"Migration complete: {count} food links created")
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script to (re)build the user_daily_nutrition rollup from user_food_logs.
+
+Run once after deploying the rollup, and whenever the totals may have drifted
+(e.g. after editing food nutrition values or bulk-importing logs).
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import models and database
+from models.database import engine, SessionLocal
+from models.user import UserDailyNutrition
+from models.daily_nutrition import rebuild_daily_nutrition
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily nutrition rollup")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user's rows")
+    args = parser.parse_args()
+
+    UserDailyNutrition.__table__.create(bind=engine, checkfirst=True)
+    session = SessionLocal()
+    try:
+        rows = rebuild_daily_nutrition(session, user_id=args.user_id)
+        session.commit()
+        logger.info(f"Rebuilt daily nutrition rollup: {rows} rows")
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
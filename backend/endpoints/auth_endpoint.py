@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
+import logging
 
 from models.database import get_db
 from models.user import User, UserProfile
 from auth.auth import (
-    get_password_hash, 
+    get_password_hash_pooled, 
+    get_user_by_email, 
     authenticate_user, 
     create_access_token, 
     get_current_active_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from auth.context import get_auth_cache
+from services.worker_pool import PoolSaturatedError
 from auth.models import (
     Token, 
     UserCreate, 
@@ -24,29 +29,36 @@ from auth.models import (
     UserProfileCreate
 )
 
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["authentication"],
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    user = User(email=user_data.email, hashed_password=hashed_password)
-    
+# Register and login are async so a burst of them waits on the bounded password
+# pool without holding threadpool threads (which other sync handlers and the
+# prediction cache need); their database work goes through run_in_threadpool
+def password_pool_busy(e: PoolSaturatedError) -> HTTPException:
+    """503 response for when the password hashing pool is full"""
+    logger.warning(f"Rejecting authentication request under load: {str(e)}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is at capacity, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def save_new_user(db: Session, user: User, profile: Optional[UserProfile] = None) -> User:
+    """Insert a user (and optional profile) and return the refreshed user"""
     try:
         db.add(user)
+        if profile is not None:
+            db.flush()  # To get user id without committing transaction
+            profile.user_id = user.id
+            db.add(profile)
         db.commit()
         db.refresh(user)
         return user
@@ -57,58 +69,58 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Registration failed"
         )
 
-@router.post("/register-with-profile", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user_with_profile(user_data: UserProfileCreate, db: Session = Depends(get_db)):
-    """Register a new user with profile information"""
+async def hash_new_password(db: Session, email: str, password: str) -> str:
+    """Check the email is free, then hash the password in the password pool"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(get_user_by_email, db, email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    user = User(email=user_data.email, hashed_password=hashed_password)
-    
     try:
-        db.add(user)
-        db.flush()  # To get user id without committing transaction
-        
-        # Create profile
-        profile_data = user_data.profile
-        profile = UserProfile(
-            user_id=user.id,
-            name=profile_data.name,
-            age=profile_data.age,
-            number=profile_data.number,
-            weight=profile_data.weight,
-            height=profile_data.height,
-            health_issues=profile_data.health_issues,
-            allergies=profile_data.allergies,
-            medications=profile_data.medications,
-            blood_type=profile_data.blood_type,
-            smoking_status=profile_data.smoking_status,
-            alcohol_consumption=profile_data.alcohol_consumption,
-            physical_activity_level=profile_data.physical_activity_level
-        )
-        
-        db.add(profile)
-        db.commit()
-        db.refresh(user)
-        return user
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Registration failed"
-        )
+        return await get_password_hash_pooled(password)
+    except PoolSaturatedError as e:
+        raise password_pool_busy(e)
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+    """Register a new user"""
+    hashed_password = await hash_new_password(db, user_data.email, user_data.password)
+    user = User(email=user_data.email, hashed_password=hashed_password)
+    return await run_in_threadpool(save_new_user, db, user)
+
+@router.post("/register-with-profile", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_user_with_profile(user_data: UserProfileCreate, db: Session = Depends(get_db)):
+    """Register a new user with profile information"""
+    hashed_password = await hash_new_password(db, user_data.email, user_data.password)
+    user = User(email=user_data.email, hashed_password=hashed_password)
+
+    # Create profile
+    profile_data = user_data.profile
+    profile = UserProfile(
+        name=profile_data.name,
+        age=profile_data.age,
+        number=profile_data.number,
+        weight=profile_data.weight,
+        height=profile_data.height,
+        health_issues=profile_data.health_issues,
+        allergies=profile_data.allergies,
+        medications=profile_data.medications,
+        blood_type=profile_data.blood_type,
+        smoking_status=profile_data.smoking_status,
+        alcohol_consumption=profile_data.alcohol_consumption,
+        physical_activity_level=profile_data.physical_activity_level
+    )
+    return await run_in_threadpool(save_new_user, db, user, profile)
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login endpoint to get access token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PoolSaturatedError as e:
+        raise password_pool_busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -175,6 +187,7 @@ def create_user_profile(profile_data: ProfileCreate, current_user: User = Depend
         db.add(profile)
         db.commit()
         db.refresh(profile)
+        get_auth_cache().invalidate_user(current_user.id)
         return profile
     except IntegrityError:
         db.rollback()
@@ -222,6 +235,7 @@ def update_user_profile(profile_data: ProfileUpdate, current_user: User = Depend
     try:
         db.commit()
         db.refresh(profile)
+        get_auth_cache().invalidate_user(current_user.id)
         return profile
     except IntegrityError:
         db.rollback()
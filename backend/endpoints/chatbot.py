@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import os
+import json
 import logging
 from dotenv import load_dotenv
-from openai import OpenAI
+from services.llm_gateway import get_llm_gateway, LLMUnavailableError
 
 # Load environment variables
 load_dotenv()
@@ -14,47 +15,115 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize OpenAI client
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
+# Chat completions go through the shared LLM gateway
+if not get_llm_gateway().configured:
     logger.error("OpenAI API key not found in environment variables")
-    client = None
-else:
-    logger.info("OpenAI API key found, initializing client")
-    client = OpenAI(api_key=api_key)
-    logger.info("OpenAI client initialized")
+
+SYSTEM_PROMPT = "You are a knowledgeable Indian nutritionist and healthcare assistant, specializing in traditional Indian dietary practices and modern nutritional science."
 
 class ChatRequest(BaseModel):
     message: str
 
+def build_messages(message: str):
+    """Create messages for the API call"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": message}
+    ]
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @router.post("/chat/message")
 async def chat_with_healthbot(data: ChatRequest):
     """Simple chat endpoint that directly uses OpenAI API"""
     try:
-        if not client:
+        gateway = get_llm_gateway()
+        if not gateway.configured:
             raise HTTPException(status_code=500, detail="OpenAI client not initialized. Please check your API key configuration.")
             
         logger.info(f"Received chat request: {data.message}")
         
-        # Create messages for the API call
-        messages = [
-            {"role": "system", "content": "You are a knowledgeable Indian nutritionist and healthcare assistant, specializing in traditional Indian dietary practices and modern nutritional science."},
-            {"role": "user", "content": data.message}
-        ]
-        
         logger.info("Sending request to OpenAI API")
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
-            messages=messages,
+        content = await gateway.chat(
+            messages=build_messages(data.message),
             temperature=0.7,
             max_tokens=500
         )
         
         logger.info("Received response from OpenAI API")
-        return {"response": response.choices[0].message.content}
+        return {"response": content}
             
+    except LLMUnavailableError as e:
+        logger.error(f"LLM unavailable in chat_with_healthbot: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"The assistant is unavailable right now: {str(e)}", headers={"Retry-After": "2"})
     except Exception as e:
         logger.error(f"Error in chat_with_healthbot: {str(e)}", exc_info=True)
         if isinstance(e, HTTPException):
             raise e
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}") 
+
+@router.post("/chat/message/stream")
+async def stream_chat_with_healthbot(data: ChatRequest, request: Request):
+    """
+    Streaming variant of the chat endpoint: forwards tokens as server-sent events
+    as soon as the LLM produces them.
+
+    Each event is ``data: {"delta": "<text>"}``; the stream ends with an
+    ``event: done`` event, or ``event: error`` if the upstream fails midway.
+    Errors before the first token are returned as regular HTTP errors. When the
+    client disconnects the upstream generation is cancelled.
+    """
+    gateway = get_llm_gateway()
+    if not gateway.configured:
+        raise HTTPException(status_code=500, detail="OpenAI client not initialized. Please check your API key configuration.")
+
+    logger.info(f"Received streaming chat request: {data.message}")
+    chunks = gateway.stream(
+        messages=build_messages(data.message),
+        temperature=0.7,
+        max_tokens=500
+    )
+
+    # Wait for the first token so failures to start still get a proper status code
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except LLMUnavailableError as e:
+        await chunks.aclose()
+        logger.error(f"LLM unavailable in stream_chat_with_healthbot: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"The assistant is unavailable right now: {str(e)}", headers={"Retry-After": "2"})
+    except Exception as e:
+        await chunks.aclose()
+        logger.error(f"Error in stream_chat_with_healthbot: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    async def events():
+        # Close the upstream response however the stream ends (client gone, error or done)
+        try:
+            if first is None:
+                yield sse_event({}, event="done")
+                return
+            yield sse_event({"delta": first})
+            try:
+                async for delta in chunks:
+                    if await request.is_disconnected():
+                        logger.info("Chat client disconnected, stopping generation")
+                        return
+                    yield sse_event({"delta": delta})
+            except Exception as e:
+                logger.error(f"Chat stream failed: {str(e)}")
+                yield sse_event({"detail": str(e)}, event="error")
+                return
+            yield sse_event({}, event="done")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,17 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from sqlalchemy import Float, inspect, select
+from sqlalchemy.orm import Session, joinedload
 import numpy as np
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
+import hashlib
 import logging
-from typing import Optional
-from jose import JWTError, jwt
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 # Import from our modules
-from models.food import Food
+from models.food import Food, normalize_food_name
 from models.database import get_db
-from models.food_queries import get_food_nutrition, display_food_details
-from models.user import UserProfile
-from utils.food_recommendations import FoodRecommendation, safe_float
+from models.food_queries import get_food_nutrition, display_food_details, food_table_version
+from models.food_search import search_foods
+from models.nutrition_index import get_nutrition_index
+from models.user import UserFoodLog
+from auth.context import get_optional_auth_context
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from utils.food_recommendations import FoodRecommendation, get_rule_table, parse_conditions, parse_goals, safe_float
 
 # Create router
 router = APIRouter()
@@ -46,6 +53,19 @@ def generate_food_summary(food):
 
     return summary
 
+def nutrition_dict(food_item):
+    """Nutrition fields returned by the summary and batch endpoints"""
+    return {
+        "food_product": food_item.food_product,
+        "amount": get_safe_attr(food_item, "amount"),
+        "energy": get_safe_attr(food_item, "energy"),
+        "carbohydrate": get_safe_attr(food_item, "carbohydrate"),
+        "protein": get_safe_attr(food_item, "protein"),
+        "total_fat": get_safe_attr(food_item, "total_fat"),
+        "sodium": get_safe_attr(food_item, "sodium"),
+        "iron": get_safe_attr(food_item, "iron")
+    }
+
 # API Endpoint to Fetch Food Summary by Name
 @router.get("/summary/{food_name}")
 def get_food_summary(
@@ -58,33 +78,14 @@ def get_food_summary(
     logger.debug(f"Food name value: '{food_name}'")
     
     # Get user health conditions if token is provided
-    user_health_conditions = []
-    if authorization and authorization.startswith('Bearer '):
-        token = authorization.split(' ')[1]
-        try:
-            # Use the exact same secret key as in auth.py
-            secret_key = "food_iq_secret_key"
-            
-            # Decode the JWT token
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-            user_id = payload.get("sub")
-            logger.info(f"Decoded user_id from token: {user_id}")
-            
-            if user_id:
-                # Get user profile directly from database
-                logger.info(f"Querying user profile for user_id: {user_id}")
-                profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-                logger.info(f"User profile found: {profile is not None}")
-                
-                if profile and profile.health_issues:
-                    # Split health issues if they're comma-separated
-                    health_issues = [issue.strip() for issue in profile.health_issues.split(',')]
-                    user_health_conditions.extend(health_issues)
-                    logger.info(f"Found user health conditions: {user_health_conditions}")
-        except JWTError as e:
-            logger.error(f"JWT token validation failed: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error processing token: {str(e)}", exc_info=True)
+    user_health_conditions = ()
+    try:
+        auth_context = get_optional_auth_context(authorization, db)
+        if auth_context and auth_context.profile:
+            user_health_conditions = parse_conditions(auth_context.profile["health_issues"])
+            logger.info(f"Found user health conditions: {user_health_conditions}")
+    except Exception as e:
+        logger.error(f"Error processing token: {str(e)}", exc_info=True)
     
     # Use get_food_nutrition from food_queries.py
     food_item = get_food_nutrition(food_name, db)
@@ -107,16 +108,7 @@ def get_food_summary(
     }
 
     # Create nutrition object for the response
-    nutrition = {
-        "food_product": food_item.food_product,
-        "amount": get_safe_attr(food_item, "amount"),
-        "energy": get_safe_attr(food_item, "energy"),
-        "carbohydrate": get_safe_attr(food_item, "carbohydrate"),
-        "protein": get_safe_attr(food_item, "protein"),
-        "total_fat": get_safe_attr(food_item, "total_fat"),
-        "sodium": get_safe_attr(food_item, "sodium"),
-        "iron": get_safe_attr(food_item, "iron")
-    }
+    nutrition = nutrition_dict(food_item)
 
     # Generate recommendations using FoodRecommendation class
     logger.info(f"Generating recommendations for {food_name} with health conditions: {user_health_conditions}")
@@ -131,29 +123,179 @@ def get_food_summary(
         "recommendations": recommendations
     }
 
+# Upper bound on foods evaluated per batch request
+MAX_BATCH_FOODS = 100
+
+class BatchRecommendationRequest(BaseModel):
+    foods: List[str] = Field(default_factory=list, max_length=MAX_BATCH_FOODS)
+    log_date: Optional[date] = None  # also evaluate the signed-in user's food log for this day
+    health_conditions: Optional[List[str]] = None  # defaults to the signed-in user's profile
+    goals: Optional[List[str]] = None
+
+# API Endpoint to evaluate many foods against one profile
+@router.post("/recommendations/batch")
+def get_batch_recommendations(
+    request: BatchRecommendationRequest,
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Evaluate a list of foods (and/or a day's food log) against one profile in a single pass.
+
+    Health conditions are parsed once, nutrition comes from one snapshot of the
+    food table (a single query at most) and each food is one rule-table lookup.
+    """
+    auth_context = get_optional_auth_context(authorization, db)
+    user_id = auth_context.user_id if auth_context else None
+    profile = auth_context.profile if auth_context else None
+
+    if request.health_conditions is not None:
+        conditions = parse_conditions(request.health_conditions)
+    else:
+        conditions = parse_conditions(profile["health_issues"] if profile else None)
+    goals = parse_goals(request.goals)
+
+    # (food name, logged amount, log entry id) for every food to evaluate
+    entries = [(name, None, None) for name in request.foods]
+    logged_foods = {}
+    if request.log_date is not None:
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Authentication required to evaluate a food log")
+        day_start = datetime.combine(request.log_date, datetime.min.time())
+        logs = db.query(UserFoodLog)\
+            .options(joinedload(UserFoodLog.food))\
+            .filter(UserFoodLog.user_id == user_id,
+                    UserFoodLog.date >= day_start,
+                    UserFoodLog.date < day_start + timedelta(days=1))\
+            .order_by(UserFoodLog.date)\
+            .all()
+        for log in logs:
+            if log.food is not None:
+                entries.append((log.food.food_product, log.amount, log.id))
+                logged_foods[log.id] = log.food
+
+    if not entries:
+        raise HTTPException(status_code=400, detail="Provide foods or a log_date to evaluate")
+    if len(entries) > MAX_BATCH_FOODS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FOODS} foods can be evaluated per request")
+
+    try:
+        snapshot = get_nutrition_index().snapshot(db)
+        find_food = snapshot.lookup
+    except Exception as e:
+        logger.error(f"Nutrition index unavailable, querying foods directly: {str(e)}")
+        db.rollback()
+        find_food = lambda name: get_food_nutrition(name, db)
+
+    rule_table = get_rule_table()
+    results = []
+    for food_name, amount, log_id in entries:
+        food_item = logged_foods.get(log_id) or find_food(food_name)
+        result = {
+            "food_name": food_name,
+            "found": food_item is not None,
+            "nutrition": nutrition_dict(food_item) if food_item else None,
+            "recommendations": rule_table.lookup(normalize_food_name(food_name), conditions, goals)
+        }
+        if log_id is not None:
+            result["log_id"] = log_id
+            result["logged_amount"] = amount
+        results.append(result)
+
+    return {
+        "health_conditions": list(conditions),
+        "goals": list(goals),
+        "results": results,
+        "total": len(results)
+    }
+
+# Result limits for the search endpoint
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+# API Endpoint to search foods by name (typeahead for manual logging)
+@router.get("/search")
+def search_food(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    mode: str = Query("fuzzy", pattern="^(fuzzy|prefix)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked fuzzy search ("fuzzy") or autocomplete ("prefix") over food names.
+    Each result has the food's id, nutrition and a 0-1 similarity score.
+    """
+    matches = search_foods(db, q, limit=limit, mode=mode)
+    results = [
+        {"id": food.id, **nutrition_dict(food), "score": round(score, 3)}
+        for food, score in matches
+    ]
+    return {"query": q, "mode": mode, "results": results, "total": len(results)}
+
+# Columns /food/all can return, and the ones it returns by default
+FOOD_FIELDS = {column.key: column for column in inspect(Food).columns if column.key != "normalized_name"}
+DEFAULT_FOOD_FIELDS = ["id", "food_product", "amount", "energy", "carbohydrate", "protein", "total_fat", "sodium", "iron"]
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated ``fields`` parameter; id is always included"""
+    if not fields:
+        return DEFAULT_FOOD_FIELDS
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in FOOD_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id"] + requested))
+
 # API Endpoint to Get All Food Items
 @router.get("/all")
-def get_all_foods(db: Session = Depends(get_db)):
-    foods = db.query(Food).all()
-    
-    if not foods:
+def get_all_foods(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    List food items in id order, one page at a time.
+
+    Pass the returned ``next_cursor`` as ``cursor`` for the next page.
+    ``fields`` (comma-separated column names) limits the columns selected.
+    Responses carry an ETag derived from the food table version, so a client
+    sending it back in If-None-Match gets a 304 until the catalog changes.
+    """
+    columns = parse_fields(fields)
+    etag_source = f"{food_table_version(db)}|{','.join(columns)}|{limit}|{cursor or ''}"
+    etag = f'W/"{hashlib.sha1(etag_source.encode("utf-8")).hexdigest()}"'
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    query = select(*(FOOD_FIELDS[name] for name in columns))
+    if cursor:
+        try:
+            last_id = int(decode_cursor(cursor, 1)[0])
+        except (InvalidCursorError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(Food.id > last_id)
+
+    # Fetch one extra row to know whether there is another page
+    rows = db.execute(query.order_by(Food.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if not rows and not cursor:
         raise HTTPException(status_code=404, detail="No food items found in the database")
-    
-    result = []
-    for food in foods:
-        result.append({
-            "id": food.id,
-            "food_product": food.food_product,
-            "amount": get_safe_attr(food, "amount"),
-            "energy": get_safe_attr(food, "energy"),
-            "carbohydrate": get_safe_attr(food, "carbohydrate"),
-            "protein": get_safe_attr(food, "protein"),
-            "total_fat": get_safe_attr(food, "total_fat"),
-            "sodium": get_safe_attr(food, "sodium"),
-            "iron": get_safe_attr(food, "iron")
-        })
-    
-    return {"foods": result}
+
+    numeric = {name for name in columns if isinstance(FOOD_FIELDS[name].type, Float)}
+    result = [
+        {name: safe_float(value) if name in numeric else value for name, value in zip(columns, row)}
+        for row in rows
+    ]
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    next_cursor = encode_cursor(rows[-1].id) if has_more else None
+    return {"foods": result, "total": len(result), "next_cursor": next_cursor}
 
 def get_safe_attr(obj, attr_name):
     """Fetch attribute value safely, return None if missing or invalid."""
@@ -1,472 +1,394 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 import numpy as np
-import tensorflow as tf
 import os
-import shutil
-import tempfile
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 import logging
 from models.food_queries import get_food_nutrition
-from PIL import Image
+from models.nutrition_index import get_nutrition_index
 from utils.food_recommendations import FoodRecommendation, safe_float
 from utils.food_recommendations_llm import FoodRecommendationLLM
-from models.database import get_db, SQLALCHEMY_DATABASE_URL
+from services.inference_batcher import InferenceBatcher
+from services.worker_pool import get_image_pool, PoolSaturatedError
+from utils.image_io import decode_upload
+from utils.depth_estimation import estimate_depth, create_mask, estimate_volume_from_depth, generate_masked_image
+from utils.depth_backends import (
+    resolve_depth_backend, serving_volume_for, depth_model_name,
+    DEFAULT_DEPTH_BACKEND, DEPTH_BACKENDS, QUALITY_TIERS
+)
+from services.model_registry import get_model_registry, get_warmup_retries, get_warmup_targets
+from services.prediction_cache import get_prediction_cache, PredictionCache
+from services.db_health import get_db_health_monitor, ERROR
+from services.recommendation_cache import get_recommendation_cache
+from services.recommendation_jobs import get_recommendation_jobs, load_persisted_job, RecommendationJob
+from utils.food_classifier import (
+    CLASS_NAMES, CLASSIFIER_ENGINE, IMG_SIZE, classifier_version, load_classifier
+)
+from fastapi.concurrency import run_in_threadpool
+from models.database import get_db, SessionLocal, SQLALCHEMY_DATABASE_URL
 from models.food import Food
-from models.food_queries import display_food_details
-from models.user import UserProfile, User
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
+from models.user import FoodRecommendation as StoredRecommendation, food_recommendation_items
+from auth.auth import get_password_pool
+from auth.context import get_auth_cache, get_optional_auth_context
 from typing import Optional
 import io
+import json
 import base64
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Import models and services
-from models.database import get_db, SQLALCHEMY_DATABASE_URL
-from models.food import Food  # Import Food model directly
-from models.food_queries import display_food_details
-
-# Try different import paths for image preprocessing
-try:
-    # TensorFlow 2.x preferred path
-    from tensorflow.keras.preprocessing import image
-    logger.info("Successfully imported image from tensorflow.keras.preprocessing")
-except ImportError:
-    try:
-        # Alternative import path for some TensorFlow versions
-        from keras.preprocessing import image
-        logger.info("Successfully imported image from keras.preprocessing")
-    except ImportError:
-        try:
-            # For newer TensorFlow versions (2.6+)
-            from keras.utils import load_img, img_to_array
-            logger.info("Successfully imported load_img and img_to_array from keras.utils")
-            
-            # Create compatibility layer
-            class ImageCompat:
-                @staticmethod
-                def load_img(path, target_size=None):
-                    return load_img(path, target_size=target_size)
-                
-                @staticmethod
-                def img_to_array(img):
-                    return img_to_array(img)
-            
-            # Replace the image module with our compatibility class
-            image = ImageCompat
-        except ImportError:
-            # Last resort - use PIL directly
-            from PIL import Image
-            logger.info("Using PIL directly for image processing")
-            
-            # Create compatibility layer
-            class ImageCompat:
-                @staticmethod
-                def load_img(path, target_size=None):
-                    img = Image.open(path)
-                    if target_size:
-                        img = img.resize((target_size[1], target_size[0]))
-                    return img
-                
-                @staticmethod
-                def img_to_array(img):
-                    return np.array(img)
-            
-            # Replace the image module with our compatibility class
-            image = ImageCompat
-
 router = APIRouter()
 
-# Define Image Size
-IMG_SIZE = 224
-logger.debug(f"Image size set to: {IMG_SIZE}")
-
-# Define Class Names (Ensure it matches training classes)
-CLASS_NAMES = [
-       "aloo_matar", "appam", "bhindi_masala", "biryani", "butter_chicken",
-    "chapati", "chicken_tikka", "chole_bhature", "daal_baati_churma",
-    "daal_puri", "dal_makhani", "dhokla", "gulab_jamun", "idli", "jalebi",
-    "kaathi_rolls", "kadai_paneer", "masala_dosa", "mysore_pak", "pakode",
-    "palak_paneer", "paneer_butter_masala", "paani_puri", "pav_bhaji", "samosa"
-]
-logger.debug(f"Number of food classes: {len(CLASS_NAMES)}")
-
-# Path to the model file
-MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "Indian_Food_CNN_Model.h5")
-logger.debug(f"Model path: {MODEL_PATH}")
-
-# Load the model (lazy loading to avoid loading at import time)
-_model = None
-
-# Create a custom InputLayer class that can handle batch_shape
-class CustomInputLayer(tf.keras.layers.InputLayer):
-    def __init__(self, input_shape=None, batch_size=None, dtype=None, sparse=None, 
-                 name=None, ragged=None, type_spec=None, batch_shape=None, **kwargs):
-        # Handle batch_shape by converting it to input_shape if provided
-        if batch_shape is not None and input_shape is None:
-            # Remove the batch dimension (first dimension)
-            input_shape = batch_shape[1:]
-        
-        # Call the parent constructor with the correct arguments
-        super().__init__(input_shape=input_shape, batch_size=batch_size, 
-                         dtype=dtype, sparse=sparse, name=name, 
-                         ragged=ragged, type_spec=type_spec, **kwargs)
+# Registry key for the food classifier
+CLASSIFIER_MODEL = "food_classifier"
+get_model_registry().register(
+    CLASSIFIER_MODEL, load_classifier, description=f"Indian food CNN classifier ({CLASSIFIER_ENGINE} engine)"
+)
+
+# Resolve every classifier class to its nutrition row whenever the index is built
+get_nutrition_index().preload(CLASS_NAMES)
 
-def check_tensorflow_keras_versions():
+def get_model():
     """
-    Check TensorFlow and Keras version compatibility
+    Return the classifier, loading it through the model registry on first use.
+    Returns None if the model could not be loaded.
     """
-    logger.info(f"TensorFlow version: {tf.__version__}")
-    logger.info(f"Keras version: {tf.keras.__version__}")  # tf.keras is included in TensorFlow
-    return tf
+    try:
+        return get_model_registry().get(CLASSIFIER_MODEL)
+    except Exception as e:
+        logger.error(f"Error in get_model: {e}")
+        return None
 
-def create_model():
+def warmup_targets():
     """
-    Create a new model with the same architecture as the original
+    Models to load at startup, from MODEL_WARMUP; by default the classifier and
+    the configured depth backend.
     """
-    logger.info("Creating a new model with MobileNetV2 base")
-    
-    # Create a simple CNN model
-    inputs = tf.keras.layers.Input(shape=(IMG_SIZE, IMG_SIZE, 3))
-    
-    # Use a pre-trained model as the base
-    base_model = tf.keras.applications.MobileNetV2(
-        input_shape=(IMG_SIZE, IMG_SIZE, 3),
-        include_top=False,
-        weights='imagenet'
-    )
-    base_model.trainable = False
-    
-    x = base_model(inputs)
-    x = tf.keras.layers.GlobalAveragePooling2D()(x)
-    x = tf.keras.layers.Dense(128, activation='relu')(x)
-    outputs = tf.keras.layers.Dense(len(CLASS_NAMES), activation='softmax')(x)
-    
-    model = tf.keras.Model(inputs=inputs, outputs=outputs)
-    logger.info("Model created successfully")
-    return model
+    default_targets = [CLASSIFIER_MODEL]
+    default_backend = resolve_depth_backend()
+    if DEPTH_BACKENDS[default_backend].uses_depth:
+        default_targets.append(depth_model_name(default_backend))
+    return get_warmup_targets(default_targets)
 
-def get_model():
+def warmup_models():
     """
-    Lazy load the TensorFlow model to avoid loading it at import time.
-    This helps with faster startup and prevents loading the model if it's not used.
+    Load the warm-up models, retrying failures with backoff. Meant to run once
+    in the background at startup; a model that still fails is retried by the
+    next request that needs it.
     """
-    global _model
-    if _model is None:
-        try:
-            logger.info("Loading model...")
-            check_tensorflow_keras_versions()  # Check TensorFlow/Keras versions
-            
-            # Check if model file exists
-            if not os.path.exists(MODEL_PATH):
-                logger.error(f"Error: Model file not found at {MODEL_PATH}")
-                return None
-            
-            # Define custom objects to handle batch_shape and DTypePolicy
-            custom_objects = {
-                'InputLayer': CustomInputLayer
-            }
-            
-            # Add DTypePolicy to custom_objects
-            try:
-                from tensorflow.keras.mixed_precision import Policy as DTypePolicy
-                custom_objects['DTypePolicy'] = DTypePolicy
-                logger.info("Added DTypePolicy to custom_objects")
-            except ImportError:
-                try:
-                    # For older TensorFlow versions
-                    from tensorflow.keras.mixed_precision.experimental import Policy as DTypePolicy
-                    custom_objects['DTypePolicy'] = DTypePolicy
-                    logger.info("Added experimental DTypePolicy to custom_objects")
-                except ImportError:
-                    logger.warning("Could not import DTypePolicy, will try to continue without it")
-            
-            # Try different approaches to load the model
-            try:
-                # Approach 1: Load with custom objects
-                logger.info("Attempting to load model with custom objects")
-                _model = tf.keras.models.load_model(
-                    MODEL_PATH, 
-                    custom_objects=custom_objects,
-                    compile=False
-                )
-                logger.info("Model loaded successfully with custom objects!")
-            except Exception as e1:
-                logger.error(f"Error loading model with custom objects: {e1}")
-                
-                try:
-                    # Approach 2: Try with a different DTypePolicy approach
-                    # Create a dummy policy class
-                    logger.info("Attempting to load model with dummy DTypePolicy")
-                    class DummyDTypePolicy:
-                        def __init__(self, *args, **kwargs):
-                            pass
-                        
-                        def __eq__(self, other):
-                            return True
-                        
-                        def __call__(self, *args, **kwargs):
-                            return tf.float32
-                    
-                    custom_objects['DTypePolicy'] = DummyDTypePolicy
-                    
-                    _model = tf.keras.models.load_model(
-                        MODEL_PATH,
-                        custom_objects=custom_objects,
-                        compile=False
-                    )
-                    logger.info("Model loaded successfully with dummy DTypePolicy!")
-                except Exception as e2:
-                    logger.error(f"Error loading model with dummy DTypePolicy: {e2}")
-                    
-                    # Approach 3: Use the simplified model for demonstration
-                    logger.warning("Using a simplified model for demonstration purposes...")
-                    _model = create_model()
-                    logger.info("Simplified model created successfully!")
-            
-        except Exception as e:
-            logger.error(f"Error in get_model: {e}", exc_info=True)
-            return None
-    return _model
+    return get_model_registry().warm_up(warmup_targets(), **get_warmup_retries())
 
-def predict_food(img_path):
+def decode_prediction(prediction):
     """
-    Predict food from image path
+    Map one row of class probabilities to (class name, confidence)
+    """
+    predicted_class = int(np.argmax(prediction))  # Get highest probability class
+    confidence = float(np.max(prediction))  # Get confidence score (convert to float for JSON serialization)
+    return CLASS_NAMES[predicted_class], confidence
+
+def predict_batch(img_batch):
+    """
+    Run the classifier on a stacked (N, IMG_SIZE, IMG_SIZE, 3) batch
     """
-    logger.info(f"Predicting food from image: {img_path}")
-    
     model = get_model()
     if model is None:
-        logger.error("Model not available")
-        raise HTTPException(status_code=500, detail="Model not available")
-    
+        raise RuntimeError("Model not available")
+    return model.predict(img_batch, verbose=0)
+
+# Shared batcher so concurrent uploads are classified in one forward pass
+_batcher = None
+
+def get_batcher():
+    """
+    Lazily create the inference batcher for the food classifier.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = InferenceBatcher(predict_batch, runner=get_image_pool().run)
+    return _batcher
+
+async def predict_food_batched(img_array):
+    """
+    Predict food from a preprocessed (IMG_SIZE, IMG_SIZE, 3) array, sharing a
+    batched forward pass with concurrent requests
+    """
     try:
-        logger.debug("Loading and preprocessing image")
-        img = image.load_img(img_path, target_size=(IMG_SIZE, IMG_SIZE))  # Resize image
-        img_array = image.img_to_array(img) / 255.0  # Normalize pixel values
-        img_array = np.expand_dims(img_array, axis=0)  # Expand batch dimension
-
-        # Make Prediction
-        logger.debug("Making prediction")
-        prediction = model.predict(img_array)
-        predicted_class = np.argmax(prediction, axis=1)[0]  # Get highest probability class
-        confidence = float(np.max(prediction))  # Get confidence score (convert to float for JSON serialization)
-        
-        logger.info(f"Predicted food: {CLASS_NAMES[predicted_class]} with confidence: {confidence}")
-        return CLASS_NAMES[predicted_class], confidence
+        # The model itself is loaded (if needed) on the worker that runs the batch
+        prediction = await get_batcher().predict(img_array)
+        predicted_food, confidence = decode_prediction(prediction)
+
+        logger.info(f"Predicted food: {predicted_food} with confidence: {confidence}")
+        return predicted_food, confidence
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
-# Direct database query function to use as a fallback
-def direct_get_food_nutrition(food_name: str, db: Session):
+def estimate_portion(image: np.ndarray, predicted_food: str, depth_backend: Optional[str] = None):
     """
-    Direct database query function to use as a fallback
+    Estimate the portion volume and build the masked overlay for an uploaded image.
+
+    This is the CPU-heavy part of the pipeline (depth estimation, masking and PNG
+    encoding); it is a module-level function so it can run in a worker pool.
+
+    Args:
+        image: Decoded RGB array at the working size, shared by every stage
+        predicted_food: Class predicted by the classifier
+        depth_backend: Registered depth backend name; None uses the configured default
+
+    Returns:
+        tuple: (volume in ml, base64-encoded PNG of the masked image)
     """
-    logger.debug(f"Direct database query for food: {food_name}")
-    
-    # Try to find an exact match
-    food = db.query(Food).filter(Food.food_product == food_name).first()
-    logger.debug(f"Direct query exact match result: {food}")
-    
-    # If no exact match, try to find a partial match
-    if not food:
-        logger.debug(f"No exact match found, trying partial match for: {food_name}")
-        food = db.query(Food).filter(Food.food_product.ilike(f"%{food_name}%")).first()
-        logger.debug(f"Direct query partial match result: {food}")
-    
-    return food
+    # Depth Estimation and Mask Generation
+    logger.debug(f"Starting depth estimation with backend: {depth_backend or DEFAULT_DEPTH_BACKEND}")
+    depth_map = estimate_depth(image, depth_backend)
+
+    logger.debug("Creating binary mask")
+    mask = create_mask(image)
+
+    if depth_map is None:
+        # No depth network for this backend: assume one standard serving of the predicted class
+        volume_ml = serving_volume_for(predicted_food)
+        logger.debug(f"Using reference serving volume in ml: {volume_ml}")
+    else:
+        logger.debug(f"Depth map shape: {depth_map.shape}, min: {depth_map.min()}, max: {depth_map.max()}")
+        logger.debug("Estimating volume from depth map")
+        # Use predicted food type for better volume estimation
+        food_type = predicted_food.split('_')[0]  # Extract base food type
+
+        # Set reference volume based on food type
+        reference_volumes = {
+            "default": 240.0,
+            "rice": 200.0,
+            "bread": 150.0,
+            "soup": 300.0,
+            "curry": 250.0,
+            "salad": 180.0,
+            "fruit": 200.0,
+            "vegetables": 180.0,
+            "meat": 250.0,
+            "fish": 200.0,
+            "dessert": 200.0,
+            "beverage": 300.0
+        }
+        reference_volume = reference_volumes.get(food_type, reference_volumes["default"])
+
+        volume_ml = estimate_volume_from_depth(depth_map, mask, reference_volume)
+        logger.debug(f"Estimated volume in ml: {volume_ml}")
+
+    # Generate masked image and convert it to base64
+    logger.debug("Generating masked image")
+    masked_image = generate_masked_image(image, mask)
+    masked_buffer = io.BytesIO()
+    masked_image.save(masked_buffer, format="PNG")
+    masked_image_base64 = base64.b64encode(masked_buffer.getvalue()).decode("utf-8")
+    logger.debug("Successfully converted masked image to base64")
 
-# Function to check database connection
-def check_db_connection(db: Session):
+    return volume_ml, masked_image_base64
+
+async def analyze_image(contents: bytes, depth_backend: str) -> dict:
     """
-    Check if the database connection is working and print the current database URL
+    Run the image-only part of the pipeline: classification, volume estimation
+    and the masked overlay, reusing a cached result for previously seen images.
+
+    Args:
+        contents: Raw bytes of the uploaded JPEG
+        depth_backend: Registered depth backend name
+
+    Returns:
+        dict: predicted_food, confidence, volume_ml, masked_image (base64 PNG or None) and cached
     """
-    logger.info(f"Current database URL: {SQLALCHEMY_DATABASE_URL}")
-    
+    cache = get_prediction_cache()
+    cache_key = PredictionCache.make_key(contents, classifier_version(), depth_backend)
+    cached = await run_in_threadpool(cache.get, cache_key) if cache.enabled else None
+    if cached is not None:
+        logger.info(f"Prediction cache hit for {cache_key[:12]}")
+        return {**cached, "cached": True}
+
+    logger.debug("Decoding uploaded image")
+    classifier_input, working_image = await get_image_pool().run(
+        decode_upload, contents, IMG_SIZE
+    )
+
+    # Predict food from image
+    logger.info("Predicting food from image")
+    predicted_food, confidence = await predict_food_batched(classifier_input)
+
+    # Calculate volume and the masked overlay
+    logger.info("Calculating volume")
     try:
-        # Try to execute a simple query using text()
-        result = db.execute(text("SELECT 1")).scalar()
-        logger.info(f"Database connection successful. Test query result: {result}")
-        
-        # Check if the food table exists and has data
-        food_count = db.query(Food).count()
-        logger.info(f"Food table exists and has {food_count} records")
-        
-        # List all food items in the database
-        foods = db.query(Food.food_product).all()
-        food_names = [food[0] for food in foods]
-        logger.info(f"Food items in database: {food_names}")
-        
-        return True
+        volume_ml, masked_image_base64 = await get_image_pool().run(
+            estimate_portion, working_image, predicted_food, depth_backend
+        )
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        logger.error(f"Error in volume calculation: {str(e)}", exc_info=True)
+        volume_ml, masked_image_base64 = None, None
+
+    result = {
+        "predicted_food": predicted_food,
+        "confidence": confidence,
+        "volume_ml": volume_ml,
+        "masked_image": masked_image_base64,
+    }
+    # Only complete results are cached so a failed depth pass is retried next time
+    if cache.enabled and masked_image_base64 is not None:
+        await run_in_threadpool(cache.set, cache_key, result)
+    return {**result, "cached": False}
+
+async def generate_recommendations(predicted_food: str, food_nutrition: dict, user_profile: Optional[dict],
+                                   volume_grams: Optional[float]):
+    """
+    Get LLM recommendations for a prediction, falling back to the rule-based ones.
+
+    Returns:
+        tuple: (recommendations, source) where source is "llm" or "rule-based"
+    """
+    try:
+        logger.info("Generating LLM-based recommendations")
+        food_recommendation_llm = FoodRecommendationLLM()
+        recommendations = await food_recommendation_llm.get_recommendation(
+            food_name=predicted_food,
+            food_nutrition=food_nutrition,
+            user_profile=user_profile,
+            context=f"Estimated portion size: {volume_grams:.1f}g" if volume_grams is not None else None,
+            portion_grams=volume_grams
+        )
+        logger.info(f"Generated LLM recommendations: {recommendations}")
+        return recommendations, "llm"
+    except Exception as e:
+        logger.error(f"Error generating LLM recommendations: {str(e)}")
+        # Fallback to rule-based recommendations
+        logger.info("Falling back to rule-based recommendations")
+        food_recommendation = FoodRecommendation(predicted_food, user_profile.get("health_issues") if user_profile else None)
+        return food_recommendation.evaluate(), "rule-based"
+
+def save_recommendation(user_id: int, food_id: Optional[int], recommendations: dict, source: str,
+                        context: str, job_id: Optional[str] = None) -> int:
+    """
+    Persist a generated recommendation to the food_recommendations table.
+
+    Opens its own session because it runs after the request's session is closed.
+
+    Returns:
+        int: ID of the new FoodRecommendation row
+    """
+    db = SessionLocal()
+    try:
+        record = StoredRecommendation(
+            user_id=user_id,
+            recommendation_text=json.dumps(dict(recommendations)),
+            source=source,
+            context=context,
+            job_id=job_id
+        )
+        db.add(record)
+        if food_id is not None:
+            db.flush()
+            db.execute(food_recommendation_items.insert().values(recommendation_id=record.id, food_id=food_id))
+        db.commit()
+        return record.id
+    finally:
+        db.close()
+
+async def run_recommendation_job(job: RecommendationJob, predicted_food: str, food_nutrition: dict,
+                                 user_profile: Optional[dict], volume_grams: Optional[float],
+                                 food_id: Optional[int]):
+    """
+    Background task for deferred recommendations: generate, persist for
+    signed-in users, and publish the result to the job store.
+    """
+    jobs = get_recommendation_jobs()
+    try:
+        recommendations, source = await generate_recommendations(
+            predicted_food, food_nutrition, user_profile, volume_grams
+        )
+        recommendation_id = None
+        if job.user_id is not None:
+            portion = f", estimated portion {volume_grams:.1f}g" if volume_grams is not None else ""
+            try:
+                recommendation_id = await run_in_threadpool(
+                    save_recommendation, job.user_id, food_id, recommendations, source,
+                    f"image-based prediction: {predicted_food}{portion}", job.id
+                )
+            except Exception as e:
+                logger.error(f"Could not persist recommendation for job {job.id}: {str(e)}", exc_info=True)
+        # Rule-based results are shared read-only mappings; store a plain copy
+        jobs.complete(job, dict(recommendations), source, recommendation_id)
+        logger.info(f"Recommendation job {job.id} completed ({source})")
     except Exception as e:
-        logger.error(f"Database connection error: {str(e)}", exc_info=True)
-        return False
+        logger.error(f"Recommendation job {job.id} failed: {str(e)}", exc_info=True)
+        jobs.fail(job, str(e))
 
 @router.post("/predict")
 async def predict_food_from_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    quality: Optional[str] = Query(None, description="Depth backend name or quality tier (high, balanced, fast, none)"),
+    defer_recommendation: bool = Query(False, description="Return immediately and compute recommendations in the background"),
     db: Session = Depends(get_db),
     authorization: Optional[str] = Header(None)
 ):
     """
     Endpoint to predict food from an uploaded image and get nutritional information
+
+    With ``defer_recommendation=true`` the response comes back as soon as the
+    prediction, nutrition and volume are ready; ``recommendations`` is null and
+    ``recommendation_job`` points at the endpoints that deliver them.
     """
+    # Resolve the depth backend up front so a bad value fails before any work is done
+    try:
+        depth_backend = resolve_depth_backend(quality)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     logger.info(f"Received image file: {file.filename}, content type: {file.content_type}")
     
-    # Extract token from Authorization header
-    token = None
-    if authorization and authorization.startswith('Bearer '):
-        token = authorization.split(' ')[1]
-        logger.info("Token extracted from Authorization header")
-    else:
-        logger.warning("No valid Authorization header found")
-    
-    logger.info(f"Token received: {token is not None}")
-    
-    # Check database connection
-    check_db_connection(db)
-    
-    # Get user profile if token is provided
+    # Get user profile if a token is provided (cached, see auth.context)
     user_profile = None
-    if token:
-        try:
-            logger.info("Attempting to decode JWT token")
-            # Use the exact same secret key as in auth.py
-            secret_key = "food_iq_secret_key"
-            
-            # Decode the JWT token
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-            user_id = payload.get("sub")
-            logger.info(f"Decoded user_id from token: {user_id}")
-            
-            if user_id:
-                # Get user profile directly from database
-                logger.info(f"Querying user profile for user_id: {user_id}")
-                profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-                logger.info(f"User profile found: {profile is not None}")
-                
-                if profile:
-                    # Convert profile to dictionary
-                    user_profile = {
-                        "age": profile.age,
-                        "weight": profile.weight,
-                        "height": profile.height,
-                        "health_issues": profile.health_issues.value if profile.health_issues else None,
-                        "allergies": profile.allergies,
-                        "physical_activity_level": profile.physical_activity_level,
-                        "weight_goal": profile.weight_goal,
-                        "dietary_preferences": profile.dietary_preferences
-                    }
-                    logger.info(f"User profile loaded: {user_profile}")
-        except JWTError as e:
-            logger.error(f"JWT token validation failed: {str(e)}")
-        except ValueError as e:
-            logger.error(f"Configuration error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error processing token: {str(e)}", exc_info=True)
+    user_id = None
+    auth_context = get_optional_auth_context(authorization, db)
+    if auth_context:
+        user_id = auth_context.user_id
+        user_profile = auth_context.profile
+        logger.info(f"Authenticated user {user_id}, profile found: {user_profile is not None}")
     else:
-        logger.warning("No token provided in request")
+        logger.warning("No valid token provided in request")
     
     # Check if the file is a JPG/JPEG
     if not file.content_type in ["image/jpeg", "image/jpg"]:
         logger.warning(f"Unsupported file type: {file.content_type}")
         raise HTTPException(status_code=400, detail="Only JPG/JPEG images are supported")
     
-    # Read the file contents once
+    # Read the file contents once and decode them once for every stage
     contents = await file.read()
     
-    # Create a temporary file to store the uploaded image
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-        # Write the contents to the temporary file
-        logger.debug(f"Creating temporary file: {temp_file.name}")
-        temp_file.write(contents)
-        temp_file_path = temp_file.name
-    
     try:
-        # Predict food from image
-        logger.info("Predicting food from image")
-        predicted_food, confidence = predict_food(temp_file_path)
+        result = await analyze_image(contents, depth_backend)
+        predicted_food = result["predicted_food"]
+        confidence = result["confidence"]
+        masked_image_base64 = result["masked_image"]
         logger.info(f"Predicted food: {predicted_food} with confidence: {confidence}")
         
         # Get nutritional information from database
         logger.info(f"Getting nutritional information for: {predicted_food}")
         nutrition = get_food_nutrition(predicted_food, db)
         
-        if nutrition is None:
-            logger.warning(f"Imported get_food_nutrition failed, trying direct query for: {predicted_food}")
-            nutrition = direct_get_food_nutrition(predicted_food, db)
-        
-        # Calculate volume and adjust nutrition
-        logger.info("Calculating volume and adjusting nutrition")
+        # Adjust nutrition to the estimated volume
+        logger.info("Adjusting nutrition to the estimated volume")
+        volume_grams = result["volume_ml"]  # assuming 1g/ml for food density
+        adjusted_nutrition = None
         try:
-            # Create a new BytesIO object from the saved contents
-            logger.debug("Creating BytesIO object from image contents")
-            image_stream = io.BytesIO(contents)
-            
-            logger.debug("Opening image with PIL and converting to RGB")
-            image = Image.open(image_stream).convert("RGB")
-            logger.debug(f"Image size: {image.size}, mode: {image.mode}")
-            
-            # Depth Estimation and Mask Generation
-            logger.debug("Starting depth estimation")
-            depth_map = estimate_depth(image)
-            logger.debug(f"Depth map shape: {depth_map.shape}, min: {depth_map.min()}, max: {depth_map.max()}")
-            
-            logger.debug("Creating binary mask")
-            mask = create_mask(image)
-            logger.debug(f"Mask shape: {mask.shape}, unique values: {np.unique(mask)}")
-            
-            logger.debug("Estimating volume from depth map")
-            # Use predicted food type for better volume estimation
-            food_type = predicted_food.split('_')[0]  # Extract base food type
-            
-            # Set reference volume based on food type
-            reference_volumes = {
-                "default": 240.0,
-                "rice": 200.0,
-                "bread": 150.0,
-                "soup": 300.0,
-                "curry": 250.0,
-                "salad": 180.0,
-                "fruit": 200.0,
-                "vegetables": 180.0,
-                "meat": 250.0,
-                "fish": 200.0,
-                "dessert": 200.0,
-                "beverage": 300.0
-            }
-            reference_volume = reference_volumes.get(food_type, reference_volumes["default"])
-            
-            volume_ml = estimate_volume_from_depth(depth_map, mask, reference_volume)
-            logger.debug(f"Estimated volume in ml: {volume_ml}")
-            
-            volume_grams = volume_ml  # assuming 1g/ml for food density
-            logger.debug(f"Converted volume to grams: {volume_grams}")
-            
-            # Generate masked image
-            logger.debug("Generating masked image")
-            masked_image = generate_masked_image(image, mask)
-            logger.debug(f"Masked image size: {masked_image.size}, mode: {masked_image.mode}")
-            
-            # Convert masked image to base64
-            logger.debug("Converting masked image to base64")
-            masked_buffer = io.BytesIO()
-            masked_image.save(masked_buffer, format="PNG")
-            masked_image_base64 = base64.b64encode(masked_buffer.getvalue()).decode("utf-8")
-            logger.debug("Successfully converted masked image to base64")
-            
-            # Adjust nutrition based on volume
-            if nutrition:
+            if volume_grams is None:
+                logger.warning("No volume estimate available for adjustment")
+            elif nutrition:
                 logger.debug("Adjusting nutrition values based on volume")
                 # Convert volume from ml to grams (assuming 1g/ml density)
-                volume_grams = safe_float(volume_ml)
+                volume_grams = safe_float(volume_grams)
                 # Calculate scale factor based on the difference from 150g (standard serving)
                 scale_factor = safe_float(volume_grams / 150.0) if volume_grams is not None else None
                 logger.debug(f"Scale factor for nutrition adjustment: {scale_factor}")
@@ -484,54 +406,132 @@ async def predict_food_from_image(
                 logger.debug(f"Adjusted nutrition values: {adjusted_nutrition}")
             else:
                 logger.warning("No nutrition data available for adjustment")
-                adjusted_nutrition = None
-                
         except Exception as e:
-            logger.error(f"Error in volume calculation: {str(e)}", exc_info=True)
-            logger.error("Stack trace:", exc_info=True)
+            logger.error(f"Error adjusting nutrition: {str(e)}", exc_info=True)
             adjusted_nutrition = None
-            masked_image_base64 = None
         
-        # Generate recommendations using LLM
-        try:
-            logger.info("Generating LLM-based recommendations")
-            food_recommendation_llm = FoodRecommendationLLM()
-            recommendations = food_recommendation_llm.get_recommendation(
-                food_name=predicted_food,
-                food_nutrition=adjusted_nutrition or nutrition.to_dict() if nutrition else {},
-                user_profile=user_profile,
-                context=f"Estimated portion size: {volume_grams:.1f}g"
+        food_nutrition = adjusted_nutrition or nutrition.to_dict() if nutrition else {}
+        recommendation_job = None
+        if defer_recommendation:
+            job = get_recommendation_jobs().create(
+                user_id=user_id, food_name=predicted_food
+            )
+            background_tasks.add_task(
+                run_recommendation_job, job, predicted_food, food_nutrition, user_profile,
+                volume_grams, getattr(nutrition, "id", None)
+            )
+            recommendations = None
+            recommendation_job = {
+                "job_id": job.id,
+                "status": job.status,
+                "poll_url": f"/image/recommendations/{job.id}",
+                "events_url": f"/image/recommendations/{job.id}/events"
+            }
+            logger.info(f"Deferred recommendations to job {job.id}")
+        else:
+            recommendations, _ = await generate_recommendations(
+                predicted_food, food_nutrition, user_profile, volume_grams
             )
-            logger.info(f"Generated LLM recommendations: {recommendations}")
-        except Exception as e:
-            logger.error(f"Error generating LLM recommendations: {str(e)}")
-            # Fallback to rule-based recommendations
-            logger.info("Falling back to rule-based recommendations")
-            food_recommendation = FoodRecommendation(predicted_food, user_profile.get("health_issues") if user_profile else None)
-            recommendations = food_recommendation.evaluate()
         
         # Prepare response
         response = {
             "predicted_food": predicted_food,
             "confidence": confidence,
             "nutrition": adjusted_nutrition,
-            "volume_estimation": volume_grams if 'volume_grams' in locals() else None,
+            "volume_estimation": volume_grams,
+            "depth_backend": depth_backend,
+            "cached": result["cached"],
             "masked_image": f"data:image/png;base64,{masked_image_base64}" if masked_image_base64 else None,
             "recommendations": recommendations
         }
+        if recommendation_job:
+            response["recommendation_job"] = recommendation_job
         
         logger.info(f"Sending response with recommendations: {recommendations}")
         return response
         
+    except PoolSaturatedError as e:
+        logger.warning(f"Rejecting image request under load: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Image processing is at capacity, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in predict_food_from_image: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _load_persisted_job(job_id: str):
+    db = SessionLocal()
+    try:
+        return load_persisted_job(db, job_id)
     finally:
-        # Clean up temporary file
-        try:
-            os.unlink(temp_file_path)
-        except Exception as e:
-            logger.error(f"Error deleting temporary file: {str(e)}")
+        db.close()
+
+async def _get_job_or_404(job_id: str, authorization: Optional[str], db: Session) -> RecommendationJob:
+    """
+    Job from this process's store, or else rebuilt from the recommendation row
+    saved for it (the job ran on another worker or before a restart). Jobs of
+    other users are reported as not found.
+    """
+    auth_context = await run_in_threadpool(get_optional_auth_context, authorization, db)
+    user_id = auth_context.user_id if auth_context else None
+    jobs = get_recommendation_jobs()
+    job = jobs.get(job_id)
+    if job is None:
+        persisted = await run_in_threadpool(_load_persisted_job, job_id)
+        if persisted is not None:
+            job = jobs.restore(**persisted)
+    if job is None or not job.visible_to(user_id):
+        raise HTTPException(status_code=404, detail="Recommendation job not found or expired")
+    return job
+
+@router.get("/recommendations/{job_id}")
+async def get_recommendation_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the job to finish (long polling)"),
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Endpoint to poll a deferred recommendation job; jobs started by a signed-in
+    user need that user's token
+    """
+    job = await _get_job_or_404(job_id, authorization, db)
+    if wait and not job.done:
+        await get_recommendation_jobs().wait(job, timeout=wait)
+    return job.to_dict()
+
+@router.get("/recommendations/{job_id}/events")
+async def stream_recommendation_job(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Endpoint to receive a deferred recommendation as a server-sent event once it is ready
+    """
+    job = await _get_job_or_404(job_id, authorization, db)
+
+    async def events():
+        jobs = get_recommendation_jobs()
+        while not job.done:
+            # Wake up periodically to send a keep-alive and notice disconnected clients
+            if await jobs.wait(job, timeout=15):
+                break
+            if await request.is_disconnected():
+                return
+            yield ": keep-alive\n\n"
+        yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/food-classes")
 async def get_food_classes():
@@ -541,45 +541,52 @@ async def get_food_classes():
     logger.info("Returning food classes")
     return {"food_classes": CLASS_NAMES}
 
+@router.get("/depth-backends")
+async def get_depth_backends():
+    """
+    Endpoint to list the selectable depth backends and quality tiers
+    """
+    return {
+        "default": resolve_depth_backend(),
+        "backends": list(DEPTH_BACKENDS),
+        "quality_tiers": QUALITY_TIERS
+    }
+
+@router.get("/pool-stats")
+async def get_pool_stats():
+    """
+    Endpoint to report load on the image worker pool, classifier batcher and
+    password hashing pool
+    """
+    return {
+        "worker_pool": get_image_pool().stats(),
+        "batcher": get_batcher().stats(),
+        "password_pool": get_password_pool().stats()
+    }
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    Endpoint to report hit rates of the image prediction cache, nutrition index,
+    LLM recommendation cache and authentication cache
+    """
+    return {
+        **get_prediction_cache().stats(),
+        "nutrition_index": get_nutrition_index().stats(),
+        "recommendations": get_recommendation_cache().stats(),
+        "auth": get_auth_cache().stats()
+    }
+
 @router.get("/check-db")
-async def check_database(db: Session = Depends(get_db)):
+async def check_database(refresh: bool = Query(False, description="Probe the database now instead of returning the cached status")):
     """
-    Endpoint to check the database connection and list food items
+    Endpoint to report the database status from the background health monitor
     """
-    logger.info("Checking database connection")
-    
-    # Check database connection
-    connection_ok = check_db_connection(db)
-    
-    if connection_ok:
-        # Check if the database has been properly initialized with food data
-        food_count = db.query(Food).count()
-        if food_count == 0:
-            logger.warning("Database is connected but has no food data. It may not be properly initialized.")
-            return {
-                "status": "warning", 
-                "message": "Database connection successful but no food data found",
-                "food_count": 0,
-                "database_url": SQLALCHEMY_DATABASE_URL
-            }
-        
-        # Get a sample of food items
-        sample_foods = db.query(Food).limit(5).all()
-        sample_food_names = [food.food_product for food in sample_foods]
-        
-        return {
-            "status": "success", 
-            "message": "Database connection successful",
-            "food_count": food_count,
-            "sample_foods": sample_food_names,
-            "database_url": SQLALCHEMY_DATABASE_URL
-        }
-    else:
-        return {
-            "status": "error", 
-            "message": "Database connection failed",
-            "database_url": SQLALCHEMY_DATABASE_URL
-        }
+    monitor = get_db_health_monitor()
+    status = await run_in_threadpool(monitor.probe) if refresh else monitor.status()
+    if status["status"] == ERROR:
+        logger.warning(f"Database health check reports an error: {status.get('error')}")
+    return {**status, "database_url": SQLALCHEMY_DATABASE_URL}
 
 @router.get("/init-db")
 async def initialize_database(db: Session = Depends(get_db)):
@@ -646,7 +653,3 @@ async def initialize_database(db: Session = Depends(get_db)):
             "database_url": SQLALCHEMY_DATABASE_URL
         }
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.depth_estimation import estimate_depth, create_mask, estimate_volume_from_depth, generate_masked_image
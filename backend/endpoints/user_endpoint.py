@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
+import datetime
 
 from models.database import get_db
-from models.user import User, UserProfile, UserFoodLog, FoodRecommendation
+from models.user import User, UserProfile, UserFoodLog, UserDailyNutrition, FoodRecommendation, food_recommendation_items
+from models.daily_nutrition import nutrition_summary, record_food_log
 from models.food import Food
 from auth.auth import get_current_active_user
+from auth.context import get_auth_cache
 from auth.models import UserResponse, ProfileResponse
+from utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+# Longest date range the nutrition summary accepts
+MAX_SUMMARY_DAYS = 366
 
 router = APIRouter(
     prefix="/users",
@@ -39,15 +47,24 @@ def get_current_user_profile(
 # Get user food logs
 @router.get("/me/food-logs")
 def get_user_food_logs(
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get food logs for the current user with optional date filtering"""
-    query = db.query(UserFoodLog).filter(UserFoodLog.user_id == current_user.id)
+    """
+    Get food logs for the current user, newest first, with optional date filtering.
+
+    Pages are keyed on (date, id): pass the returned ``next_cursor`` as
+    ``cursor`` to get the next page. Each page is one query that joins the
+    logged foods and reads the (user_id, date, id) index.
+    """
+    query = db.query(UserFoodLog)\
+        .join(UserFoodLog.food)\
+        .options(contains_eager(UserFoodLog.food))\
+        .filter(UserFoodLog.user_id == current_user.id)
     
     # Apply date filters if provided
     if date_from:
@@ -55,23 +72,36 @@ def get_user_food_logs(
     if date_to:
         query = query.filter(UserFoodLog.date <= date_to)
     
-    # Get results with pagination
-    logs = query.order_by(UserFoodLog.date.desc()).offset(skip).limit(limit).all()
+    # Continue after the last row of the previous page
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor, 2)
+            last_date = datetime.datetime.fromisoformat(last_date)
+        except (InvalidCursorError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(tuple_(UserFoodLog.date, UserFoodLog.id) < (last_date, last_id))
+    
+    # Fetch one extra row to know whether there is another page
+    logs = query.order_by(UserFoodLog.date.desc(), UserFoodLog.id.desc()).limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
     
     # Format the response
     result = []
     for log in logs:
-        food = db.query(Food).filter(Food.id == log.food_id).first()
-        if food:
-            result.append({
-                "id": log.id,
-                "date": log.date,
-                "meal_type": log.meal_type,
-                "amount": log.amount,
-                "food": food.to_dict()
-            })
+        result.append({
+            "id": log.id,
+            "date": log.date,
+            "meal_type": log.meal_type,
+            "amount": log.amount,
+            "food": log.food.to_dict()
+        })
     
-    return {"food_logs": result, "total": len(result)}
+    next_cursor = encode_cursor(logs[-1].date.isoformat(), logs[-1].id) if has_more else None
+    return {"food_logs": result, "total": len(result), "next_cursor": next_cursor}
 
 # Add food to user's log
 @router.post("/me/food-logs", status_code=status.HTTP_201_CREATED)
@@ -89,17 +119,30 @@ def add_food_to_log(
             detail="Food not found"
         )
     
+    # Keyset pagination and the daily rollup need every log to have a date
+    log_date = food_log.get("date") or datetime.datetime.utcnow()
+    if isinstance(log_date, str):
+        try:
+            log_date = datetime.datetime.fromisoformat(log_date)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date"
+            )
+    
     # Create new food log entry
     new_log = UserFoodLog(
         user_id=current_user.id,
         food_id=food.id,
         meal_type=food_log.get("meal_type", "Other"),
         amount=food_log.get("amount", 1.0),
-        date=food_log.get("date")
+        date=log_date
     )
     
     try:
         db.add(new_log)
+        # Update the daily totals in the same transaction
+        record_food_log(db, new_log, food)
         db.commit()
         db.refresh(new_log)
         
@@ -118,6 +161,43 @@ def add_food_to_log(
             detail="Failed to add food to log"
         )
 
+# Get nutrient totals per day or week
+@router.get("/me/nutrition-summary")
+def get_nutrition_summary(
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    period: str = Query("day", pattern="^(day|week)$"),
+    by_meal: bool = False,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get nutrient totals (scaled by logged amount) per day or week, optionally per meal.
+
+    Defaults to the last 30 days. Read from the daily rollup in a single query.
+    """
+    date_to = date_to or datetime.datetime.utcnow().date()
+    date_from = date_from or date_to - datetime.timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to"
+        )
+    if (date_to - date_from).days > MAX_SUMMARY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SUMMARY_DAYS} days can be summarized per request"
+        )
+    
+    periods = nutrition_summary(db, current_user.id, date_from, date_to, period=period, by_meal=by_meal)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "period": period,
+        "periods": periods,
+        "total": len(periods)
+    }
+
 # Get user recommendations
 @router.get("/me/recommendations")
 def get_user_recommendations(
@@ -126,8 +206,9 @@ def get_user_recommendations(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get food recommendations for the current user"""
+    """Get food recommendations for the current user (the page and its foods in two queries)"""
     recommendations = db.query(FoodRecommendation)\
+        .options(selectinload(FoodRecommendation.foods))\
         .filter(FoodRecommendation.user_id == current_user.id)\
         .order_by(FoodRecommendation.created_at.desc())\
         .offset(skip).limit(limit).all()
@@ -135,12 +216,7 @@ def get_user_recommendations(
     # Format the response
     result = []
     for rec in recommendations:
-        # Get associated food items if they exist
-        food_items = []
-        if rec.food_ids:
-            food_ids = [int(id) for id in rec.food_ids.split(",") if id.strip().isdigit()]
-            food_items = db.query(Food).filter(Food.id.in_(food_ids)).all()
-            food_items = [food.to_dict() for food in food_items]
+        food_items = [food.to_dict() for food in rec.foods]
         
         result.append({
             "id": rec.id,
@@ -164,12 +240,18 @@ def delete_user_account(
         # Delete associated data first (due to foreign key constraints)
         db.query(UserProfile).filter(UserProfile.user_id == current_user.id).delete()
         db.query(UserFoodLog).filter(UserFoodLog.user_id == current_user.id).delete()
+        db.query(UserDailyNutrition).filter(UserDailyNutrition.user_id == current_user.id).delete()
+        user_recommendations = select(FoodRecommendation.id).where(FoodRecommendation.user_id == current_user.id)
+        db.execute(food_recommendation_items.delete().where(
+            food_recommendation_items.c.recommendation_id.in_(user_recommendations)
+        ))
         db.query(FoodRecommendation).filter(FoodRecommendation.user_id == current_user.id).delete()
         
         # Delete the user
         db.query(User).filter(User.id == current_user.id).delete()
         
         db.commit()
+        get_auth_cache().invalidate_user(current_user.id)
         return None
     except Exception as e:
         db.rollback()
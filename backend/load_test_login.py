@@ -0,0 +1,122 @@
+"""
+Login throughput load test.
+
+Registers a throwaway user, then fires concurrent POST /auth/token requests
+while probing a second endpoint (GET /health by default) to show whether the
+login storm slows down the rest of the API. Run against a live server:
+
+    python load_test_login.py --url http://localhost:8000 --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+
+import httpx
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+
+def summarize(name, latencies, statuses, elapsed):
+    """Log throughput, status counts and latency percentiles for one scenario."""
+    counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+    logger.info(
+        f"{name}: {len(statuses)} requests in {elapsed:.2f}s "
+        f"({len(statuses) / elapsed:.1f} req/s), status codes {counts}"
+    )
+    if latencies:
+        logger.info(
+            f"{name} latency ms: mean={statistics.mean(latencies) * 1000:.1f} "
+            f"p50={percentile(latencies, 50) * 1000:.1f} "
+            f"p95={percentile(latencies, 95) * 1000:.1f} "
+            f"p99={percentile(latencies, 99) * 1000:.1f}"
+        )
+
+
+async def register_user(client, email, password):
+    """Create the user the logins authenticate as."""
+    response = await client.post("/auth/register", json={"email": email, "password": password})
+    if response.status_code not in (201, 400):
+        raise RuntimeError(f"Registration failed: {response.status_code} {response.text}")
+
+
+async def login_storm(client, email, password, total, concurrency):
+    """Send ``total`` logins with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], []
+
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/auth/token", data={"username": email, "password": password})
+                statuses.append(response.status_code)
+            except httpx.HTTPError as e:
+                statuses.append(type(e).__name__)
+                return
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(total)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def probe(client, path, interval, stop):
+    """Request ``path`` every ``interval`` seconds until ``stop`` is set."""
+    latencies, statuses = [], []
+    start = time.perf_counter()
+    while not stop.is_set():
+        request_start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            statuses.append(response.status_code)
+            latencies.append(time.perf_counter() - request_start)
+        except httpx.HTTPError as e:
+            statuses.append(type(e).__name__)
+        await asyncio.sleep(interval)
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def main(args):
+    email = args.email or f"loadtest-{uuid.uuid4().hex[:8]}@example.com"
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        await register_user(client, email, args.password)
+        logger.info(f"Logging in as {email}: {args.requests} requests, concurrency {args.concurrency}")
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, args.probe_path, args.probe_interval, stop))
+        try:
+            latencies, statuses, elapsed = await login_storm(
+                client, email, args.password, args.requests, args.concurrency
+            )
+        finally:
+            stop.set()
+        summarize("login", latencies, statuses, elapsed)
+        summarize(f"probe {args.probe_path}", *await probe_task)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test login throughput")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API")
+    parser.add_argument("--requests", type=int, default=200, help="Total login requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Logins in flight at once")
+    parser.add_argument("--email", help="Existing user to log in as (default: register a new one)")
+    parser.add_argument("--password", default="loadtest-password", help="Password of the user")
+    parser.add_argument("--probe-path", default="/health", help="Endpoint probed during the storm")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between probes")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    asyncio.run(main(parser.parse_args()))
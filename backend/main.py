@@ -1,5 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import os
 import sys
@@ -10,10 +12,17 @@ import uvicorn
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import database and models
-from models.database import engine, Base
+from models.database import engine, Base, pool_status
 from models.user import User, UserProfile, UserFoodLog, FoodRecommendation
 from models.food import Food
 from endpoints import auth_endpoint, imageprocess, user_endpoint, food_router, chatbot
+from services.worker_pool import get_image_pool
+from auth.auth import get_password_pool
+from services.model_registry import get_model_registry
+from services.db_health import get_db_health_monitor
+from services.llm_gateway import get_llm_gateway
+from utils.food_recommendations import get_rule_table
+from utils.depth_backends import default_depth_backend
 
 # Load environment variables
 load_dotenv()
@@ -58,6 +67,49 @@ app.include_router(imageprocess.router, prefix="/image", tags=["image"])
 app.include_router(food_router.router, prefix="/food", tags=["food"])
 app.include_router(chatbot.router, prefix="/chat", tags=["chat"])
 
+# Models that must be loaded before the app reports ready
+_warmup_targets = []
+
+@app.on_event("startup")
+async def check_depth_backend():
+    """Fail startup on a bad DEPTH_BACKEND instead of failing every /image/predict"""
+    logger.info(f"Default depth backend: {default_depth_backend()}")
+
+@app.on_event("startup")
+async def warm_up_models():
+    """Start loading ML models in the background so startup isn't blocked"""
+    global _warmup_targets
+    _warmup_targets = imageprocess.warmup_targets()
+    if _warmup_targets:
+        logger.info(f"Warming up models in the background: {_warmup_targets}")
+        asyncio.get_running_loop().run_in_executor(None, imageprocess.warmup_models)
+
+@app.on_event("startup")
+async def compile_recommendation_rules():
+    """Compile the rule-based recommendation table before the first request needs it"""
+    get_rule_table()
+
+@app.on_event("startup")
+async def start_db_health_monitor():
+    """Probe the database in the background instead of on the request path"""
+    get_db_health_monitor().start()
+
+@app.on_event("shutdown")
+async def stop_db_health_monitor():
+    get_db_health_monitor().stop()
+
+@app.on_event("shutdown")
+async def shutdown_inference():
+    """Stop background inference workers"""
+    await imageprocess.get_batcher().close()
+    get_image_pool().shutdown(wait=False)
+    get_password_pool().shutdown(wait=False)
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    """Close pooled connections to the OpenAI API"""
+    await get_llm_gateway().close()
+
 @app.get("/")
 async def root():
     return {
@@ -70,6 +122,47 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the warm-up models are loaded and the last
+    database health check succeeded, 503 otherwise. A warm-up model whose last
+    load failed is reported as "model_failed" with its error.
+    """
+    registry = get_model_registry()
+    models_ready = all(registry.is_ready(name) for name in _warmup_targets)
+    model_errors = registry.failures(_warmup_targets)
+    db_monitor = get_db_health_monitor()
+    db_ready = db_monitor.is_healthy()
+    if models_ready and db_ready:
+        status = "ready"
+    elif model_errors:
+        status = "model_failed"
+    elif not models_ready:
+        status = "warming_up"
+    else:
+        status = "database_unavailable"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={
+            "status": status,
+            "warmup_models": _warmup_targets,
+            "model_errors": model_errors,
+            "models": registry.status(),
+            "database": db_monitor.status()
+        }
+    )
+
+# Pool metrics for operators; off by default as the endpoint has no auth
+if os.getenv("ENABLE_DB_POOL_ENDPOINT", "false").lower() == "true":
+    @app.get("/internal/db-pool")
+    async def db_pool_status():
+        """
+        Connection pool state (size, checked out, overflow) and checkout wait
+        metrics for the shared database engine
+        """
+        return pool_status(engine)
+
 @app.get("/test-env")
 async def test_env():
     """Test endpoint to verify environment variables"""
@@ -0,0 +1,145 @@
+import datetime
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .food import Food
+from .user import UserDailyNutrition, UserFoodLog
+
+logger = logging.getLogger(__name__)
+
+# Nutrients kept in the rollup, named as on Food and UserDailyNutrition
+NUTRIENTS = ("energy", "carbohydrate", "protein", "total_fat", "sodium", "iron")
+
+DEFAULT_MEAL_TYPE = "Other"
+
+
+def log_nutrients(food: Food, amount: Optional[float]) -> Dict[str, float]:
+    """Nutrients contributed by one log: the food's values scaled by the logged amount."""
+    amount = 1.0 if amount is None else float(amount)
+    return {name: float(getattr(food, name) or 0.0) * amount for name in NUTRIENTS}
+
+
+def record_food_log(db: Session, log: UserFoodLog, food: Food):
+    """
+    Add a new food log to its user's daily rollup, in the caller's transaction.
+
+    Increments the (user, day, meal) row in place and inserts it if it doesn't
+    exist yet. The caller commits.
+    """
+    key = {
+        "user_id": log.user_id,
+        "day": log.date.date(),
+        "meal_type": log.meal_type or DEFAULT_MEAL_TYPE,
+    }
+    nutrients = log_nutrients(food, log.amount)
+    increment = update(UserDailyNutrition)\
+        .where(*(getattr(UserDailyNutrition, name) == value for name, value in key.items()))\
+        .values(
+            entries=UserDailyNutrition.entries + 1,
+            **{name: getattr(UserDailyNutrition, name) + value for name, value in nutrients.items()}
+        )\
+        .execution_options(synchronize_session=False)
+    if db.execute(increment).rowcount:
+        return
+    try:
+        # Savepoint, so losing a race with a concurrent first insert for the
+        # same key doesn't abort the caller's transaction
+        with db.begin_nested():
+            db.execute(insert(UserDailyNutrition).values(**key, entries=1, **nutrients))
+    except IntegrityError:
+        db.execute(increment)
+
+
+def rebuild_daily_nutrition(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollup from user_food_logs, for one user or everyone.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    amount = func.coalesce(UserFoodLog.amount, 1.0)
+    meal_type = func.coalesce(UserFoodLog.meal_type, DEFAULT_MEAL_TYPE)
+    day = func.date(UserFoodLog.date)
+    aggregate = select(
+        UserFoodLog.user_id,
+        day,
+        meal_type,
+        func.count(UserFoodLog.id),
+        *(func.coalesce(func.sum(func.coalesce(getattr(Food, name), 0.0) * amount), 0.0) for name in NUTRIENTS)
+    ).join(Food, Food.id == UserFoodLog.food_id)\
+        .where(UserFoodLog.date.isnot(None))\
+        .group_by(UserFoodLog.user_id, day, meal_type)
+
+    clear = delete(UserDailyNutrition)
+    if user_id is not None:
+        aggregate = aggregate.where(UserFoodLog.user_id == user_id)
+        clear = clear.where(UserDailyNutrition.user_id == user_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(UserDailyNutrition).from_select(
+            ["user_id", "day", "meal_type", "entries", *NUTRIENTS], aggregate
+        )
+    )
+    return result.rowcount
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"entries": 0, **{name: 0.0 for name in NUTRIENTS}}
+
+
+def _add_totals(totals: Dict[str, Any], row) -> None:
+    totals["entries"] += row.entries
+    for name in NUTRIENTS:
+        totals[name] += getattr(row, name) or 0.0
+
+
+def nutrition_summary(db: Session, user_id: int, date_from: datetime.date, date_to: datetime.date,
+                      period: str = "day", by_meal: bool = False) -> List[Dict[str, Any]]:
+    """
+    Nutrient totals per day (or ISO week) between two dates, inclusive.
+
+    The rollup is aggregated per day (and meal, if requested) in one query;
+    weeks are folded from those daily rows.
+
+    Args:
+        db: Database session
+        user_id: User whose logs are summed
+        date_from: First day included
+        date_to: Last day included
+        period: "day" or "week" (weeks start on Monday)
+        by_meal: Also break each period down by meal type
+
+    Returns:
+        List of periods in date order, each with ``start``, totals and
+        optionally ``meals``
+    """
+    group_by = [UserDailyNutrition.day]
+    if by_meal:
+        group_by.append(UserDailyNutrition.meal_type)
+    rows = db.execute(
+        select(
+            *group_by,
+            func.sum(UserDailyNutrition.entries).label("entries"),
+            *(func.sum(getattr(UserDailyNutrition, name)).label(name) for name in NUTRIENTS)
+        )
+        .where(UserDailyNutrition.user_id == user_id,
+               UserDailyNutrition.day >= date_from,
+               UserDailyNutrition.day <= date_to)
+        .group_by(*group_by)
+        .order_by(*group_by)
+    ).all()
+
+    periods: Dict[datetime.date, Dict[str, Any]] = {}
+    for row in rows:
+        start = row.day - datetime.timedelta(days=row.day.weekday()) if period == "week" else row.day
+        summary = periods.setdefault(start, {"start": start, **_empty_totals()})
+        _add_totals(summary, row)
+        if by_meal:
+            meals = summary.setdefault("meals", {})
+            _add_totals(meals.setdefault(row.meal_type, _empty_totals()), row)
+    return list(periods.values())
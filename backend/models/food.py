@@ -1,13 +1,25 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Table, Index
+from sqlalchemy.orm import relationship, validates
 import datetime
+import re
 from .database import Base
 
+def normalize_food_name(name):
+    """
+    Canonical form of a food name used for matching: lowercase, trimmed, with
+    runs of spaces, hyphens and underscores collapsed to a single underscore
+    (so "Jalebi ", "aloo matar" and "aloo_matar" all match the classifier's names).
+    """
+    if name is None:
+        return ""
+    return re.sub(r"[\s_\-]+", "_", str(name).strip().lower()).strip("_")
+
 class Food(Base):
     __tablename__ = "food"
     
     id = Column(Integer, primary_key=True, index=True)
     food_product = Column(String, index=True)  # Name of food
+    normalized_name = Column(String, nullable=True)  # normalize_food_name(food_product), unique; set automatically
     amount = Column(Float)  # Standard amount (e.g., 100g)
     amount_unit = Column(String, default="g")  # Unit for amount (g, ml, etc.)
     
@@ -43,6 +55,20 @@ class Food(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
+    # One row per food: names that normalize the same are the same food
+    __table_args__ = (
+        Index("ix_food_normalized_name", "normalized_name", unique=True),
+    )
+    
+    @validates("food_product")
+    def _set_normalized_name(self, key, food_product):
+        """Keep normalized_name in step with food_product and reject blank names"""
+        normalized = normalize_food_name(food_product)
+        if not normalized:
+            raise ValueError("food_product must not be blank")
+        self.normalized_name = normalized
+        return food_product
+    
     def to_dict(self):
         """Convert food object to dictionary for API responses"""
         return {
@@ -1,6 +1,8 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.food import Food
 from models.database import get_db
+from models.nutrition_index import get_nutrition_index
 import logging
 
 # Configure logging
@@ -9,19 +11,47 @@ logger = logging.getLogger(__name__)
 
 def get_food_nutrition(food_name: str, db: Session):
     """
-    Get nutritional information for the predicted food from the database
+    Get nutritional information for the predicted food
+    
+    Served from the in-memory nutrition index (exact normalized name, then the
+    first food whose name contains ``food_name``); the database is only read
+    when the index is rebuilt. Falls back to querying directly if the index
+    can't be built.
     
     Args:
         food_name (str): The name of the food to search for
         db (Session): Database session
         
     Returns:
-        Food: The food object with nutritional information or None if not found
+        The food record with nutritional information or None if not found
     """
-    logger.debug(f"Searching for food: {food_name}")
-    logger.debug(f"Input food_name type: {type(food_name)}")
-    logger.debug(f"Input food_name value: '{food_name}'")
+    logger.debug(f"Searching for food: '{food_name}'")
+    
+    try:
+        food = get_nutrition_index().lookup(food_name, db)
+    except Exception as e:
+        logger.error(f"Nutrition index unavailable, querying database directly: {str(e)}")
+        db.rollback()
+        food = query_food_nutrition(food_name, db)
     
+    if food:
+        logger.debug(f"Found food: {food.food_product}")
+    else:
+        logger.debug("No food found")
+    
+    return food
+
+def query_food_nutrition(food_name: str, db: Session):
+    """
+    Look up a food with SQL: exact match first, then a case-insensitive partial match
+    
+    Args:
+        food_name (str): The name of the food to search for
+        db (Session): Database session
+        
+    Returns:
+        Food: The food object with nutritional information or None if not found
+    """
     # Try to find an exact match
     food = db.query(Food).filter(Food.food_product == food_name).first()
     logger.debug(f"Exact match result: {food}")
@@ -32,13 +62,25 @@ def get_food_nutrition(food_name: str, db: Session):
         food = db.query(Food).filter(Food.food_product.ilike(f"%{food_name}%")).first()
         logger.debug(f"Partial match result: {food}")
     
-    if food:
-        logger.debug(f"Found food: {food.food_product}")
-    else:
-        logger.debug("No food found")
-    
     return food
 
+def food_table_version(db: Session) -> str:
+    """
+    Cheap fingerprint of the food table: row count, highest id and latest
+    updated_at, read in one aggregate query. Inserts and deletes change the
+    count or max id; ORM updates and the bulk importer bump updated_at.
+    
+    Args:
+        db (Session): Database session
+        
+    Returns:
+        str: Version string that changes whenever the catalog does
+    """
+    count, max_id, last_update = db.query(
+        func.count(Food.id), func.max(Food.id), func.max(Food.updated_at)
+    ).one()
+    return f"{count}:{max_id}:{last_update}"
+
 def display_food_details(food):
     """
     Display specific nutritional columns of a food object
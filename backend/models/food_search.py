@@ -0,0 +1,66 @@
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+
+from .food import Food, normalize_food_name
+from .nutrition_index import get_nutrition_index
+
+logger = logging.getLogger(__name__)
+
+# Set when pg_trgm turns out to be missing, so we stop trying it on every request
+_trigram_unavailable = False
+
+
+def _search_trigram(db: Session, query: str, limit: int, mode: str) -> List[Tuple[Food, float]]:
+    """
+    Search with pg_trgm. ``%`` and ``LIKE 'prefix%'`` on normalized_name are
+    both served by the ix_food_normalized_name_trgm GIN index.
+    """
+    normalized = normalize_food_name(query)
+    score = func.similarity(Food.normalized_name, normalized)
+    prefixed = Food.normalized_name.startswith(normalized, autoescape=True)
+    statement = select(Food, score)
+    if mode == "prefix":
+        statement = statement.where(prefixed)\
+            .order_by(func.length(Food.normalized_name), Food.normalized_name)
+    else:
+        statement = statement.where(prefixed | Food.normalized_name.op("%")(normalized))\
+            .order_by(prefixed.desc(), score.desc(), Food.id)
+    return [(food, float(value)) for food, value in db.execute(statement.limit(limit)).all()]
+
+
+def search_foods(db: Session, query: str, limit: int = 10, mode: str = "fuzzy") -> List[Tuple[object, float]]:
+    """
+    Ranked food search by name.
+
+    Uses pg_trgm on PostgreSQL and the in-process nutrition index elsewhere
+    (or when the extension isn't installed); both rank the same way.
+
+    Args:
+        db: Database session
+        query: Text typed by the user
+        limit: Maximum number of results
+        mode: "fuzzy" (prefix matches first, then by trigram similarity) or
+            "prefix" (autocomplete, shortest names first)
+
+    Returns:
+        List of (food, similarity) pairs; foods are ``Food`` rows or
+        ``FoodRecord`` copies, which expose the same attributes
+    """
+    global _trigram_unavailable
+    if not normalize_food_name(query):
+        return []
+    if db.get_bind().dialect.name == "postgresql" and not _trigram_unavailable:
+        try:
+            return _search_trigram(db, query, limit, mode)
+        except ProgrammingError as e:
+            db.rollback()
+            _trigram_unavailable = True
+            logger.warning(f"pg_trgm search failed, using the in-process index (run make db-add-food-search-index): {e}")
+    snapshot = get_nutrition_index().snapshot(db)
+    if mode == "prefix":
+        return snapshot.complete(query, limit)
+    return snapshot.fuzzy(query, limit)
@@ -0,0 +1,299 @@
+import bisect
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.food import Food, normalize_food_name
+
+logger = logging.getLogger(__name__)
+
+# Rebuild at least this often so changes made outside this process (import scripts, psql) show up
+DEFAULT_TTL = float(os.getenv("NUTRITION_INDEX_TTL", "300"))
+
+# Same default as pg_trgm.similarity_threshold, so both search backends agree
+SIMILARITY_THRESHOLD = 0.3
+
+
+class FoodRecord(SimpleNamespace):
+    """
+    Read-only copy of a food row, detached from any session.
+
+    Exposes the same column attributes and ``to_dict`` as ``Food`` so callers
+    can use it in place of the ORM object.
+    """
+
+    to_dict = Food.to_dict
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_trigrams(text: str) -> Set[str]:
+    """
+    Trigrams as pg_trgm extracts them: per alphanumeric word, lowercased and
+    padded with two spaces in front and one behind.
+    """
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        grams |= _trigrams(f"  {word} ")
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """pg_trgm ``similarity()``: shared trigrams over all distinct trigrams of both strings."""
+    grams_a, grams_b = word_trigrams(a), word_trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class NutritionSnapshot:
+    """
+    Immutable lookup structures built from one read of the food table.
+
+    ``exact`` maps normalized names to the lowest-id row with that name, and
+    ``trigrams`` maps every 3-character substring of the lowercased names to
+    the rows containing it, which answers ``ILIKE '%name%'`` style queries by
+    intersecting a few small sets instead of scanning every row.
+
+    For ``/food/search`` without pg_trgm, ``word_grams`` is the same kind of
+    posting list over pg_trgm-style word trigrams (ranked fuzzy matches) and
+    ``sorted_names`` answers prefix queries with a binary search.
+    """
+
+    def __init__(self, records: List[FoodRecord], preload_names: Iterable[str] = ()):
+        self.records = sorted(records, key=lambda r: r.id)
+        self.exact: Dict[str, FoodRecord] = {}
+        self.trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self._lowered = [(r.food_product or "").lower() for r in self.records]
+        self._normalized = [normalize_food_name(r.food_product) for r in self.records]
+        self.word_grams: Dict[str, List[int]] = defaultdict(list)
+        self._gram_counts: List[int] = []
+        for position, record in enumerate(self.records):
+            self.exact.setdefault(self._normalized[position], record)
+            for gram in _trigrams(self._lowered[position]):
+                self.trigrams[gram].add(position)
+            grams = word_trigrams(self._normalized[position])
+            for gram in grams:
+                self.word_grams[gram].append(position)
+            self._gram_counts.append(len(grams))
+        self.sorted_names: List[Tuple[str, int]] = sorted(
+            (name, position) for position, name in enumerate(self._normalized) if name
+        )
+        # Classifier classes resolve to a single dictionary hit
+        self.resolved = {name: self.search(name) for name in preload_names}
+
+    def _substring(self, needle: str, haystack: List[str]) -> Optional[FoodRecord]:
+        if not needle:
+            return None
+        grams = _trigrams(needle)
+        if grams:
+            postings = [self.trigrams.get(gram, set()) for gram in grams]
+            candidates = sorted(set.intersection(*sorted(postings, key=len)))
+        else:
+            candidates = range(len(self.records))
+        for position in candidates:
+            if needle in haystack[position]:
+                return self.records[position]
+        return None
+
+    def search(self, food_name: str) -> Optional[FoodRecord]:
+        """
+        Find a food the way the SQL lookup did: exact name first, then the
+        lowest-id row whose name contains the query (case-insensitive).
+        """
+        normalized = normalize_food_name(food_name)
+        record = self.exact.get(normalized)
+        if record is not None:
+            return record
+        record = self._substring((food_name or "").lower(), self._lowered)
+        if record is None and normalized:
+            # Also match "aloo matar" against "aloo_matar_curry" style names
+            record = self._substring(normalized, self._normalized)
+        return record
+
+    def lookup(self, food_name: str) -> Optional[FoodRecord]:
+        if food_name in self.resolved:
+            return self.resolved[food_name]
+        return self.search(food_name)
+
+    def _prefix_positions(self, prefix: str) -> List[int]:
+        start = bisect.bisect_left(self.sorted_names, (prefix,))
+        positions = []
+        for name, position in self.sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            positions.append(position)
+        return positions
+
+    def complete(self, query: str, limit: int) -> List[Tuple[FoodRecord, float]]:
+        """
+        Autocomplete: foods whose normalized name starts with the normalized
+        query, shortest names first.
+
+        Returns:
+            Up to ``limit`` (record, similarity) pairs
+        """
+        prefix = normalize_food_name(query)
+        if not prefix:
+            return []
+        positions = sorted(self._prefix_positions(prefix),
+                           key=lambda position: (len(self._normalized[position]), self._normalized[position]))
+        return [(self.records[position], similarity(prefix, self._normalized[position]))
+                for position in positions[:limit]]
+
+    def fuzzy(self, query: str, limit: int, threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[FoodRecord, float]]:
+        """
+        Ranked fuzzy search, matching the pg_trgm query in ``models.food_search``:
+        prefix matches first, then trigram similarity of at least ``threshold``,
+        each ordered by descending similarity.
+
+        Returns:
+            Up to ``limit`` (record, similarity) pairs
+        """
+        normalized = normalize_food_name(query)
+        grams = word_trigrams(normalized)
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.word_grams.get(gram, ()))
+        scores = {
+            position: count / (len(grams) + self._gram_counts[position] - count)
+            for position, count in shared.items()
+        }
+        prefixed = set(self._prefix_positions(normalized))
+        matches = [position for position, score in scores.items() if score >= threshold or position in prefixed]
+        matches.sort(key=lambda position: (position not in prefixed, -scores[position], self.records[position].id))
+        return [(self.records[position], scores[position]) for position in matches[:limit]]
+
+
+class NutritionIndex:
+    """
+    Process-wide, lazily built index of the food table for nutrition lookups.
+
+    The table is small and nearly static, so it is read once into a
+    ``NutritionSnapshot`` and served from memory. The snapshot is rebuilt on
+    the next lookup after any committed ORM change to ``Food`` in this process,
+    or after ``ttl`` seconds to pick up changes made elsewhere.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[NutritionSnapshot] = None
+        self._built_at = 0.0
+        self._stale = True
+        self._preload_names: List[str] = []
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.lookups = 0
+
+    def preload(self, names: Iterable[str]):
+        """Names (e.g. the classifier's classes) to resolve eagerly on every rebuild."""
+        self._preload_names = list(dict.fromkeys(list(self._preload_names) + list(names)))
+        self.invalidate()
+
+    def invalidate(self):
+        """Mark the snapshot stale so the next lookup rebuilds it."""
+        self._stale = True
+
+    def _needs_rebuild(self) -> bool:
+        return self._snapshot is None or self._stale or time.monotonic() - self._built_at > self.ttl
+
+    def refresh(self, db: Session, force: bool = True) -> NutritionSnapshot:
+        """
+        Read the food table and swap in a new snapshot.
+
+        Args:
+            db: Database session
+            force: Rebuild even if the current snapshot is fresh. With False,
+                requests that queued on the lock behind another rebuild reuse
+                its snapshot instead of each reading the table again.
+        """
+        columns = [column.key for column in inspect(Food).column_attrs]
+        with self._lock:
+            if not force and not self._needs_rebuild():
+                return self._snapshot
+            # Clear the flag first so a change committed while we read triggers another rebuild
+            self._stale = False
+            try:
+                rows = db.query(*[getattr(Food, key) for key in columns]).order_by(Food.id).all()
+            except Exception:
+                self._stale = True
+                raise
+            records = [FoodRecord(**dict(zip(columns, row))) for row in rows]
+            snapshot = NutritionSnapshot(records, self._preload_names)
+            self._snapshot = snapshot
+            self._built_at = time.monotonic()
+            self.builds += 1
+        logger.info(f"Nutrition index built with {len(records)} foods")
+        return snapshot
+
+    def snapshot(self, db: Session) -> NutritionSnapshot:
+        snapshot = self._snapshot
+        if self._needs_rebuild():
+            snapshot = self.refresh(db, force=False)
+        return snapshot
+
+    def lookup(self, food_name: str, db: Session) -> Optional[FoodRecord]:
+        """
+        Nutrition record for ``food_name`` or None, rebuilding the snapshot first if stale.
+        """
+        self.lookups += 1
+        return self.snapshot(db).lookup(food_name)
+
+    def stats(self) -> Dict[str, object]:
+        snapshot = self._snapshot
+        return {
+            "foods": len(snapshot.records) if snapshot else 0,
+            "builds": self.builds,
+            "lookups": self.lookups,
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if snapshot else None,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Singleton instance
+_nutrition_index = None
+
+def get_nutrition_index() -> NutritionIndex:
+    """Get or create the nutrition index singleton."""
+    global _nutrition_index
+    if _nutrition_index is None:
+        _nutrition_index = NutritionIndex()
+    return _nutrition_index
+
+
+# Invalidate on committed changes to the food table made through the ORM
+_FOOD_CHANGED = "food_table_changed"
+
+def _mark_food_changed(mapper, connection, target):
+    Session.object_session(target).info[_FOOD_CHANGED] = True
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Food, _event_name, _mark_food_changed)
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_food_change(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert) \
+            and orm_execute_state.bind_mapper is not None \
+            and orm_execute_state.bind_mapper.class_ is Food:
+        orm_execute_state.session.info[_FOOD_CHANGED] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_FOOD_CHANGED, False):
+        get_nutrition_index().invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_FOOD_CHANGED, None)
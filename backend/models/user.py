@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Text, Date, DateTime, Enum, Index, Table
 from sqlalchemy.orm import relationship
 import datetime
 from .database import Base
@@ -57,6 +57,36 @@ class UserFoodLog(Base):
     # Relationships
     user = relationship("User", back_populates="food_logs")
     food = relationship("Food")
+    
+    # Serves the per-user history pages, ordered and paged by (date, id)
+    __table_args__ = (
+        Index("ix_user_food_logs_user_id_date_id", "user_id", "date", "id"),
+    )
+
+class UserDailyNutrition(Base):
+    """Per-user, per-day, per-meal nutrient totals of user_food_logs, kept up to date on log insert"""
+    __tablename__ = "user_daily_nutrition"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    meal_type = Column(String, primary_key=True)
+    entries = Column(Integer, nullable=False, default=0)  # Number of logs summed
+    
+    # Nutrient totals, each food's value scaled by the logged amount
+    energy = Column(Float, nullable=False, default=0.0)
+    carbohydrate = Column(Float, nullable=False, default=0.0)
+    protein = Column(Float, nullable=False, default=0.0)
+    total_fat = Column(Float, nullable=False, default=0.0)
+    sodium = Column(Float, nullable=False, default=0.0)
+    iron = Column(Float, nullable=False, default=0.0)
+
+# Foods a recommendation refers to (replaces the comma-separated food_ids column)
+food_recommendation_items = Table(
+    "food_recommendation_items",
+    Base.metadata,
+    Column("recommendation_id", Integer, ForeignKey("food_recommendations.id", ondelete="CASCADE"), primary_key=True),
+    Column("food_id", Integer, ForeignKey("food.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
 
 class FoodRecommendation(Base):
     __tablename__ = "food_recommendations"
@@ -64,10 +94,12 @@ class FoodRecommendation(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     recommendation_text = Column(Text)
-    food_ids = Column(String)  # Comma-separated list of food IDs
+    food_ids = Column(String)  # Legacy comma-separated food IDs; superseded by food_recommendation_items
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     source = Column(String)  # e.g., "llm", "rule-based", "image-based"
     context = Column(Text, nullable=True)  # Context used for generating recommendation
+    job_id = Column(String, nullable=True, unique=True, index=True)  # Deferred /image/predict job that produced it
     
     # Relationships
-    user = relationship("User", back_populates="food_recommendations") 
\ No newline at end of file
+    user = relationship("User", back_populates="food_recommendations")
+    foods = relationship("Food", secondary=food_recommendation_items, order_by="Food.id") 
\ No newline at end of file
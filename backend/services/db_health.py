@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = float(os.getenv("DB_HEALTH_INTERVAL", "30"))
+DEFAULT_SAMPLE_SIZE = 5
+
+# Probe outcomes
+UNKNOWN = "unknown"
+SUCCESS = "success"
+WARNING = "warning"
+ERROR = "error"
+
+MESSAGES = {
+    UNKNOWN: "Database has not been checked yet",
+    SUCCESS: "Database connection successful",
+    WARNING: "Database connection successful but no food data found",
+    ERROR: "Database connection failed",
+}
+
+
+class DBHealthMonitor:
+    """
+    Probe the database periodically on a background thread and cache the result.
+
+    Request handlers read the cached status instead of querying the database
+    themselves, so health information costs nothing on the request path.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any], interval: float = DEFAULT_INTERVAL,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE):
+        """
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session
+            interval: Seconds between probes
+            sample_size: Number of food names to include in the status
+        """
+        self.session_factory = session_factory
+        self.interval = interval
+        self.sample_size = sample_size
+        self._status: Dict[str, Any] = {"status": UNKNOWN, "message": MESSAGES[UNKNOWN], "checked_at": None}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def probe(self) -> Dict[str, Any]:
+        """Run one health check now, cache and return the result."""
+        # Imported here so the monitor doesn't pull in the ORM models at import time
+        from models.food import Food
+
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            db.execute(text("SELECT 1")).scalar()
+            food_count = db.query(Food).count()
+            sample_foods = [
+                row[0] for row in db.query(Food.food_product).order_by(Food.id).limit(self.sample_size).all()
+            ]
+            state = SUCCESS if food_count > 0 else WARNING
+            status = {"status": state, "food_count": food_count, "sample_foods": sample_foods}
+            if state == WARNING:
+                logger.warning("Database is connected but has no food data. It may not be properly initialized.")
+        except Exception as e:
+            logger.error(f"Database health check failed: {str(e)}")
+            status = {"status": ERROR, "error": str(e)}
+        finally:
+            db.close()
+
+        status["message"] = MESSAGES[status["status"]]
+        status["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        status["checked_at"] = time.time()
+        with self._lock:
+            self._status = status
+        return status
+
+    def status(self) -> Dict[str, Any]:
+        """Last probe result, without touching the database."""
+        with self._lock:
+            return dict(self._status)
+
+    def is_healthy(self) -> bool:
+        return self.status()["status"] in (SUCCESS, WARNING)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.probe()
+            except Exception as e:
+                logger.error(f"Unexpected error in database health monitor: {str(e)}", exc_info=True)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start probing in a daemon thread (the first probe runs immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-health-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Database health monitor started (interval {self.interval}s)")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Singleton instance
+_db_health_monitor = None
+
+def get_db_health_monitor() -> DBHealthMonitor:
+    """Get or create the database health monitor singleton."""
+    global _db_health_monitor
+    if _db_health_monitor is None:
+        from models.database import SessionLocal
+        _db_health_monitor = DBHealthMonitor(SessionLocal)
+    return _db_health_monitor
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "16"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "10"))
+
+
+class InferenceBatcher:
+    """
+    Collect concurrent single-item inference requests into one batched forward pass.
+
+    Each call to ``predict`` enqueues one input and awaits its own row of the
+    batched output. A single worker task drains the queue: it takes the first
+    pending item, then keeps collecting until either ``max_batch_size`` items
+    are gathered or ``max_wait_ms`` has elapsed, runs ``predict_fn`` once on the
+    stacked batch and fans the rows back to the waiting callers.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        runner: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            predict_fn: Callable taking a stacked ``(N, ...)`` array and returning ``(N, ...)`` outputs
+            max_batch_size: Upper bound on the number of items per forward pass
+            max_wait_ms: How long to wait for more items after the first one arrives
+            runner: Coroutine function used to run ``predict_fn`` off the event loop;
+                defaults to the loop's default executor
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self._runner = runner
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches_run = 0
+        self.items_processed = 0
+
+    async def predict(self, item: np.ndarray) -> np.ndarray:
+        """
+        Submit one input (without batch dimension) and wait for its output row.
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start (or restart) the worker task on the currently running loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            if self._loop is not loop:
+                self._queue = asyncio.Queue()
+                self._loop = loop
+            self._worker = loop.create_task(self._run())
+            logger.info(
+                f"Inference batcher started (max_batch_size={self.max_batch_size}, "
+                f"max_wait_ms={self.max_wait * 1000:.1f})"
+            )
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first item, then gather more until the batch is full or the window closes."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. client disconnected) don't need a forward pass
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        inputs = np.stack([item for item, _ in batch])
+        try:
+            if self._runner is not None:
+                outputs = await self._runner(self.predict_fn, inputs)
+            else:
+                outputs = await self._loop.run_in_executor(None, self.predict_fn, inputs)
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(batch)} items: {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.items_processed += len(batch)
+        logger.debug(f"Ran batched inference on {len(batch)} items")
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        """Return counters describing how well requests are being batched."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "average_batch_size": (
+                self.items_processed / self.batches_run if self.batches_run else 0.0
+            ),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def close(self):
+        """Stop the worker task; pending callers receive a cancellation."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
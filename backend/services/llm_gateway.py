@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo-0125")
+DEFAULT_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+DEFAULT_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+DEFAULT_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+DEFAULT_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+DEFAULT_BACKOFF_MAX = 8.0
+
+# Upstream errors worth retrying: timeouts, dropped connections, 429 and 5xx
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM is not configured, saturated, or failed after all retries."""
+
+
+class LLMGateway:
+    """
+    Single entry point for chat completion calls to the OpenAI API.
+
+    Owns one ``AsyncOpenAI`` client (and its pooled HTTP connections) for the
+    whole process, bounds every call with a timeout, caps the number of calls
+    in flight with a semaphore and retries transient failures with jittered
+    exponential backoff, so a slow upstream never ties up a server worker.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+    ):
+        """
+        Args:
+            api_key: OpenAI API key; defaults to OPENAI_API_KEY
+            base_url: API base URL; defaults to OPENAI_BASE_URL (or the public API)
+            model: Chat model used when a call doesn't name one
+            timeout: Seconds allowed for each upstream attempt
+            max_concurrency: Maximum calls in flight at once
+            queue_timeout: Seconds a call may wait for a free slot before failing
+            max_retries: Retries after the first attempt for transient errors
+            backoff_base: Base delay in seconds for the exponential backoff
+            backoff_max: Upper bound on a single backoff delay
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The shared async client, created on first use."""
+        if not self.configured:
+            raise LLMUnavailableError("OpenAI API key not configured")
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                # Retries are handled here so they share the concurrency limit and backoff policy
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency,
+                    )
+                ),
+            )
+            logger.info("Async OpenAI client initialized")
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given retry attempt (1-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    async def _acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMUnavailableError(f"Too many LLM requests in flight ({self.max_concurrency})")
+
+    async def _create(self, client: AsyncOpenAI, **request: Any):
+        """Create a completion, retrying transient errors with jittered backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await client.chat.completions.create(**request)
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise LLMUnavailableError(f"LLM request failed after {attempt} attempts: {e}") from e
+                delay = self._backoff(attempt)
+                self.retries += 1
+                logger.warning(f"LLM request failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        **params: Any,
+    ) -> str:
+        """
+        Run a chat completion and return the message content.
+
+        Args:
+            messages: Chat messages in OpenAI format
+            model: Model override; defaults to the gateway's model
+            **params: Extra completion parameters (temperature, max_tokens, ...)
+
+        Raises:
+            LLMUnavailableError: If the client isn't configured, no slot frees up in time
+                or every attempt failed with a transient error
+            openai.APIError: For non-retryable upstream errors (e.g. 400, 401)
+        """
+        client = self.client
+        await self._acquire()
+        self.in_flight += 1
+        self.calls += 1
+        try:
+            response = await self._create(client, model=model or self.model, messages=messages, **params)
+            return response.choices[0].message.content
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Run a streaming chat completion, yielding content deltas as they arrive.
+
+        Only opening the stream is retried; once tokens have been sent an upstream
+        error ends the stream with ``LLMUnavailableError``. Closing the generator
+        early (e.g. because the client disconnected) closes the upstream response
+        so the provider stops generating. The concurrency slot is held until then.
+        """
+        client = self.client
+        await self._acquire()
+        self.in_flight += 1
+        self.calls += 1
+        upstream = None
+        completed = False
+        try:
+            upstream = await self._create(
+                client, model=model or self.model, messages=messages, stream=True, **params
+            )
+            try:
+                async for chunk in upstream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except RETRYABLE_ERRORS as e:
+                raise LLMUnavailableError(f"LLM stream interrupted: {e}") from e
+            completed = True
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            logger.info("LLM stream closed before completion, cancelling upstream generation")
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            if upstream is not None and not completed:
+                await upstream.close()
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "configured": self.configured,
+            "model": self.model,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "cancelled_streams": self.cancelled,
+        }
+
+    async def close(self):
+        """Close the pooled HTTP connections."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Singleton instance
+_llm_gateway = None
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the LLM gateway singleton."""
+    global _llm_gateway
+    if _llm_gateway is None:
+        _llm_gateway = LLMGateway()
+    return _llm_gateway
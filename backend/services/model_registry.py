@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Load states reported on the readiness endpoint
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelEntry:
+    """A registered model: how to load it and what happened when we tried."""
+
+    def __init__(self, name: str, loader: Callable[[], Any], description: Optional[str] = None):
+        self.name = name
+        self.loader = loader
+        self.description = description
+        self.state = NOT_LOADED
+        self.value = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "description": self.description,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """
+    Lazily loaded ML models shared by the whole process.
+
+    Models are registered with a zero-argument loader and are only loaded on
+    the first ``get`` (or an explicit ``warm_up``), never at import time. Each
+    model loads at most once even when several threads ask for it concurrently;
+    a failed load is recorded and retried on the next ``get``.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], description: Optional[str] = None):
+        """Register a model loader under ``name`` (re-registering replaces an unloaded entry)."""
+        existing = self._entries.get(name)
+        if existing is not None and existing.state == READY:
+            return
+        self._entries[name] = ModelEntry(name, loader, description)
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the loaded model, loading it first if needed.
+
+        Raises:
+            KeyError: If no model is registered under ``name``
+            Exception: Whatever the loader raised if loading failed
+        """
+        entry = self._entries[name]
+        if entry.state == READY:
+            return entry.value
+        with entry.lock:
+            if entry.state == READY:
+                return entry.value
+            entry.state = LOADING
+            logger.info(f"Loading model '{name}'")
+            start = time.perf_counter()
+            try:
+                entry.value = entry.loader()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = str(e)
+                entry.load_seconds = time.perf_counter() - start
+                logger.error(f"Failed to load model '{name}': {e}", exc_info=True)
+                raise
+            entry.load_seconds = time.perf_counter() - start
+            entry.loaded_at = time.time()
+            entry.error = None
+            entry.state = READY
+            logger.info(f"Model '{name}' loaded in {entry.load_seconds:.2f}s")
+            return entry.value
+
+    def is_ready(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == READY
+
+    def warm_up(self, names: Iterable[str], retries: int = 0, retry_delay: float = 10.0) -> Dict[str, bool]:
+        """
+        Load the given models now, logging (not raising) failures.
+
+        Args:
+            names: Models to load
+            retries: How many more times to try models that failed to load
+            retry_delay: Seconds before the first retry; doubles after each one
+
+        Returns:
+            Mapping of model name to whether it loaded
+        """
+        names = list(names)
+        results = {}
+        for attempt in range(retries + 1):
+            # Unknown models can't start loading later, so only the first pass tries them
+            pending = [name for name in names if not results.get(name) and (attempt == 0 or name in self._entries)]
+            if not pending:
+                break
+            if attempt > 0:
+                delay = retry_delay * 2 ** (attempt - 1)
+                logger.warning(f"Retrying warm-up of {pending} in {delay:.0f}s (retry {attempt}/{retries})")
+                time.sleep(delay)
+            for name in pending:
+                if name not in self._entries:
+                    logger.warning(f"Skipping warm-up of unknown model '{name}'")
+                    results[name] = False
+                    continue
+                try:
+                    self.get(name)
+                    results[name] = True
+                except Exception:
+                    results[name] = False
+        return results
+
+    def failures(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Errors for the given models that failed their last load or aren't
+        registered. Models that are loading or not yet tried are left out.
+        """
+        errors = {}
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is None:
+                errors[name] = "Model is not registered"
+            elif entry.state == FAILED:
+                errors[name] = entry.error
+        return errors
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Load state and timing for every registered model."""
+        return {name: entry.to_dict() for name, entry in self._entries.items()}
+
+
+# Singleton instance
+_model_registry = None
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the model registry singleton."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
+
+
+def get_warmup_retries() -> Dict[str, float]:
+    """
+    Warm-up retry settings, from MODEL_WARMUP_RETRIES (default 3) and
+    MODEL_WARMUP_RETRY_DELAY (seconds before the first retry, default 10).
+    """
+    return {
+        "retries": int(os.getenv("MODEL_WARMUP_RETRIES", "3")),
+        "retry_delay": float(os.getenv("MODEL_WARMUP_RETRY_DELAY", "10")),
+    }
+
+
+def get_warmup_targets(default_targets: Iterable[str]) -> List[str]:
+    """
+    Models to load at startup, from MODEL_WARMUP.
+
+    MODEL_WARMUP is a comma-separated list of model names, "default" for the
+    models the app needs to serve /image/predict, "all" for every registered
+    model, or "none" to load everything lazily on first use.
+    """
+    setting = os.getenv("MODEL_WARMUP", "default").strip()
+    if not setting or setting.lower() == "none":
+        return []
+    if setting.lower() == "default":
+        return list(default_targets)
+    if setting.lower() == "all":
+        return get_model_registry().names()
+    return [name.strip() for name in setting.split(",") if name.strip()]
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "128"))
+DEFAULT_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "86400"))
+DEFAULT_CACHE_DIR = os.getenv("PREDICTION_CACHE_DIR", "")
+
+
+class PredictionCache:
+    """
+    Cache of image pipeline results keyed by the uploaded bytes.
+
+    Stores what depends only on the image and the models that processed it
+    (predicted class, confidence, volume estimate and masked overlay), so a
+    re-uploaded photo skips classification, depth estimation and PNG encoding.
+    Nutrition and recommendations are user-specific and are not cached here.
+
+    Entries live in an in-memory LRU/TTL cache and, if ``cache_dir`` is set,
+    also as JSON files on disk so they survive restarts and are shared between
+    worker processes.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.cache_dir = cache_dir or None
+        self.disk_hits = 0
+        self.disk_writes = 0
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.maxsize > 0 or self.cache_dir is not None
+
+    @staticmethod
+    def make_key(contents: bytes, *versions: str) -> str:
+        """
+        Cache key for an upload: SHA-256 of the image bytes plus the versions of
+        every model that contributed to the result.
+        """
+        digest = hashlib.sha256(contents)
+        for version in versions:
+            digest.update(b"\0")
+            digest.update(str(version).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable prediction cache file {path}: {e}")
+            self._remove(path)
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            self._remove(path)
+            return None
+        return entry.get("result")
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "result": result}, f)
+            # Atomic rename so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+            self.disk_writes += 1
+        except OSError as e:
+            logger.warning(f"Could not write prediction cache file {path}: {e}")
+            self._remove(tmp_path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached pipeline result for ``key``, checking memory then disk."""
+        result = self.memory.get(key)
+        if result is not None or not self.cache_dir:
+            return result
+        result = self._read_disk(key)
+        if result is not None:
+            self.disk_hits += 1
+            self.memory.set(key, result)
+        return result
+
+    def set(self, key: str, result: Dict[str, Any]):
+        """Store a pipeline result (must be JSON-serializable when the disk tier is on)."""
+        self.memory.set(key, result)
+        if self.cache_dir:
+            self._write_disk(key, result)
+
+    def clear(self):
+        """Drop every in-memory entry (disk files expire on their own)."""
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": {
+                "enabled": self.cache_dir is not None,
+                "hits": self.disk_hits,
+                "writes": self.disk_writes,
+            },
+        }
+
+
+# Singleton instance
+_prediction_cache = None
+
+def get_prediction_cache() -> PredictionCache:
+    """Get or create the prediction cache singleton."""
+    global _prediction_cache
+    if _prediction_cache is None:
+        _prediction_cache = PredictionCache()
+    return _prediction_cache
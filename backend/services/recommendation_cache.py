@@ -0,0 +1,307 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = os.getenv("RECOMMENDATION_CACHE_BACKEND", "memory").lower()
+DEFAULT_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "1024"))
+DEFAULT_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_CACHE_PATH = os.getenv("RECOMMENDATION_CACHE_PATH", "recommendation_cache.sqlite3")
+
+# Portion sizes are bucketed to the nearest PORTION_BUCKET_GRAMS when building keys
+PORTION_BUCKET_GRAMS = 50
+
+
+def _tokens(value: Any) -> Tuple[str, ...]:
+    """Sorted, de-duplicated lowercase items of a comma-separated string, list or enum."""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        items = value.split(",")
+    elif isinstance(value, Iterable):
+        items = list(value)
+    else:
+        items = [value]
+    tokens = set()
+    for item in items:
+        item = getattr(item, "value", item)
+        token = re.sub(r"\s+", " ", str(item).strip().lower())
+        if token and token != "none":
+            tokens.add(token)
+    return tuple(sorted(tokens))
+
+
+def _text(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value).strip().lower()) if value else ""
+
+
+def _age_band(age: Any) -> str:
+    try:
+        age = float(age)
+    except (TypeError, ValueError):
+        return ""
+    if age < 18:
+        return "under_18"
+    if age < 40:
+        return "18_39"
+    if age < 60:
+        return "40_59"
+    return "60_plus"
+
+
+def _bmi_band(weight: Any, height: Any) -> str:
+    try:
+        bmi = float(weight) / (float(height) / 100.0) ** 2
+    except (TypeError, ValueError, ZeroDivisionError):
+        return ""
+    if bmi < 18.5:
+        return "underweight"
+    if bmi < 25:
+        return "normal"
+    if bmi < 30:
+        return "overweight"
+    return "obese"
+
+
+def portion_bucket(grams: Optional[float]) -> Optional[int]:
+    """Round a portion size to the nearest bucket (e.g. 137g -> 150)."""
+    if grams is None:
+        return None
+    return int(round(float(grams) / PORTION_BUCKET_GRAMS) * PORTION_BUCKET_GRAMS)
+
+
+def canonical_profile(user_profile: Optional[Dict[str, Any]]) -> Tuple:
+    """
+    The parts of a profile that change a recommendation, in canonical form.
+
+    Health issues, allergies and dietary preferences become sorted token sets,
+    free-text fields are lowercased, and age and weight/height are reduced to
+    bands so users with the same profile shape share cache entries.
+    """
+    if not user_profile:
+        return ()
+    return (
+        ("health_issues", _tokens(user_profile.get("health_issues"))),
+        ("allergies", _tokens(user_profile.get("allergies"))),
+        ("dietary_preferences", _tokens(user_profile.get("dietary_preferences"))),
+        ("activity", _text(user_profile.get("physical_activity_level"))),
+        ("weight_goal", _text(user_profile.get("weight_goal"))),
+        ("age", _age_band(user_profile.get("age"))),
+        ("bmi", _bmi_band(user_profile.get("weight"), user_profile.get("height"))),
+    )
+
+
+def make_recommendation_key(
+    food_name: str,
+    portion_grams: Optional[float] = None,
+    user_profile: Optional[Dict[str, Any]] = None,
+    context: Optional[str] = None,
+) -> str:
+    """
+    Deterministic cache key for a recommendation request.
+
+    Args:
+        food_name: Predicted food class
+        portion_grams: Estimated portion, bucketed before hashing
+        user_profile: Profile dictionary as passed to the LLM prompt
+        context: Extra prompt context that isn't already captured by the portion
+    """
+    canonical = {
+        "food": _text(food_name).replace(" ", "_"),
+        "portion": portion_bucket(portion_grams),
+        "profile": canonical_profile(user_profile),
+        "context": _text(context),
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryRecommendationStore:
+    """Recommendations held in this process only."""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._cache), "maxsize": self._cache.maxsize, "ttl_seconds": self._cache.ttl}
+
+
+class SQLiteRecommendationStore:
+    """
+    Recommendations in a local SQLite file, shared by worker processes and kept across restarts.
+
+    Entries past their TTL are ignored and removed on read; when the table grows
+    beyond ``maxsize`` the least recently used entries are deleted.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, maxsize: int = DEFAULT_CACHE_SIZE,
+                 ttl: float = DEFAULT_CACHE_TTL):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recommendations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_recommendations_last_access ON recommendations (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        row = conn.execute("SELECT value, created_at FROM recommendations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        with conn:
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM recommendations WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE recommendations SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO recommendations (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            conn.execute(
+                "DELETE FROM recommendations WHERE key IN ("
+                "SELECT key FROM recommendations ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM recommendations")
+
+    def stats(self) -> Dict[str, Any]:
+        size = self._connection().execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+        return {"size": size, "maxsize": self.maxsize, "ttl_seconds": self.ttl, "path": self.path}
+
+
+class RecommendationCache:
+    """
+    Cache of LLM food recommendations keyed on ``make_recommendation_key``.
+
+    Wraps a pluggable store (memory or SQLite) and counts hits and misses.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    @property
+    def blocking(self) -> bool:
+        """True if lookups do I/O and should run off the event loop."""
+        return bool(self.store is not None and self.store.blocking)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.store is None:
+            return None
+        try:
+            value = self.store.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Recommendation cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        if self.store is None:
+            return
+        try:
+            self.store.set(key, value)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Recommendation cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": self.store.name if self.store is not None else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+        if self.store is not None:
+            try:
+                stats.update(self.store.stats())
+            except Exception as e:
+                logger.warning(f"Could not read recommendation cache stats: {e}")
+        return stats
+
+
+def create_recommendation_store(backend: str = DEFAULT_BACKEND):
+    """
+    Build the store for RECOMMENDATION_CACHE_BACKEND: "memory", "sqlite" or "none".
+    """
+    backend = (backend or "none").lower()
+    if backend == "memory":
+        return MemoryRecommendationStore()
+    if backend == "sqlite":
+        return SQLiteRecommendationStore()
+    if backend != "none":
+        logger.warning(f"Unknown recommendation cache backend '{backend}', caching disabled")
+    return None
+
+
+# Singleton instance
+_recommendation_cache = None
+
+def get_recommendation_cache() -> RecommendationCache:
+    """Get or create the recommendation cache singleton."""
+    global _recommendation_cache
+    if _recommendation_cache is None:
+        _recommendation_cache = RecommendationCache(create_recommendation_store())
+    return _recommendation_cache
@@ -0,0 +1,203 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_TTL = float(os.getenv("RECOMMENDATION_JOB_TTL", "3600"))
+DEFAULT_MAX_JOBS = int(os.getenv("RECOMMENDATION_MAX_JOBS", "10000"))
+
+# Job ids are uuid4 hex strings
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Job states
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class RecommendationJob:
+    """A recommendation being computed in the background for one /image/predict call."""
+
+    def __init__(self, job_id: str, user_id: Optional[int] = None, food_name: Optional[str] = None):
+        self.id = job_id
+        self.user_id = user_id
+        self.food_name = food_name
+        self.status = PENDING
+        self.result: Optional[Dict[str, Any]] = None
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        self.recommendation_id: Optional[int] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+
+    def visible_to(self, user_id: Optional[int]) -> bool:
+        """
+        Whether ``user_id`` (None for an anonymous caller) may read this job.
+        A signed-in user's job carries their health profile, so only they
+        can read it; an anonymous job is readable by whoever has its id.
+        """
+        return self.user_id is None or self.user_id == user_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "food_name": self.food_name,
+            "recommendations": self.result,
+            "source": self.source,
+            "error": self.error,
+            "recommendation_id": self.recommendation_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RecommendationJobStore:
+    """
+    In-process registry of deferred recommendation jobs.
+
+    Jobs are kept for ``ttl`` seconds (at most ``max_jobs`` of them) so clients
+    can poll or stream the result; the durable copy is the FoodRecommendation
+    row (tagged with the job id) written when a signed-in user's job completes,
+    which ``load_persisted_job`` reads when another worker, or this one after a
+    restart, doesn't have the job. Must be used from the event loop thread.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_JOB_TTL, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, RecommendationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.created_at >= cutoff and len(self._jobs) <= self.max_jobs:
+                break
+            self._jobs.popitem(last=False)
+
+    def create(self, user_id: Optional[int] = None, food_name: Optional[str] = None) -> RecommendationJob:
+        job = RecommendationJob(uuid.uuid4().hex, user_id, food_name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def restore(self, job_id: str, user_id: Optional[int], food_name: Optional[str], result: Dict[str, Any],
+                source: str, recommendation_id: int, finished_at: float) -> RecommendationJob:
+        """
+        Register a completed job read back by ``load_persisted_job``, so later
+        polls are served from memory. It is kept for ``ttl`` seconds from now,
+        however long ago it finished.
+        """
+        job = RecommendationJob(job_id, user_id, food_name)
+        self.complete(job, result, source, recommendation_id)
+        job.finished_at = finished_at
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[RecommendationJob]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def complete(self, job: RecommendationJob, result: Dict[str, Any], source: str,
+                 recommendation_id: Optional[int] = None):
+        job.result = result
+        job.source = source
+        job.recommendation_id = recommendation_id
+        job.status = COMPLETED
+        job.finished_at = time.time()
+        job._done.set()
+
+    def fail(self, job: RecommendationJob, error: str):
+        job.error = error
+        job.status = FAILED
+        job.finished_at = time.time()
+        job._done.set()
+
+    async def wait(self, job: RecommendationJob, timeout: Optional[float] = None) -> bool:
+        """Wait until the job finishes; returns False if ``timeout`` expired first."""
+        try:
+            await asyncio.wait_for(job._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "jobs": len(jobs),
+            "pending": sum(1 for job in jobs if job.status == PENDING),
+            "failed": sum(1 for job in jobs if job.status == FAILED),
+        }
+
+
+def load_persisted_job(db: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the FoodRecommendation row saved for a completed job.
+
+    Safe to call from a worker thread; pass the result to
+    ``RecommendationJobStore.restore`` on the event loop.
+
+    Args:
+        db: Database session
+        job_id: Job id from the /image/predict response
+
+    Returns:
+        The completed job's fields, or None if no row was saved for the job
+        (still running elsewhere, anonymous user, failed, or unknown id)
+    """
+    # Imported here so the job store doesn't pull in the ORM models at import time
+    from models.user import FoodRecommendation
+
+    if not JOB_ID_PATTERN.match(job_id or ""):
+        return None
+    record = db.query(FoodRecommendation)\
+        .options(selectinload(FoodRecommendation.foods))\
+        .filter(FoodRecommendation.job_id == job_id)\
+        .first()
+    if record is None:
+        return None
+    finished_at = record.created_at.replace(tzinfo=datetime.timezone.utc).timestamp() \
+        if record.created_at is not None else time.time()
+    return {
+        "job_id": job_id,
+        "user_id": record.user_id,
+        "food_name": record.foods[0].food_product if record.foods else None,
+        "result": json.loads(record.recommendation_text),
+        "source": record.source,
+        "recommendation_id": record.id,
+        "finished_at": finished_at,
+    }
+
+
+# Singleton instance
+_recommendation_jobs = None
+
+def get_recommendation_jobs() -> RecommendationJobStore:
+    """Get or create the recommendation job store singleton."""
+    global _recommendation_jobs
+    if _recommendation_jobs is None:
+        _recommendation_jobs = RecommendationJobStore()
+    return _recommendation_jobs
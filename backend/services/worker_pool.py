@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a bounded pool already has as much work as it is allowed to queue."""
+
+
+class BoundedExecutor:
+    """
+    A size-limited thread or process pool with a cap on queued work.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more may
+    wait for a free worker. Submitting beyond that raises ``PoolSaturatedError``
+    immediately instead of letting the backlog (and latency) grow without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "thread"):
+        """
+        Args:
+            name: Pool name, used for thread names and log messages
+            max_workers: Number of worker threads/processes
+            max_queue: Number of tasks allowed to wait for a free worker
+            kind: "thread" or "process"
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max(max_queue, 0)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            logger.info(
+                f"Started {self.kind} pool '{self.name}' "
+                f"(workers={self.max_workers}, max_queue={self.max_queue})"
+            )
+        return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(
+                    f"Worker pool '{self.name}' is saturated ({self._in_flight} tasks in flight)"
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def _submit(self, fn: Callable[..., Any], *args) -> Future:
+        self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # Release on the worker-side future so a cancelled caller doesn't free a
+        # slot that is still busy running its task
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run ``fn(*args)`` in the pool and await its result.
+
+        Raises:
+            PoolSaturatedError: If the pool has no room for another task
+        """
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def stats(self) -> dict:
+        """Return current load and counters for the pool."""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# Singleton pool for the CPU-bound stages of the image pipeline
+_image_pool = None
+
+def get_image_pool() -> BoundedExecutor:
+    """Get or create the image processing pool, sized from the environment."""
+    global _image_pool
+    if _image_pool is None:
+        _image_pool = BoundedExecutor(
+            name="image-worker",
+            max_workers=int(os.getenv("IMAGE_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            max_queue=int(os.getenv("IMAGE_POOL_MAX_QUEUE", "16")),
+            kind=os.getenv("IMAGE_POOL_KIND", "thread").lower(),
+        )
+    return _image_pool
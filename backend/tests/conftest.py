@@ -0,0 +1,63 @@
+from typing import Any, Callable, Iterable, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.auth import get_current_active_user
+from models.database import Base, get_db
+
+
+class TestApp:
+    """An app under test: its client, its in-memory database and an open session for setup and checks."""
+
+    __test__ = False  # not a test class, despite the name
+
+    def __init__(self, client: TestClient, engine, Session, db):
+        self.client = client
+        self.engine = engine
+        self.Session = Session
+        self.db = db
+
+
+@pytest.fixture
+def make_app() -> Callable[..., TestApp]:
+    """
+    Factory for a FastAPI app backed by an in-memory SQLite database.
+
+    Args (of the returned factory):
+        routers: Routers to include, as ``router`` or ``(router, prefix)``
+        tables: Models or ``Table`` objects to create
+        rows: Model instances to insert before the app is returned
+        current_user: If given, overrides ``get_current_active_user`` with it
+    """
+    def make(routers: Iterable[Any] = (), tables: Iterable[Any] = (), rows: Iterable[Any] = (),
+             current_user: Optional[Any] = None) -> TestApp:
+        # StaticPool shares the single in-memory connection with TestClient's threads
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[getattr(table, "__table__", table) for table in tables])
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add_all(list(rows))
+        db.commit()
+
+        def override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app = FastAPI()
+        for router in routers:
+            router, prefix = router if isinstance(router, tuple) else (router, "")
+            app.include_router(router, prefix=prefix)
+        app.dependency_overrides[get_db] = override_get_db
+        if current_user is not None:
+            app.dependency_overrides[get_current_active_user] = lambda: current_user
+        return TestApp(TestClient(app), engine, Session, db)
+
+    return make
@@ -0,0 +1,95 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth.auth import ALGORITHM, SECRET_KEY, create_access_token, get_current_user
+from auth.context import AuthCache, get_auth_cache
+from auth.models import HealthIssue
+from models.database import Base
+from models.food import Food  # noqa: F401 (mapper referenced by UserFoodLog)
+from models.user import User, UserProfile
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[User.__table__, UserProfile.__table__])
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, email="a@example.com", hashed_password="x"))
+    db.add(UserProfile(user_id=1, age=30, health_issues=HealthIssue.DIABETES))
+    db.commit()
+    statements.clear()
+    return db, statements
+
+
+def token_for(user_id, minutes=5):
+    return create_access_token({"sub": str(user_id)}, expires_delta=timedelta(minutes=minutes))
+
+
+def test_authenticate_caches_user_and_profile():
+    db, statements = make_session()
+    cache = AuthCache(SECRET_KEY, ALGORITHM, ttl=60)
+    token = token_for(1)
+
+    context = cache.authenticate(token, db)
+    assert context.user_id == 1 and context.user.email == "a@example.com"
+    assert context.profile["health_issues"] == "diabetes"
+    assert len(statements) == 1  # user and profile in one round trip
+
+    assert cache.authenticate(token, db) is context
+    assert cache.authenticate(token_for(1, minutes=10), db) is context
+    assert len(statements) == 1
+
+
+def test_invalidate_user_reloads_profile():
+    db, statements = make_session()
+    cache = AuthCache(SECRET_KEY, ALGORITHM, ttl=60)
+    token = token_for(1)
+    cache.authenticate(token, db)
+
+    db.query(UserProfile).filter(UserProfile.user_id == 1).one().health_issues = HealthIssue.OBESITY
+    db.commit()
+    assert cache.authenticate(token, db).profile["health_issues"] == "diabetes"
+    cache.invalidate_user(1)
+    assert cache.authenticate(token, db).profile["health_issues"] == "obesity"
+
+    db.query(UserProfile).delete()
+    db.query(User).delete()
+    db.commit()
+    cache.invalidate_user(1)
+    assert cache.authenticate(token, db) is None
+
+
+def test_token_expiry_is_respected():
+    db, _ = make_session()
+    cache = AuthCache(SECRET_KEY, ALGORITHM, ttl=60)
+    with pytest.raises(JWTError):
+        cache.authenticate(token_for(1, minutes=-1), db)
+    with pytest.raises(JWTError):
+        cache.authenticate("not-a-token", db)
+
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=1))
+    assert cache.authenticate(token, db) is not None
+    time.sleep(2.1)  # exp has whole-second resolution
+    with pytest.raises(JWTError):
+        cache.authenticate(token, db)
+
+
+def test_get_current_user_uses_shared_cache():
+    db, statements = make_session()
+    get_auth_cache().clear()
+    token = token_for(1)
+    assert get_current_user(token, db).id == 1
+    assert get_current_user(token, db).id == 1
+    assert len(statements) == 1
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token_for(2), db)
+    assert exc.value.status_code == 401
+    get_auth_cache().clear()
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.bulk_import import bulk_import, normalize_header, prepare_chunk
+from models.database import Base
+from models.food import Food
+
+SHEET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Sheet.csv")
+
+
+def make_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Food.__table__])
+    return engine
+
+
+def foods(engine):
+    db = sessionmaker(bind=engine)()
+    try:
+        return {food.food_product: food for food in db.query(Food).all()}
+    finally:
+        db.close()
+
+
+def test_headers_and_cleaning():
+    assert normalize_header("Food products") == "food_product"
+    assert normalize_header("Total Fat (g)") == "total_fat"
+    assert normalize_header("Protien") == "protein"
+    df = prepare_chunk(pd.DataFrame({
+        "Food products": ["idli", None, " ", "Idli ", "upma"],
+        "Energy": ["1", "2", "3", "4", "n/a"],
+        "Average volume": ["a", "b", "c", "d", "e"],
+    }))
+    assert list(df.columns) == ["food_product", "normalized_name", "energy"]
+    assert df.to_dict("records")[0] == {"food_product": "Idli ", "normalized_name": "idli", "energy": 4.0}
+    assert pd.isna(df.to_dict("records")[1]["energy"])
+
+
+def test_imports_sheet_in_chunks_and_upserts():
+    engine = make_engine()
+    stats = bulk_import(SHEET, engine, chunksize=5)
+    expected = pd.read_csv(SHEET).dropna(subset=["Food products"])
+    assert stats.inserted == len(expected) and stats.updated == 0
+    assert stats.chunks > 1 and stats.rows_per_sec > 0
+    idli = foods(engine)["idli"]
+    assert (idli.energy, idli.protein, idli.amount_unit) == (234.72, 7.36, "g")
+
+    stats = bulk_import(SHEET, engine)
+    assert stats.inserted == 0 and stats.updated == len(expected)
+    assert len(foods(engine)) == len(expected)
+
+
+def test_parquet_updates_only_given_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    engine = make_engine()
+    bulk_import(SHEET, engine)
+    path = tmp_path / "vendor.parquet"
+    pd.DataFrame({"name": ["IDLI", "poha"], "energy_kcal": [240.0, 180.0]}).to_parquet(path)
+
+    stats = bulk_import(str(path), engine)
+    assert (stats.updated, stats.inserted) == (1, 1)
+    rows = foods(engine)
+    assert (rows["idli"].energy, rows["idli"].protein) == (240.0, 7.36)
+    assert rows["poha"].energy == 180.0 and rows["poha"].protein is None
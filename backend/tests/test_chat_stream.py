@@ -0,0 +1,64 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from endpoints import chatbot
+from services.llm_gateway import LLMUnavailableError
+
+
+class FakeGateway:
+    configured = True
+
+    def __init__(self, deltas=(), error=None):
+        self.deltas = list(deltas)
+        self.error = error
+        self.closed = False
+
+    async def stream(self, messages, **params):
+        try:
+            if self.error:
+                raise self.error
+            for delta in self.deltas:
+                yield delta
+        finally:
+            self.closed = True
+
+
+def make_client(monkeypatch, gateway):
+    monkeypatch.setattr(chatbot, "get_llm_gateway", lambda: gateway)
+    app = FastAPI()
+    app.include_router(chatbot.router, prefix="/chat")
+    return TestClient(app)
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines.get("event", "message"), json.loads(lines["data"])))
+    return events
+
+
+def test_stream_forwards_deltas_as_sse(monkeypatch):
+    gateway = FakeGateway(["Dal ", "is ", "great"])
+    response = make_client(monkeypatch, gateway).post("/chat/chat/message/stream", json={"message": "dal?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_events(response.text) == [
+        ("message", {"delta": "Dal "}),
+        ("message", {"delta": "is "}),
+        ("message", {"delta": "great"}),
+        ("done", {}),
+    ]
+    assert gateway.closed
+
+
+def test_failure_before_first_token_is_an_http_error(monkeypatch):
+    gateway = FakeGateway(error=LLMUnavailableError("busy"))
+    response = make_client(monkeypatch, gateway).post("/chat/chat/message/stream", json={"message": "hi"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+    assert gateway.closed
@@ -0,0 +1,82 @@
+import datetime
+
+from sqlalchemy import event, select
+
+from endpoints import user_endpoint
+from models.daily_nutrition import rebuild_daily_nutrition
+from models.food import Food
+from models.user import User, UserDailyNutrition, UserFoodLog
+
+LOGS = [
+    # (food_id, amount, meal_type, date)
+    (1, 2.0, "Breakfast", "2024-05-06T08:00:00"),
+    (2, 1.0, "Breakfast", "2024-05-06T08:30:00"),
+    (2, 0.5, "Dinner", "2024-05-06T20:00:00"),
+    (1, 1.0, "Lunch", "2024-05-08T13:00:00"),
+    (2, 3.0, "Lunch", "2024-05-13T13:00:00"),
+]
+
+
+def make_client(make_app):
+    test_app = make_app(
+        routers=[user_endpoint.router],
+        tables=[User, Food, UserFoodLog, UserDailyNutrition],
+        rows=[
+            User(id=1, email="a@example.com", hashed_password="x"),
+            Food(id=1, food_product="idli", energy=100.0, protein=2.0, carbohydrate=20.0, total_fat=0.5),
+            Food(id=2, food_product="dal", energy=200.0, protein=10.0, carbohydrate=25.0, total_fat=5.0, iron=1.5),
+        ],
+        current_user=User(id=1, email="a@example.com", is_active=True),
+    )
+    client = test_app.client
+    for food_id, amount, meal_type, date in LOGS:
+        response = client.post("/users/me/food-logs", json={
+            "food_id": food_id, "amount": amount, "meal_type": meal_type, "date": date
+        })
+        assert response.status_code == 201
+    return client, test_app.engine, test_app.db
+
+
+def rollup_rows(db):
+    rows = db.execute(select(UserDailyNutrition).order_by(UserDailyNutrition.day, UserDailyNutrition.meal_type))
+    return [(r.day, r.meal_type, r.entries, r.energy, r.protein, r.iron) for r in rows.scalars()]
+
+
+def test_incremental_rollup_matches_rebuild(make_app):
+    _, _, db = make_client(make_app)
+    incremental = rollup_rows(db)
+    assert incremental[0] == (datetime.date(2024, 5, 6), "Breakfast", 2, 400.0, 14.0, 1.5)
+
+    rebuild_daily_nutrition(db)
+    db.commit()
+    assert rollup_rows(db) == incremental
+
+
+def test_daily_summary_in_one_query(make_app):
+    client, engine, _ = make_client(make_app)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    body = client.get("/users/me/nutrition-summary", params={
+        "date_from": "2024-05-01", "date_to": "2024-05-31", "by_meal": True
+    }).json()
+    assert len(statements) == 1
+
+    first = body["periods"][0]
+    assert first["start"] == "2024-05-06"
+    assert first["entries"] == 3 and first["energy"] == 500.0
+    assert first["meals"]["Dinner"]["energy"] == 100.0
+    assert [p["start"] for p in body["periods"]] == ["2024-05-06", "2024-05-08", "2024-05-13"]
+
+
+def test_weekly_summary_and_validation(make_app):
+    client, _, _ = make_client(make_app)
+    body = client.get("/users/me/nutrition-summary", params={
+        "date_from": "2024-05-01", "date_to": "2024-05-31", "period": "week"
+    }).json()
+    assert [(p["start"], p["entries"], p["energy"]) for p in body["periods"]] == [
+        ("2024-05-06", 4, 600.0), ("2024-05-13", 1, 600.0)
+    ]
+    assert client.get("/users/me/nutrition-summary", params={"period": "month"}).status_code == 422
+    assert client.get("/users/me/nutrition-summary", params={
+        "date_from": "2024-06-01", "date_to": "2024-05-01"
+    }).status_code == 400
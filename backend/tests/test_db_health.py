@@ -0,0 +1,58 @@
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.food import Food
+from services.db_health import ERROR, SUCCESS, UNKNOWN, WARNING, DBHealthMonitor
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Food.__table__])
+    return sessionmaker(bind=engine)
+
+
+def test_probe_caches_status():
+    Session = make_session_factory()
+    monitor = DBHealthMonitor(Session, sample_size=2)
+    assert monitor.status()["status"] == UNKNOWN
+    assert not monitor.is_healthy()
+
+    assert monitor.probe()["status"] == WARNING
+
+    db = Session()
+    db.add_all([Food(food_product=name) for name in ("idli", "samosa", "jalebi")])
+    db.commit()
+    db.close()
+
+    status = monitor.probe()
+    assert status["status"] == SUCCESS
+    assert status["food_count"] == 3
+    assert status["sample_foods"] == ["idli", "samosa"]
+    assert monitor.status() == status
+    assert monitor.is_healthy()
+
+
+def test_probe_reports_errors():
+    # No food table, so the count query fails
+    monitor = DBHealthMonitor(sessionmaker(bind=create_engine("sqlite://")))
+    status = monitor.probe()
+    assert status["status"] == ERROR
+    assert "error" in status
+    assert not monitor.is_healthy()
+
+
+def test_background_thread_probes_immediately():
+    monitor = DBHealthMonitor(make_session_factory(), interval=60)
+    monitor.start()
+    try:
+        for _ in range(100):
+            if monitor.status()["status"] != UNKNOWN:
+                break
+            time.sleep(0.01)
+        assert monitor.status()["status"] == WARNING
+    finally:
+        monitor.stop()
@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+
+from models.database import InstrumentedQueuePool, create_db_engine, engine_options, pool_status
+
+
+def test_options_from_settings():
+    options = engine_options("postgresql://user:pw@db/food_db", pool_size=2)
+    assert options["poolclass"] is InstrumentedQueuePool and options["pool_size"] == 2
+    assert options["pool_pre_ping"] and options["pool_recycle"] > 0
+    assert "poolclass" not in engine_options("sqlite://")
+
+
+def test_pool_reports_checkouts_waits_and_timeouts(tmp_path):
+    db_engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=0.2,
+        connect_args={"check_same_thread": False}
+    )
+    held = db_engine.connect()
+    held.execute(text("SELECT 1"))
+    status = pool_status(db_engine)
+    assert (status["size"], status["checked_out"], status["overflow"]) == (1, 1, 0)
+
+    with pytest.raises(sa_exc.TimeoutError):
+        db_engine.connect()
+    status = pool_status(db_engine)
+    assert status["timeouts"] == 1 and status["max_wait_ms"] >= 200
+
+    # A waiting checkout succeeds once the connection is returned
+    waiter = threading.Timer(0.05, held.close)
+    waiter.start()
+    with db_engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+    waiter.join()
+    status = pool_status(db_engine)
+    assert status["checkouts"] == 2 and status["checked_out"] == 0
+
+    db_engine.dispose()
+    assert pool_status(db_engine)["checkouts"] == 2
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.dedupe_foods import dedupe_foods, ensure_unique_index
+from models.database import Base
+from models.food import Food
+from models.user import User, UserFoodLog, FoodRecommendation, food_recommendation_items
+
+
+def make_legacy_session():
+    """A database as it was before normalized_name: no unique index, duplicate and blank names."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Food.__table__, UserFoodLog.__table__, FoodRecommendation.__table__, food_recommendation_items
+    ])
+    names = ["Idli", "upma", "idli ", "IDLI", None, " ", "Upma", "dosa"]
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_food_normalized_name"))
+        connection.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        for food_id, name in enumerate(names, start=1):
+            connection.execute(text("INSERT INTO food (id, food_product) VALUES (:id, :name)"),
+                               {"id": food_id, "name": name})
+        for log_id, food_id in enumerate([1, 3, 4, 6, 7], start=1):
+            connection.execute(text("INSERT INTO user_food_logs (id, user_id, food_id) VALUES (:id, 1, :food_id)"),
+                               {"id": log_id, "food_id": food_id})
+        connection.execute(text("INSERT INTO food_recommendations (id, user_id, recommendation_text, source) "
+                                "VALUES (1, 1, '{}', 'llm')"))
+        for food_id in [1, 3, 7]:
+            connection.execute(food_recommendation_items.insert().values(recommendation_id=1, food_id=food_id))
+    return engine, sessionmaker(bind=engine)()
+
+
+def test_dedupe_merges_in_batches_and_adds_index():
+    engine, db = make_legacy_session()
+    stats = dedupe_foods(db, batch_size=3)
+    assert stats.to_dict() == {"batches": 3, "named": 3, "merged": 3, "blank_deleted": 1, "blank_kept": 1}
+
+    foods = {food.id: food.normalized_name for food in db.query(Food)}
+    assert foods == {1: "idli", 2: "upma", 6: None, 8: "dosa"}  # 6 is blank but still logged
+    logs = dict(db.execute(select(UserFoodLog.id, UserFoodLog.food_id)).all())
+    assert logs == {1: 1, 2: 1, 3: 1, 4: 6, 5: 2}
+    links = db.execute(select(food_recommendation_items.c.food_id)).scalars().all()
+    assert sorted(links) == [1, 2]
+
+    assert dedupe_foods(db).to_dict()["merged"] == 0
+
+    ensure_unique_index(engine)
+    ensure_unique_index(engine)
+    assert "ix_food_normalized_name" in {index["name"] for index in inspect(engine).get_indexes("food")}
+    db.add(Food(food_product="Dosa"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+def test_new_foods_get_a_normalized_name():
+    assert Food(food_product="  Aloo-Matar ").normalized_name == "aloo_matar"
+    with pytest.raises(ValueError):
+        Food(food_product="  ")
@@ -0,0 +1,39 @@
+import pytest
+
+from utils import depth_backends
+from utils.depth_backends import (
+    CLASS_SERVING_VOLUMES, DEFAULT_SERVING_VOLUME, default_depth_backend, resolve_depth_backend, serving_volume_for
+)
+from utils.food_classifier import CLASS_NAMES
+
+
+def test_backend_names_and_tiers_resolve():
+    assert resolve_depth_backend("MiDaS_small") == "MiDaS_small"
+    assert resolve_depth_backend("midas_small") == "MiDaS_small"
+    assert resolve_depth_backend("fast") == "MiDaS_small"
+    assert resolve_depth_backend("HIGH") == "DPT_Large"
+    assert resolve_depth_backend("none") == "none"
+    with pytest.raises(ValueError):
+        resolve_depth_backend("ultra")
+
+
+def test_default_comes_from_depth_backend_setting(monkeypatch):
+    monkeypatch.setattr(depth_backends, "DEFAULT_DEPTH_BACKEND", "balanced")
+    assert resolve_depth_backend() == resolve_depth_backend("") == "DPT_Hybrid"
+
+    # A bad setting is a server error, not a bad request
+    monkeypatch.setattr(depth_backends, "DEFAULT_DEPTH_BACKEND", "DPT_Huge")
+    with pytest.raises(RuntimeError, match="DEPTH_BACKEND"):
+        default_depth_backend()
+    with pytest.raises(RuntimeError):
+        resolve_depth_backend()
+    assert resolve_depth_backend("fast") == "MiDaS_small"
+
+
+def test_every_class_has_a_serving_volume(caplog):
+    assert set(CLASS_SERVING_VOLUMES) == set(CLASS_NAMES)
+    assert serving_volume_for("chapati") == 50.0
+    assert serving_volume_for("palak_paneer") == DEFAULT_SERVING_VOLUME
+    assert "pizza" not in caplog.text
+    assert serving_volume_for("pizza") == DEFAULT_SERVING_VOLUME
+    assert "pizza" in caplog.text
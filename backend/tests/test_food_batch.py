@@ -0,0 +1,65 @@
+import datetime
+
+from jose import jwt
+
+from auth.context import get_auth_cache
+from auth.models import HealthIssue
+from endpoints import food_router
+from models.food import Food
+from models.user import User, UserProfile, UserFoodLog
+from tests.reference_food_recommendations import ReferenceFoodRecommendation
+
+
+def make_client(make_app):
+    foods = [Food(food_product=name, energy=100.0 + i) for i, name in enumerate(["jalebi", "idli", "samosa"])]
+    test_app = make_app(
+        routers=[(food_router.router, "/food")],
+        tables=[User, UserProfile, Food, UserFoodLog],
+        rows=foods + [User(id=1, email="a@example.com", hashed_password="x"),
+                      UserProfile(user_id=1, health_issues=HealthIssue.DIABETES)],
+    )
+    get_auth_cache().clear()
+    return test_app.client, test_app.db
+
+
+def auth_header(user_id=1):
+    return {"Authorization": f"Bearer {jwt.encode({'sub': str(user_id)}, 'food_iq_secret_key', algorithm='HS256')}"}
+
+
+def test_batch_matches_single_evaluation(make_app):
+    client, _ = make_client(make_app)
+    response = client.post("/food/recommendations/batch", json={
+        "foods": ["jalebi", "Idli", "pizza"], "health_conditions": ["Obesity", "none"]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["health_conditions"] == ["obesity"]
+    assert [r["found"] for r in body["results"]] == [True, True, False]
+    assert body["results"][0]["nutrition"]["energy"] == 100.0
+    for result, name in zip(body["results"], ["jalebi", "idli", "pizza"]):
+        assert result["recommendations"] == ReferenceFoodRecommendation(name, ["obesity"]).evaluate()
+
+
+def test_batch_uses_profile_and_food_log(make_app):
+    client, db = make_client(make_app)
+    food_id = db.query(Food).filter(Food.food_product == "samosa").one().id
+    db.add(UserFoodLog(user_id=1, food_id=food_id, amount=2.0, date=datetime.datetime(2024, 5, 1, 13, 0)))
+    db.add(UserFoodLog(user_id=1, food_id=food_id, amount=1.0, date=datetime.datetime(2024, 5, 2, 9, 0)))
+    db.commit()
+
+    response = client.post("/food/recommendations/batch", json={"foods": ["jalebi"], "log_date": "2024-05-01"},
+                           headers=auth_header())
+    assert response.status_code == 200
+    body = response.json()
+    assert body["health_conditions"] == ["diabetes"]
+    assert [r["food_name"] for r in body["results"]] == ["jalebi", "samosa"]
+    assert body["results"][1]["logged_amount"] == 2.0
+    assert body["results"][0]["recommendations"] == ReferenceFoodRecommendation("jalebi", ["diabetes"]).evaluate()
+
+
+def test_batch_rejects_empty_and_anonymous_log_requests(make_app):
+    client, _ = make_client(make_app)
+    assert client.post("/food/recommendations/batch", json={}).status_code == 400
+    assert client.post("/food/recommendations/batch", json={"log_date": "2024-05-01"}).status_code == 401
+    too_many = {"foods": ["idli"] * (food_router.MAX_BATCH_FOODS + 1)}
+    assert client.post("/food/recommendations/batch", json=too_many).status_code == 422
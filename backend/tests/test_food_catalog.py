@@ -0,0 +1,61 @@
+from sqlalchemy import event
+
+from endpoints import food_router
+from models.food import Food
+
+
+def make_client(make_app, count=7):
+    test_app = make_app(
+        routers=[(food_router.router, "/food")],
+        tables=[Food],
+        rows=[Food(food_product=f"food_{i}", energy=100.0 + i, protein=1.5) for i in range(count)],
+    )
+    return test_app.client, test_app.engine, test_app.Session
+
+
+def test_pages_through_catalog_with_cursor(make_app):
+    client, _, _ = make_client(make_app)
+    names, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/food/all", params=params).json()
+        names += [food["food_product"] for food in body["foods"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert names == [f"food_{i}" for i in range(7)]
+    assert set(body["foods"][0]) == set(food_router.DEFAULT_FOOD_FIELDS)
+    assert client.get("/food/all", params={"cursor": "bad"}).status_code == 400
+
+
+def test_fields_are_selected_in_sql(make_app):
+    client, engine, _ = make_client(make_app)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    response = client.get("/food/all", params={"fields": "food_product, energy"})
+    assert response.json()["foods"][0] == {"id": 1, "food_product": "food_0", "energy": 100.0}
+    page_query = statements[-1]
+    assert "food.energy" in page_query and "food.protein" not in page_query
+    assert client.get("/food/all", params={"fields": "energy,secret"}).status_code == 400
+
+
+def test_etag_returns_304_until_catalog_changes(make_app):
+    client, _, Session = make_client(make_app)
+    first = client.get("/food/all")
+    etag = first.headers["ETag"]
+    assert client.get("/food/all", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/food/all", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
+
+    db = Session()
+    db.get(Food, 3).energy = 1.0
+    db.commit()
+    changed = client.get("/food/all", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    db.delete(db.get(Food, 7))
+    db.commit()
+    assert client.get("/food/all", headers={"If-None-Match": changed.headers["ETag"]}).status_code == 200
+
+
+def test_empty_catalog_is_404(make_app):
+    client, _, _ = make_client(make_app, count=0)
+    assert client.get("/food/all").status_code == 404
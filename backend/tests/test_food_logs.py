@@ -0,0 +1,56 @@
+import datetime
+
+from sqlalchemy import event
+
+from endpoints import user_endpoint
+from models.food import Food
+from models.user import User, UserFoodLog
+
+
+def make_client(make_app):
+    start = datetime.datetime(2024, 5, 1, 8, 0)
+    rows = [User(id=1, email="a@example.com", hashed_password="x"), User(id=2, email="b@example.com", hashed_password="x")]
+    rows += [Food(id=i, food_product=f"food_{i}") for i in range(1, 4)]
+    # Pairs of logs share a timestamp so pages have to break ties on id
+    rows += [
+        UserFoodLog(user_id=1, food_id=i % 3 + 1, amount=float(i), date=start + datetime.timedelta(hours=i // 2))
+        for i in range(25)
+    ]
+    rows.append(UserFoodLog(user_id=2, food_id=1, amount=1.0, date=start))
+    test_app = make_app(
+        routers=[user_endpoint.router],
+        tables=[User, Food, UserFoodLog],
+        rows=rows,
+        current_user=User(id=1, email="a@example.com", is_active=True),
+    )
+
+    statements = []
+    event.listen(test_app.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return test_app.client, statements
+
+
+def test_pages_cover_history_in_order_with_one_query_each(make_app):
+    client, statements = make_client(make_app)
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        statements.clear()
+        body = client.get("/users/me/food-logs", params=params).json()
+        assert len(statements) == 1
+        seen.extend(body["food_logs"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert [log["amount"] for log in seen] == [float(i) for i in reversed(range(25))]
+    assert all(log["food"]["food_product"] == f"food_{int(log['amount']) % 3 + 1}" for log in seen)
+
+
+def test_date_filters_and_bad_cursor(make_app):
+    client, _ = make_client(make_app)
+    body = client.get("/users/me/food-logs", params={"date_from": "2024-05-01 18:00:00"}).json()
+    assert [log["amount"] for log in body["food_logs"]] == [24.0, 23.0, 22.0, 21.0, 20.0]
+    assert body["next_cursor"] is None
+    assert client.get("/users/me/food-logs", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,43 @@
+from itertools import combinations
+
+import pytest
+
+from reference_food_recommendations import ReferenceFoodRecommendation
+from utils.food_classifier import CLASS_NAMES
+from utils.food_recommendations import FoodRecommendation, get_rule_table
+
+CONDITIONS = ["none", "diabetes", "obesity", "cholesterol", "high-bp", "gluten intolerance", "acidity"]
+GOALS = ["obesity", "weight loss", "high protein", "maintain"]
+
+
+def subsets(values, max_size):
+    for size in range(max_size + 1):
+        yield from (list(combo) for combo in combinations(values, size))
+
+
+@pytest.mark.parametrize("food_name", CLASS_NAMES + ["paneer_butter_masala", "pizza"])
+def test_compiled_table_matches_reference(food_name):
+    for conditions in subsets(CONDITIONS, 3):
+        for goals in subsets(GOALS, 2):
+            expected = ReferenceFoodRecommendation(food_name, conditions, goals).evaluate()
+            actual = FoodRecommendation(food_name, conditions, goals).evaluate()
+            assert {**actual, "warnings": list(actual["warnings"]), "suggestions": list(actual["suggestions"])} \
+                == expected, (food_name, conditions, goals)
+
+
+def test_results_are_shared_and_read_only():
+    first = FoodRecommendation("samosa", ["obesity"]).evaluate()
+    second = FoodRecommendation("samosa", ["cholesterol", "diabetes"]).evaluate()
+    assert first is second
+    with pytest.raises(TypeError):
+        first["warnings"] = []
+
+
+def test_single_condition_string_and_enum_values():
+    from auth.models import HealthIssue
+
+    expected = FoodRecommendation("idli", ["diabetes"]).evaluate()
+    assert FoodRecommendation("idli", "diabetes").evaluate() is expected
+    assert FoodRecommendation("idli", [HealthIssue.DIABETES]).evaluate() is expected
+    assert FoodRecommendation("idli", '["Diabetes"]').evaluate() is expected
+    assert len(get_rule_table()) > 0
@@ -0,0 +1,48 @@
+from endpoints import food_router
+from models.food import Food
+from models.nutrition_index import get_nutrition_index, similarity
+
+FOODS = ["masala_dosa", "dosa", "idli", "paneer_tikka", "chicken_tikka", "dal_makhani", "dal_tadka", "jalebi"]
+
+
+def make_client(make_app):
+    test_app = make_app(
+        routers=[(food_router.router, "/food")],
+        tables=[Food],
+        rows=[Food(food_product=name, energy=100.0 + i) for i, name in enumerate(FOODS)],
+    )
+    get_nutrition_index().invalidate()
+    return test_app.client
+
+
+def names(response):
+    assert response.status_code == 200, response.text
+    return [result["food_product"] for result in response.json()["results"]]
+
+
+def test_similarity_matches_pg_trgm():
+    # Values from the pg_trgm documentation and psql
+    assert round(similarity("word", "two words"), 6) == 0.363636
+    assert similarity("dosa", "dosa") == 1.0
+    assert similarity("", "dosa") == 0.0
+
+
+def test_fuzzy_search_ranks_prefix_then_similarity(make_app):
+    client = make_client(make_app)
+    assert names(client.get("/food/search", params={"q": "Dosa"})) == ["dosa", "masala_dosa"]
+    assert names(client.get("/food/search", params={"q": "tikka"})) == ["paneer_tikka", "chicken_tikka"]
+    assert names(client.get("/food/search", params={"q": "jalebee"})) == ["jalebi"]
+    response = client.get("/food/search", params={"q": "pizza"})
+    assert response.json()["total"] == 0
+
+
+def test_prefix_search_and_limits(make_app):
+    client = make_client(make_app)
+    response = client.get("/food/search", params={"q": "dal", "mode": "prefix", "limit": 1})
+    assert names(response) == ["dal_tadka"]
+    result = response.json()["results"][0]
+    assert result["id"] and result["energy"] == 106.0 and 0 < result["score"] < 1
+    assert names(client.get("/food/search", params={"q": "dal ", "mode": "prefix"})) == ["dal_tadka", "dal_makhani"]
+    assert client.get("/food/search", params={"q": "dal", "limit": 51}).status_code == 422
+    assert client.get("/food/search", params={"q": "dal", "mode": "regex"}).status_code == 422
+    assert client.get("/food/search", params={"q": ""}).status_code == 422
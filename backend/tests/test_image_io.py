@@ -0,0 +1,33 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from utils.image_io import WORKING_SIZE, decode_upload, to_working_array
+
+
+def _jpeg_bytes(width=800, height=600):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_decode_upload_matches_disk_based_preprocessing():
+    contents = _jpeg_bytes()
+    classifier_input, working = decode_upload(contents, 224)
+
+    # Reference: what keras load_img(target_size=...) + img_to_array / 255 produces
+    reference = Image.open(io.BytesIO(contents)).convert("RGB").resize((224, 224), Image.NEAREST)
+    expected = np.asarray(reference, dtype=np.float32) / 255.0
+
+    assert classifier_input.shape == (224, 224, 3)
+    assert classifier_input.dtype == np.float32
+    np.testing.assert_array_equal(classifier_input, expected)
+    assert working.shape == (WORKING_SIZE[1], WORKING_SIZE[0], 3)
+
+
+def test_working_array_is_not_resized_twice():
+    _, working = decode_upload(_jpeg_bytes(), 224)
+    assert to_working_array(working) is working
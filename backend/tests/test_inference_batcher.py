@@ -0,0 +1,71 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from services.inference_batcher import InferenceBatcher
+
+
+def test_concurrent_requests_share_one_forward_pass():
+    """Requests arriving inside the wait window are stacked into a single batch."""
+    batch_sizes = []
+
+    def predict_fn(batch):
+        batch_sizes.append(len(batch))
+        return batch * 2
+
+    batcher = InferenceBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        inputs = [np.full((3,), i, dtype=np.float32) for i in range(5)]
+        outputs = await asyncio.gather(*(batcher.predict(x) for x in inputs))
+        await batcher.close()
+        return inputs, outputs
+
+    inputs, outputs = asyncio.run(run())
+
+    assert batch_sizes == [5]
+    for x, y in zip(inputs, outputs):
+        np.testing.assert_array_equal(y, x * 2)
+
+
+def test_batches_are_capped_at_max_batch_size():
+    batch_sizes = []
+
+    def predict_fn(batch):
+        batch_sizes.append(len(batch))
+        return batch
+
+    batcher = InferenceBatcher(predict_fn, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        await asyncio.gather(*(batcher.predict(np.zeros(2)) for _ in range(10)))
+        await batcher.close()
+
+    asyncio.run(run())
+
+    assert sum(batch_sizes) == 10
+    assert max(batch_sizes) <= 4
+
+
+def test_errors_are_propagated_to_every_caller():
+    def predict_fn(batch):
+        raise RuntimeError("boom")
+
+    batcher = InferenceBatcher(predict_fn, max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            *(batcher.predict(np.zeros(2)) for _ in range(3)), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_rejects_invalid_batch_size():
+    with pytest.raises(ValueError):
+        InferenceBatcher(lambda batch: batch, max_batch_size=0)
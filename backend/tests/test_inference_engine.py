@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from utils.export_classifier import check_parity
+from utils.inference_engine import InferenceEngine, load_inference_engine
+
+
+class _ScaledEngine(InferenceEngine):
+    def __init__(self, noise=0.0):
+        self.noise = noise
+
+    def predict(self, batch, **kwargs):
+        logits = batch.reshape(len(batch), -1)[:, :5] + self.noise
+        return logits / logits.sum(axis=1, keepdims=True)
+
+
+def test_parity_of_identical_engines():
+    samples = np.random.default_rng(1).random((10, 4, 4, 3), dtype=np.float32)
+    result = check_parity(_ScaledEngine(), _ScaledEngine(), samples, batch_size=4)
+    assert result["samples"] == 10
+    assert result["top1_agreement"] == 1.0
+    assert result["max_abs_diff"] == 0.0
+
+
+def test_parity_reports_differences():
+    samples = np.random.default_rng(2).random((6, 4, 4, 3), dtype=np.float32)
+    result = check_parity(_ScaledEngine(), _ScaledEngine(noise=0.5), samples)
+    assert result["max_abs_diff"] > 0.0
+
+
+def test_unknown_engine_and_missing_export():
+    with pytest.raises(ValueError):
+        load_inference_engine("tensorrt", "model.plan")
+    with pytest.raises(FileNotFoundError):
+        load_inference_engine("tflite", "/nonexistent/model.tflite")
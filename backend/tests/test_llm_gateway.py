@@ -0,0 +1,184 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.llm_gateway import LLMGateway, LLMUnavailableError
+
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    """Minimal /chat/completions endpoint driven by the server's ``script``."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append(body)
+            step = server.script.pop(0) if server.script else "ok"
+        if step == "slow":
+            time.sleep(0.5)
+        if step == "error":
+            self._send(500, {"error": {"message": "upstream failed"}})
+            return
+        if body.get("stream"):
+            self._stream(body, ["Eat ", "more ", "dal", "."] if step == "ok" else ["token "] * 200)
+            return
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": f"echo: {body['messages'][-1]['content']}"},
+            }],
+        })
+
+    def _stream(self, body, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for token in tokens:
+                chunk = {
+                    "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0,
+                    "model": body["model"],
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(0.01)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.server.completed_streams += 1
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.aborted_streams += 1
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout test)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAI)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = []
+    server.completed_streams = 0
+    server.aborted_streams = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_gateway(server, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return LLMGateway(api_key="test-key", base_url=f"http://127.0.0.1:{server.server_port}/v1", **kwargs)
+
+
+def ask(gateway, *messages):
+    async def run():
+        try:
+            return await asyncio.gather(*[
+                gateway.chat([{"role": "user", "content": message}]) for message in messages
+            ])
+        finally:
+            await gateway.close()
+    return asyncio.run(run())
+
+
+def test_retries_transient_errors(stub_server):
+    stub_server.script = ["error", "error"]
+    gateway = make_gateway(stub_server, max_retries=2)
+    assert ask(gateway, "hello") == ["echo: hello"]
+    assert len(stub_server.requests) == 3
+    assert gateway.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries(stub_server):
+    stub_server.script = ["error"] * 5
+    gateway = make_gateway(stub_server, max_retries=1)
+    with pytest.raises(LLMUnavailableError):
+        ask(gateway, "hello")
+    assert len(stub_server.requests) == 2
+
+
+def test_timeout_is_enforced(stub_server):
+    stub_server.script = ["slow"]
+    gateway = make_gateway(stub_server, timeout=0.1, max_retries=0)
+    start = time.perf_counter()
+    with pytest.raises(LLMUnavailableError):
+        ask(gateway, "hello")
+    assert time.perf_counter() - start < 0.45
+
+
+def test_concurrency_limit_rejects_when_saturated(stub_server):
+    stub_server.script = ["slow"] * 3
+    gateway = make_gateway(stub_server, max_concurrency=1, queue_timeout=0.1)
+    with pytest.raises(LLMUnavailableError):
+        ask(gateway, "a", "b")
+    assert gateway.stats()["rejected"] == 1
+
+
+def test_unconfigured_gateway(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    gateway = LLMGateway(base_url="http://127.0.0.1:1")
+    assert not gateway.configured
+    with pytest.raises(LLMUnavailableError):
+        ask(gateway, "hello")
+
+
+def test_stream_yields_tokens(stub_server):
+    stub_server.script = ["error"]
+    gateway = make_gateway(stub_server)
+
+    async def run():
+        try:
+            return [delta async for delta in gateway.stream([{"role": "user", "content": "hi"}])]
+        finally:
+            await gateway.close()
+
+    assert asyncio.run(run()) == ["Eat ", "more ", "dal", "."]
+    assert gateway.stats()["retries"] == 1
+    assert gateway.stats()["in_flight"] == 0
+
+
+def test_closing_stream_early_cancels_upstream(stub_server):
+    stub_server.script = ["long"]
+    gateway = make_gateway(stub_server)
+
+    async def run():
+        chunks = gateway.stream([{"role": "user", "content": "hi"}])
+        try:
+            first = await chunks.__anext__()
+            await chunks.aclose()
+            return first
+        finally:
+            await gateway.close()
+
+    assert asyncio.run(run()) == "token "
+    stats = gateway.stats()
+    assert stats["cancelled_streams"] == 1
+    assert stats["in_flight"] == 0
+    for _ in range(200):
+        if stub_server.aborted_streams:
+            break
+        time.sleep(0.01)
+    assert stub_server.aborted_streams == 1
+    assert stub_server.completed_streams == 0
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from services.model_registry import FAILED, NOT_LOADED, READY, ModelRegistry
+
+
+def test_models_load_lazily_and_only_once():
+    calls = []
+    registry = ModelRegistry()
+    registry.register("model", lambda: calls.append(1) or "loaded")
+
+    assert registry.status()["model"]["state"] == NOT_LOADED
+    assert calls == []
+
+    threads = [threading.Thread(target=registry.get, args=("model",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert registry.get("model") == "loaded"
+    status = registry.status()["model"]
+    assert status["state"] == READY
+    assert status["load_seconds"] is not None
+
+
+def test_failed_load_is_reported_and_retried():
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("download failed")
+        return "ok"
+
+    registry = ModelRegistry()
+    registry.register("flaky", loader)
+
+    assert registry.warm_up(["flaky"]) == {"flaky": False}
+    assert registry.status()["flaky"]["state"] == FAILED
+    assert "download failed" in registry.status()["flaky"]["error"]
+
+    assert registry.get("flaky") == "ok"
+    assert registry.is_ready("flaky")
+
+
+def test_unknown_model():
+    registry = ModelRegistry()
+    with pytest.raises(KeyError):
+        registry.get("missing")
+    assert registry.warm_up(["missing"]) == {"missing": False}
+
+
+def test_warm_up_retries_and_reports_failures():
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("download failed")
+        return "ok"
+
+    registry = ModelRegistry()
+    registry.register("flaky", loader)
+    registry.register("broken", lambda: 1 / 0)
+
+    assert registry.warm_up(["flaky", "broken", "missing"], retries=2, retry_delay=0) == {
+        "flaky": True, "broken": False, "missing": False
+    }
+    assert len(attempts) == 3
+    assert registry.failures(["flaky", "broken", "missing"]) == {
+        "broken": "division by zero", "missing": "Model is not registered"
+    }
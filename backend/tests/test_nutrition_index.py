@@ -0,0 +1,84 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.food import Food, normalize_food_name
+from models.food_queries import get_food_nutrition, query_food_nutrition
+from models.nutrition_index import NutritionIndex, get_nutrition_index
+
+FOODS = ["idli", "masala_dosa", "jalebi ", "chapati", "roti ", "paneer_tikka", "chicken_tikka"]
+
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Food.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add_all([Food(food_product=name, energy=100.0 + i) for i, name in enumerate(FOODS)])
+    session.commit()
+    return session
+
+
+def test_normalize_food_name():
+    assert normalize_food_name(" Jalebi ") == "jalebi"
+    assert normalize_food_name("aloo matar") == normalize_food_name("aloo_matar")
+
+
+def test_index_matches_sql_lookup():
+    db = make_session()
+    index = NutritionIndex(ttl=60)
+    index.preload(["idli", "jalebi", "kadai_paneer"])
+
+    for name in ["idli", "jalebi", "dosa", "TIKKA", "ti", "kadai_paneer", "pizza"]:
+        expected = query_food_nutrition(name, db)
+        if name == "jalebi":
+            # The stored name has a trailing space; normalization matches it exactly
+            expected = db.query(Food).filter(Food.food_product == "jalebi ").first()
+        found = index.lookup(name, db)
+        assert (found.id if found else None) == (expected.id if expected else None), name
+
+    assert index.builds == 1
+    assert index.lookup("idli", db).to_dict()["energy"] == 100.0
+
+
+def test_index_rebuilds_after_committed_changes():
+    db = make_session()
+    index = get_nutrition_index()
+    index.invalidate()
+    assert get_food_nutrition("upma", db) is None
+    builds = index.builds
+
+    db.add(Food(food_product="upma", energy=178.9))
+    db.flush()
+    assert get_food_nutrition("upma", db) is None  # not committed yet
+    db.commit()
+
+    assert get_food_nutrition("upma", db).energy == 178.9
+    assert index.builds == builds + 1
+
+
+def test_concurrent_lookups_share_one_rebuild():
+    db = make_session()
+    Session = sessionmaker(bind=db.get_bind())
+    index = NutritionIndex(ttl=60)
+    index.lookup("idli", db)
+    index._built_at -= index.ttl + 1  # age the snapshot past its TTL
+    # Slow reads down so every thread sees the expired snapshot before the first rebuild finishes
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: time.sleep(0.05))
+    start = threading.Barrier(8)
+    found = []
+
+    def lookup():
+        start.wait()
+        found.append(index.lookup("idli", Session()))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(found) == 8 and all(found)
+    assert index.builds == 2
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import auth.auth
+from auth.auth import get_password_hash_pooled, verify_password_pooled
+from endpoints import auth_endpoint
+from models.food import Food  # noqa: F401 (mapper referenced by UserFoodLog)
+from models.user import User, UserProfile
+from services.worker_pool import BoundedExecutor
+
+
+def make_client(make_app):
+    return make_app(routers=[auth_endpoint.router], tables=[User, UserProfile]).client
+
+
+def test_hashing_runs_in_password_pool():
+    completed = auth.auth.get_password_pool().completed
+    hashed = asyncio.run(get_password_hash_pooled("correct horse"))
+    assert hashed.startswith("$2b$")
+    assert asyncio.run(verify_password_pooled("correct horse", hashed))
+    assert not asyncio.run(verify_password_pooled("wrong", hashed))
+    assert auth.auth.get_password_pool().completed == completed + 3
+
+
+def test_waiting_logins_do_not_hold_threadpool_threads():
+    # Handlers are async: hashes wait on the password pool, not in the threadpool
+    for handler in (auth_endpoint.register_user, auth_endpoint.register_user_with_profile,
+                    auth_endpoint.login_for_access_token):
+        assert asyncio.iscoroutinefunction(handler)
+
+
+def test_register_and_login(make_app):
+    client = make_client(make_app)
+    response = client.post("/auth/register", json={"email": "a@example.com", "password": "password123"})
+    assert response.status_code == 201
+    response = client.post("/auth/token", data={"username": "a@example.com", "password": "password123"})
+    assert response.status_code == 200 and response.json()["token_type"] == "bearer"
+    response = client.post("/auth/token", data={"username": "a@example.com", "password": "wrong-password"})
+    assert response.status_code == 401
+    response = client.post("/auth/register", json={"email": "a@example.com", "password": "password123"})
+    assert response.status_code == 400
+
+
+def test_register_with_profile(make_app):
+    client = make_client(make_app)
+    profile = {"name": "A", "age": 30, "number": "123", "weight": 60.0, "height": 165.0}
+    response = client.post("/auth/register-with-profile",
+                           json={"email": "b@example.com", "password": "password123", "profile": profile})
+    assert response.status_code == 201
+    response = client.post("/auth/token", data={"username": "b@example.com", "password": "password123"})
+    assert response.status_code == 200
+
+
+def test_saturated_pool_returns_503(make_app, monkeypatch):
+    client = make_client(make_app)
+    pool = BoundedExecutor("password-hash-test", max_workers=1, max_queue=0)
+    monkeypatch.setattr(auth.auth, "_password_pool", pool)
+    release = threading.Event()
+    busy = threading.Thread(target=lambda: asyncio.run(pool.run(release.wait)))
+    busy.start()
+    try:
+        while pool.stats()["in_flight"] == 0:
+            time.sleep(0.01)
+        response = client.post("/auth/register", json={"email": "a@example.com", "password": "password123"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        busy.join()
+        pool.shutdown()
@@ -0,0 +1,48 @@
+from services.prediction_cache import PredictionCache
+from utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+
+
+def test_key_depends_on_image_and_model_versions():
+    key = PredictionCache.make_key(b"jpeg", "keras:model.h5:1", "DPT_Large")
+    assert key == PredictionCache.make_key(b"jpeg", "keras:model.h5:1", "DPT_Large")
+    assert key != PredictionCache.make_key(b"jpeg", "keras:model.h5:2", "DPT_Large")
+    assert key != PredictionCache.make_key(b"jpeg", "keras:model.h5:1", "MiDaS_small")
+    assert key != PredictionCache.make_key(b"other", "keras:model.h5:1", "DPT_Large")
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    result = {"predicted_food": "idli", "confidence": 0.9, "volume_ml": 120.0, "masked_image": "abc"}
+    key = PredictionCache.make_key(b"jpeg", "v1")
+    PredictionCache(maxsize=4, ttl=60, cache_dir=str(tmp_path)).set(key, result)
+
+    fresh = PredictionCache(maxsize=4, ttl=60, cache_dir=str(tmp_path))
+    assert fresh.get(key) == result
+    assert fresh.stats()["disk"]["hits"] == 1
+
+    expired = PredictionCache(maxsize=4, ttl=-1, cache_dir=str(tmp_path))
+    assert expired.get(key) is None
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+from services.recommendation_cache import (
+    MemoryRecommendationStore, RecommendationCache, SQLiteRecommendationStore, make_recommendation_key
+)
+from utils.food_recommendations_llm import FoodRecommendationLLM
+
+PROFILE = {
+    "age": 34, "weight": 70, "height": 175, "health_issues": "diabetes",
+    "allergies": "Peanuts, milk", "physical_activity_level": "Active",
+    "weight_goal": "lose", "dietary_preferences": None,
+}
+
+
+class FakeGateway:
+    configured = True
+
+    def __init__(self, reply=None):
+        self.calls = 0
+        self.reply = reply
+
+    async def chat(self, messages, **params):
+        self.calls += 1
+        if self.reply is not None:
+            return self.reply
+        return json.dumps({"is_safe": True, "warnings": [], "suggestions": [], "approval_message": "ok"})
+
+
+def test_key_canonicalizes_profile_and_portion():
+    same_shape = dict(PROFILE, age=38, weight=72, allergies="milk,peanuts ", physical_activity_level=" active")
+    assert make_recommendation_key("idli", 140, PROFILE) == make_recommendation_key("idli", 160, same_shape)
+    assert make_recommendation_key("idli", 140, PROFILE) != make_recommendation_key("idli", 240, PROFILE)
+    assert make_recommendation_key("idli", 140, PROFILE) != make_recommendation_key(
+        "idli", 140, dict(PROFILE, health_issues="obesity"))
+    assert make_recommendation_key("idli", 140, PROFILE) != make_recommendation_key("samosa", 140, PROFILE)
+    assert make_recommendation_key("idli", 140, None) != make_recommendation_key("idli", 140, PROFILE)
+
+
+def test_sqlite_store_persists_and_bounds_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    store = SQLiteRecommendationStore(path=path, maxsize=2, ttl=60)
+    for key in ("a", "b", "c"):
+        store.set(key, {"key": key})
+    reopened = SQLiteRecommendationStore(path=path, maxsize=2, ttl=60)
+    assert reopened.stats()["size"] == 2
+    assert reopened.get("a") is None
+    assert reopened.get("c") == {"key": "c"}
+
+    expired = SQLiteRecommendationStore(path=path, maxsize=2, ttl=-1)
+    assert expired.get("c") is None
+
+
+def test_llm_is_called_once_per_profile_shape(tmp_path):
+    gateway = FakeGateway()
+    for store in (MemoryRecommendationStore(maxsize=8, ttl=60),
+                  SQLiteRecommendationStore(path=str(tmp_path / "llm.sqlite3"))):
+        gateway.calls = 0
+        cache = RecommendationCache(store)
+        llm = FoodRecommendationLLM(gateway=gateway, cache=cache)
+
+        async def run():
+            first = await llm.get_recommendation("idli", {"energy": 230}, PROFILE, "Estimated portion size: 140.0g", 140)
+            first["warnings"].append("mutated by caller")
+            second = await llm.get_recommendation("idli", {"energy": 240}, dict(PROFILE, age=30), "Estimated portion size: 155.0g", 155)
+            return second
+
+        second = asyncio.run(run())
+        assert gateway.calls == 1
+        assert second["warnings"] == []
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+def test_unparsed_replies_are_not_cached():
+    gateway = FakeGateway(reply="Looks fine to me!")
+    cache = RecommendationCache(MemoryRecommendationStore(maxsize=8, ttl=60))
+    llm = FoodRecommendationLLM(gateway=gateway, cache=cache)
+
+    async def run():
+        for _ in range(2):
+            recommendation = await llm.get_recommendation("idli", {"energy": 230}, PROFILE, None, 140)
+        return recommendation
+
+    recommendation = asyncio.run(run())
+    assert recommendation["parsed"] is False and recommendation["approval_message"] == "Looks fine to me!"
+    assert gateway.calls == 2
+    assert cache.stats()["hits"] == 0
@@ -0,0 +1,52 @@
+from sqlalchemy import event, select
+
+from db.migrate_recommendation_foods import migrate_recommendation_foods, parse_food_ids
+from endpoints import user_endpoint
+from models.food import Food
+from models.user import User, UserDailyNutrition, UserFoodLog, UserProfile, FoodRecommendation, food_recommendation_items
+
+
+def make_client(make_app):
+    rows = [User(id=1, email="a@example.com", hashed_password="x")]
+    rows += [Food(id=i, food_product=f"food_{i}") for i in range(1, 6)]
+    rows += [
+        FoodRecommendation(id=i, user_id=1, recommendation_text="{}", source="llm", food_ids=f"{i},{i % 5 + 1}, 99,x")
+        for i in range(1, 11)
+    ]
+    rows.append(FoodRecommendation(id=11, user_id=1, recommendation_text="{}", source="llm", food_ids=""))
+    return make_app(
+        routers=[user_endpoint.router],
+        tables=[User, UserProfile, Food, UserFoodLog, UserDailyNutrition, FoodRecommendation, food_recommendation_items],
+        rows=rows,
+        current_user=User(id=1, email="a@example.com", is_active=True),
+    )
+
+
+def test_parse_food_ids():
+    assert parse_food_ids("3, 1,3,,x") == [3, 1]
+    assert parse_food_ids(None) == []
+
+
+def test_migration_is_idempotent(make_app):
+    db = make_client(make_app).db
+    assert migrate_recommendation_foods(db, batch_size=3) == 15  # ids 6-10 and 99 are not foods
+    assert migrate_recommendation_foods(db, batch_size=3) == 0
+    links = db.execute(select(food_recommendation_items).where(food_recommendation_items.c.recommendation_id == 5)).all()
+    assert sorted(link.food_id for link in links) == [1, 5]
+
+
+def test_recommendations_page_uses_two_queries(make_app):
+    test_app = make_client(make_app)
+    client, db = test_app.client, test_app.db
+    migrate_recommendation_foods(db)
+
+    statements = []
+    event.listen(test_app.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    body = client.get("/users/me/recommendations", params={"limit": 20}).json()
+    assert len(statements) == 2
+    items = {rec["id"]: [food["food_product"] for food in rec["food_items"]] for rec in body["recommendations"]}
+    assert items[2] == ["food_2", "food_3"]
+    assert items[11] == []
+
+    assert client.delete("/users/me").status_code == 204
+    assert db.execute(select(food_recommendation_items)).all() == []
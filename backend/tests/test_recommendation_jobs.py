@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base
+from models.food import Food
+from models.user import User, FoodRecommendation, food_recommendation_items
+from services.recommendation_jobs import COMPLETED, FAILED, PENDING, RecommendationJobStore, load_persisted_job
+
+
+def test_waiters_are_woken_when_the_job_completes():
+    store = RecommendationJobStore(ttl=60)
+
+    async def run():
+        job = store.create(user_id=1, food_name="idli")
+        assert store.get(job.id).status == PENDING
+        assert not await store.wait(job, timeout=0.01)
+
+        async def finish():
+            await asyncio.sleep(0.01)
+            store.complete(job, {"is_safe": True}, "llm", recommendation_id=7)
+
+        asyncio.get_running_loop().create_task(finish())
+        assert await store.wait(job, timeout=1)
+        return store.get(job.id).to_dict()
+
+    result = asyncio.run(run())
+    assert result["status"] == COMPLETED
+    assert result["recommendations"] == {"is_safe": True}
+    assert result["recommendation_id"] == 7
+
+
+def test_failed_and_expired_jobs():
+    store = RecommendationJobStore(ttl=60, max_jobs=2)
+
+    async def run():
+        first = store.create()
+        store.fail(first, "boom")
+        assert store.get(first.id).status == FAILED
+        store.create()
+        store.create()
+        return first
+
+    first = asyncio.run(run())
+    assert store.get(first.id) is None  # evicted once more than max_jobs exist
+    assert store.stats()["jobs"] == 2
+
+
+def test_finished_jobs_are_restored_from_the_database():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Food.__table__, FoodRecommendation.__table__, food_recommendation_items
+    ])
+    db = sessionmaker(bind=engine)()
+    job_id = "0123456789abcdef0123456789abcdef"
+    db.add(User(id=1, email="a@example.com", hashed_password="x"))
+    idli = Food(id=1, food_product="idli")
+    db.add(FoodRecommendation(
+        id=5, user_id=1, recommendation_text='{"is_safe": true}', source="llm", job_id=job_id, foods=[idli]
+    ))
+    db.commit()
+
+    assert load_persisted_job(db, "f" * 32) is None
+    assert load_persisted_job(db, "not-a-job") is None
+    persisted = load_persisted_job(db, job_id)
+
+    # Another worker's store doesn't know the job; restoring it serves later polls from memory
+    store = RecommendationJobStore(ttl=60)
+
+    async def run():
+        assert store.get(job_id) is None
+        job = store.restore(**persisted)
+        assert await store.wait(job, timeout=0.01)
+        return store.get(job_id).to_dict()
+
+    persisted["finished_at"] = time.time() - 120  # finished longer ago than the store keeps jobs
+    result = asyncio.run(run())
+    assert result["status"] == COMPLETED
+    assert (result["food_name"], result["recommendation_id"], result["source"]) == ("idli", 5, "llm")
+    assert result["recommendations"] == {"is_safe": True}
+    assert result["finished_at"] == persisted["finished_at"]
+
+
+def test_jobs_are_visible_to_their_owner_only():
+    store = RecommendationJobStore(ttl=60)
+
+    async def run():
+        return store.create(user_id=1), store.create()
+
+    owned, anonymous = asyncio.run(run())
+    assert owned.visible_to(1)
+    assert not owned.visible_to(2) and not owned.visible_to(None)
+    assert anonymous.visible_to(None) and anonymous.visible_to(2)
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.worker_pool import BoundedExecutor, PoolSaturatedError
+
+
+def test_run_returns_result():
+    pool = BoundedExecutor("test", max_workers=2, max_queue=2)
+    try:
+        assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+    finally:
+        pool.shutdown()
+
+
+def test_rejects_work_beyond_workers_plus_queue():
+    pool = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        second = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(first, second)
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
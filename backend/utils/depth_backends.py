@@ -0,0 +1,127 @@
+import logging
+import os
+from typing import Optional
+
+from utils.food_classifier import CLASS_NAMES
+
+logger = logging.getLogger(__name__)
+
+class DepthBackend:
+    """
+    A selectable depth estimation model and the MiDaS transform that matches it.
+
+    ``hub_model`` is None for backends that don't run a depth network at all.
+    """
+
+    def __init__(self, name: str, hub_model: Optional[str] = None, transform_name: Optional[str] = None):
+        self.name = name
+        self.hub_model = hub_model
+        self.transform_name = transform_name
+
+    @property
+    def uses_depth(self) -> bool:
+        return self.hub_model is not None
+
+# Registered depth backends, slowest/most accurate first
+DEPTH_BACKENDS = {
+    "DPT_Large": DepthBackend("DPT_Large", "DPT_Large", "dpt_transform"),
+    "DPT_Hybrid": DepthBackend("DPT_Hybrid", "DPT_Hybrid", "dpt_transform"),
+    "MiDaS_small": DepthBackend("MiDaS_small", "MiDaS_small", "small_transform"),
+    # No depth network: the portion is assumed to be one standard serving of the predicted class
+    "none": DepthBackend("none"),
+}
+
+# Quality tiers accepted per request, mapped to backends
+QUALITY_TIERS = {
+    "high": "DPT_Large",
+    "balanced": "DPT_Hybrid",
+    "fast": "MiDaS_small",
+    "none": "none",
+}
+
+DEFAULT_DEPTH_BACKEND = os.getenv("DEPTH_BACKEND", "DPT_Large")
+
+# Standard serving sizes (g, assuming 1g/ml) from the Sheet.csv "Amount" column
+SHEET_SERVING_VOLUMES = {
+    "aloo_matar": 150.0, "appam": 150.0, "bhindi_masala": 100.0, "biryani": 150.0,
+    "butter_chicken": 150.0, "chapati": 50.0, "chicken_tikka": 100.0, "chole_bhature": 150.0,
+    "dal_makhani": 150.0, "dhokla": 50.0, "gulab_jamun": 50.0, "idli": 150.0, "jalebi": 50.0,
+    "kaathi_rolls": 100.0, "kadai_paneer": 100.0, "masala_dosa": 150.0, "mysore_pak": 50.0,
+    "pakode": 100.0, "paani_puri": 100.0, "pav_bhaji": 150.0, "samosa": 50.0,
+}
+DEFAULT_SERVING_VOLUME = 150.0
+
+# One entry per classifier class; classes missing from Sheet.csv get the default serving
+CLASS_SERVING_VOLUMES = {
+    name: SHEET_SERVING_VOLUMES.get(name, DEFAULT_SERVING_VOLUME) for name in CLASS_NAMES
+}
+_classes_without_serving = [name for name in CLASS_NAMES if name not in SHEET_SERVING_VOLUMES]
+if _classes_without_serving:
+    logger.warning(
+        f"No standard serving size for classes {_classes_without_serving}; "
+        f"using {DEFAULT_SERVING_VOLUME}ml for them"
+    )
+
+def _match_backend(selection: str) -> Optional[str]:
+    """Backend name for a backend name or quality tier (case-insensitive), or None."""
+    if selection in DEPTH_BACKENDS:
+        return selection
+    tier = selection.lower()
+    if tier in QUALITY_TIERS:
+        return QUALITY_TIERS[tier]
+    for name in DEPTH_BACKENDS:
+        if name.lower() == tier:
+            return name
+    return None
+
+def default_depth_backend() -> str:
+    """
+    The backend configured with DEPTH_BACKEND.
+
+    Raises:
+        RuntimeError: If DEPTH_BACKEND is not a known backend or tier. This is
+            a server misconfiguration; it is checked at startup.
+    """
+    name = _match_backend(DEFAULT_DEPTH_BACKEND)
+    if name is None:
+        raise RuntimeError(
+            f"DEPTH_BACKEND='{DEFAULT_DEPTH_BACKEND}' is not a known depth backend. "
+            f"Choose one of {list(DEPTH_BACKENDS)} or a quality tier {list(QUALITY_TIERS)}"
+        )
+    return name
+
+def resolve_depth_backend(selection: Optional[str] = None) -> str:
+    """
+    Resolve a backend name or quality tier to a registered backend name.
+
+    Args:
+        selection: Backend name (e.g. "MiDaS_small"), quality tier (e.g. "fast") or None for the default
+
+    Returns:
+        Name of a registered backend
+
+    Raises:
+        ValueError: If the selection is not a known backend or tier
+        RuntimeError: If no selection is given and DEPTH_BACKEND is invalid
+    """
+    if not selection:
+        return default_depth_backend()
+    name = _match_backend(selection)
+    if name is None:
+        raise ValueError(
+            f"Unknown depth backend '{selection}'. "
+            f"Choose one of {list(DEPTH_BACKENDS)} or a quality tier {list(QUALITY_TIERS)}"
+        )
+    return name
+
+def depth_model_name(name: str) -> str:
+    """Model registry key for a depth backend."""
+    return f"depth:{name}"
+
+def serving_volume_for(food_name: str) -> float:
+    """Standard serving volume in ml for a classifier class."""
+    volume = CLASS_SERVING_VOLUMES.get(food_name)
+    if volume is None:
+        logger.warning(f"'{food_name}' is not a classifier class; assuming a {DEFAULT_SERVING_VOLUME}ml serving")
+        return DEFAULT_SERVING_VOLUME
+    return volume
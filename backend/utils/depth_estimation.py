@@ -4,7 +4,10 @@ import numpy as np
 import cv2
 from PIL import Image
 import logging
-import os
+from typing import Optional
+from utils.image_io import to_working_array
+from utils.depth_backends import DepthBackend, DEPTH_BACKENDS, resolve_depth_backend, depth_model_name
+from services.model_registry import get_model_registry
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -14,24 +17,50 @@ logger = logging.getLogger(__name__)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 logger.info(f"Using device: {device}")
 
-# Load MiDaS model and transforms
-try:
-    midas_model = torch.hub.load("intel-isl/MiDaS", "DPT_Large")
-    midas_model.to(device)
-    midas_model.eval()
-    midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms")
-    transform = midas_transforms.dpt_transform
-except Exception as e:
-    logger.error(f"Model init failed: {e}")
-    raise
-
-def estimate_depth(image: Image.Image) -> np.ndarray:
+def _make_loader(backend: DepthBackend):
+    def load():
+        model = torch.hub.load("intel-isl/MiDaS", backend.hub_model)
+        model.to(device)
+        model.eval()
+        midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms")
+        return model, getattr(midas_transforms, backend.transform_name)
+    return load
+
+# Register every depth network; nothing is downloaded or loaded until first use or warm-up
+for _backend in DEPTH_BACKENDS.values():
+    if _backend.uses_depth:
+        get_model_registry().register(
+            depth_model_name(_backend.name),
+            _make_loader(_backend),
+            description=f"MiDaS {_backend.hub_model} depth estimation"
+        )
+
+def load_depth_backend(name: str):
+    """
+    Return the model and transform for a depth backend, loading them on first use.
+
+    Returns:
+        tuple: (model, transform)
+    """
+    backend = DEPTH_BACKENDS[name]
+    if not backend.uses_depth:
+        raise ValueError(f"Depth backend '{name}' has no model to load")
+    return get_model_registry().get(depth_model_name(name))
+
+def estimate_depth(image, backend: Optional[str] = None) -> Optional[np.ndarray]:
     """
     Estimate relative depth map using MiDaS.
+
+    Accepts a PIL image or an RGB array; arrays already at the working size are used without copying.
+    Returns None for backends that don't estimate depth.
     """
     try:
-        img = np.array(image.convert("RGB"))
-        img_resized = cv2.resize(img, (640, 480))
+        backend = resolve_depth_backend(backend)
+        if not DEPTH_BACKENDS[backend].uses_depth:
+            return None
+        midas_model, transform = load_depth_backend(backend)
+
+        img_resized = to_working_array(image)
 
         input_tensor = transform(img_resized).to(device)
 
@@ -49,13 +78,12 @@ def estimate_depth(image: Image.Image) -> np.ndarray:
         logger.error(f"Depth estimation error: {e}")
         raise
 
-def create_mask(image: Image.Image) -> np.ndarray:
+def create_mask(image) -> np.ndarray:
     """
     Create binary mask using grayscale thresholding.
     """
     try:
-        img = np.asarray(image.convert("RGB"))
-        img_resized = cv2.resize(img, (640, 480))
+        img_resized = to_working_array(image)
 
         gray = cv2.cvtColor(img_resized, cv2.COLOR_RGB2GRAY)
         _, mask = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
@@ -92,13 +120,14 @@ def estimate_volume_from_depth(depth_map: np.ndarray, mask: np.ndarray, referenc
         logger.error(f"Volume estimation error: {e}")
         raise
 
-def generate_masked_image(image: Image.Image, mask: np.ndarray) -> Image.Image:
+def generate_masked_image(image, mask: np.ndarray) -> Image.Image:
     """
     Generate masked overlay visualization.
     """
     try:
-        img_array = np.array(image.convert("RGB"))
-        img_array = cv2.resize(img_array, (mask.shape[1], mask.shape[0]))
+        img_array = image if isinstance(image, np.ndarray) else np.asarray(image.convert("RGB"))
+        if img_array.shape[:2] != mask.shape[:2]:
+            img_array = cv2.resize(img_array, (mask.shape[1], mask.shape[0]))
 
         overlay = np.zeros_like(img_array)
         overlay[mask == 255] = [0, 255, 0]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Export the Keras food classifier to TFLite or ONNX and check the export against Keras.
+
+Examples (run from the backend directory):
+
+    python utils/export_classifier.py --format tflite
+    python utils/export_classifier.py --format tflite --quantize
+    python utils/export_classifier.py --format onnx --quantize
+    python utils/export_classifier.py --check tflite --images path/to/sample/jpgs
+
+Point the API at the exported model with CLASSIFIER_ENGINE=tflite (or onnx).
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.food_classifier import (
+    IMG_SIZE, MODEL_PATH, ONNX_MODEL_PATH, TFLITE_MODEL_PATH, load_keras_model
+)
+from utils.image_io import decode_image, to_classifier_input
+from utils.inference_engine import KerasEngine, load_inference_engine
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def export_tflite(model, output_path: str, quantize: bool = False):
+    """
+    Convert a Keras model to TFLite.
+
+    With ``quantize`` the weights are stored as int8 (dynamic-range quantization);
+    activations stay float so no calibration dataset is needed.
+    """
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    logger.info(f"Wrote TFLite model to {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+
+
+def export_onnx(model, output_path: str, quantize: bool = False):
+    """
+    Convert a Keras model to ONNX with a dynamic batch dimension.
+
+    With ``quantize`` the exported graph is rewritten with ONNX Runtime's
+    dynamic int8 quantization.
+    """
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, IMG_SIZE, IMG_SIZE, 3), tf.float32, name="input"),)
+    float_path = output_path if not quantize else output_path + ".float.onnx"
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=float_path)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(float_path, output_path, weight_type=QuantType.QInt8)
+        os.remove(float_path)
+    logger.info(f"Wrote ONNX model to {output_path} ({os.path.getsize(output_path) / 1e6:.1f} MB)")
+
+
+def load_samples(images_dir: str = None, count: int = 32) -> np.ndarray:
+    """Preprocessed sample batch: JPEGs from ``images_dir`` if given, otherwise seeded random images."""
+    if images_dir:
+        paths = sorted(glob.glob(os.path.join(images_dir, "*.jp*g")))[:count]
+        if paths:
+            samples = []
+            for path in paths:
+                with open(path, "rb") as f:
+                    samples.append(to_classifier_input(decode_image(f.read()), IMG_SIZE))
+            return np.stack(samples)
+        logger.warning(f"No JPEG images found in {images_dir}, using random inputs")
+    rng = np.random.default_rng(0)
+    return rng.random((count, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+
+
+def check_parity(reference, candidate, samples: np.ndarray, batch_size: int = 8) -> dict:
+    """
+    Compare a candidate engine with the reference engine on the same inputs.
+
+    Returns:
+        dict: top-1 agreement rate and max/mean absolute probability difference
+    """
+    expected, actual = [], []
+    for start in range(0, len(samples), batch_size):
+        batch = samples[start:start + batch_size]
+        expected.append(reference.predict(batch))
+        actual.append(candidate.predict(batch))
+    expected = np.concatenate(expected)
+    actual = np.concatenate(actual)
+    diff = np.abs(expected - actual)
+    return {
+        "samples": len(samples),
+        "top1_agreement": float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))),
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the food classifier to TFLite/ONNX")
+    parser.add_argument("--format", choices=["tflite", "onnx"], help="Export format")
+    parser.add_argument("--quantize", action="store_true", help="Apply dynamic int8 weight quantization")
+    parser.add_argument("--output", help="Output path (defaults to the path the API loads from)")
+    parser.add_argument("--check", choices=["tflite", "onnx"], help="Only run the parity check for an existing export")
+    parser.add_argument("--images", help="Directory of sample JPEGs for the parity check")
+    parser.add_argument("--samples", type=int, default=32, help="Number of samples for the parity check")
+    parser.add_argument("--min-agreement", type=float, default=0.98, help="Fail if top-1 agreement is lower")
+    args = parser.parse_args()
+
+    if not args.format and not args.check:
+        parser.error("one of --format or --check is required")
+
+    engine = args.format or args.check
+    default_path = TFLITE_MODEL_PATH if engine == "tflite" else ONNX_MODEL_PATH
+    output_path = args.output or default_path
+
+    keras_model = load_keras_model(MODEL_PATH)
+    if args.format:
+        if args.format == "tflite":
+            export_tflite(keras_model, output_path, args.quantize)
+        else:
+            export_onnx(keras_model, output_path, args.quantize)
+
+    result = check_parity(
+        KerasEngine(keras_model),
+        load_inference_engine(engine, output_path),
+        load_samples(args.images, args.samples),
+    )
+    logger.info(f"Parity check ({engine} vs keras): {result}")
+    if result["top1_agreement"] < args.min_agreement:
+        logger.error(f"Top-1 agreement {result['top1_agreement']:.3f} is below {args.min_agreement}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
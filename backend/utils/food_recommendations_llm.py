@@ -1,9 +1,12 @@
 from fastapi import HTTPException
-import os
+import copy
+import json
 import logging
-from openai import OpenAI
 from typing import List, Dict, Optional, Any
 from dotenv import load_dotenv
+from services.llm_gateway import LLMGateway, get_llm_gateway
+from services.recommendation_cache import RecommendationCache, get_recommendation_cache, make_recommendation_key
+from fastapi.concurrency import run_in_threadpool
 
 # Load environment variables
 load_dotenv()
@@ -13,15 +16,13 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class FoodRecommendationLLM:
-    def __init__(self):
-        """Initialize the OpenAI client"""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+    def __init__(self, gateway: Optional[LLMGateway] = None, cache: Optional[RecommendationCache] = None):
+        """Use the shared LLM gateway (one pooled async OpenAI client per process) and recommendation cache"""
+        self.gateway = gateway or get_llm_gateway()
+        self.cache = cache or get_recommendation_cache()
+        if not self.gateway.configured:
             logger.error("OpenAI API key not found in environment variables")
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-        
-        self.client = OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized")
 
     def _create_recommendation_prompt(
         self,
@@ -94,25 +95,65 @@ Format your response as a JSON object with the following structure:
 
         return prompt
 
-    def get_recommendation(
+    async def get_recommendation(
         self,
         food_name: str,
         food_nutrition: Dict[str, Any],
         user_profile: Optional[Dict[str, Any]] = None,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        portion_grams: Optional[float] = None
     ) -> Dict[str, Any]:
         """
-        Get a food recommendation using the OpenAI API.
+        Get a food recommendation, from the recommendation cache when an
+        equivalent request (same food, portion bucket and profile shape) was
+        answered before, otherwise from the OpenAI API.
         
         Args:
             food_name: Name of the food item
             food_nutrition: Nutritional information of the food
             user_profile: User's health profile and preferences
             context: Additional context for the recommendation
+            portion_grams: Estimated portion size; when given, ``context`` is
+                assumed to describe it and is left out of the cache key
             
         Returns:
             Dictionary containing the recommendation
         """
+        if not self.cache.enabled:
+            return await self._generate_recommendation(food_name, food_nutrition, user_profile, context)
+
+        key = make_recommendation_key(
+            food_name, portion_grams, user_profile, context if portion_grams is None else None
+        )
+        if self.cache.blocking:
+            cached = await run_in_threadpool(self.cache.get, key)
+        else:
+            cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"Recommendation cache hit for {food_name}")
+            return copy.deepcopy(cached)
+
+        recommendation = await self._generate_recommendation(food_name, food_nutrition, user_profile, context)
+        if recommendation.get("parsed") is False:
+            # Unparsed replies default to is_safe=True; don't keep that for the whole TTL
+            logger.warning(f"Not caching unparsed recommendation for {food_name}")
+            return recommendation
+        if self.cache.blocking:
+            await run_in_threadpool(self.cache.set, key, copy.deepcopy(recommendation))
+        else:
+            self.cache.set(key, copy.deepcopy(recommendation))
+        return recommendation
+
+    async def _generate_recommendation(
+        self,
+        food_name: str,
+        food_nutrition: Dict[str, Any],
+        user_profile: Optional[Dict[str, Any]] = None,
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a food recommendation using the OpenAI API.
+        """
         try:
             # Create the prompt
             prompt = self._create_recommendation_prompt(
@@ -124,9 +165,8 @@ Format your response as a JSON object with the following structure:
             
             logger.info(f"Generating recommendation for {food_name}")
             
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo-0125",
+            # Call OpenAI API through the shared gateway
+            recommendation_text = await self.gateway.chat(
                 messages=[
                     {"role": "system", "content": "You are a knowledgeable Indian nutritionist and healthcare assistant."},
                     {"role": "user", "content": prompt}
@@ -135,12 +175,8 @@ Format your response as a JSON object with the following structure:
                 max_tokens=500
             )
             
-            # Extract and parse the response
-            recommendation_text = response.choices[0].message.content
-            
             # Try to parse the JSON response
             try:
-                import json
                 recommendation = json.loads(recommendation_text)
                 logger.info("Successfully parsed recommendation JSON")
                 return recommendation
@@ -150,7 +186,8 @@ Format your response as a JSON object with the following structure:
                     "is_safe": True,
                     "warnings": [],
                     "suggestions": [],
-                    "approval_message": recommendation_text
+                    "approval_message": recommendation_text,
+                    "parsed": False
                 }
                 
         except Exception as e:
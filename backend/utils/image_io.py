@@ -0,0 +1,64 @@
+import io
+import logging
+
+import cv2
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Working resolution (width, height) shared by depth estimation, masking and the overlay
+WORKING_SIZE = (640, 480)
+
+
+def decode_image(contents: bytes) -> np.ndarray:
+    """
+    Decode encoded image bytes (e.g. a JPEG upload) into an RGB uint8 array.
+
+    Args:
+        contents: Raw image file bytes
+
+    Returns:
+        Array of shape (height, width, 3)
+    """
+    with Image.open(io.BytesIO(contents)) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def to_classifier_input(rgb: np.ndarray, size: int) -> np.ndarray:
+    """
+    Resize an RGB array to the classifier's square input and scale it to [0, 1].
+
+    Uses nearest-neighbour resampling, matching what keras ``load_img`` does
+    by default, so predictions are the same as when the image was loaded from disk.
+    """
+    resized = Image.fromarray(rgb).resize((size, size), Image.NEAREST)
+    return np.asarray(resized, dtype=np.float32) / 255.0
+
+
+def to_working_array(image) -> np.ndarray:
+    """
+    Return an RGB array at WORKING_SIZE for a PIL image or an RGB array.
+
+    Arrays that are already at the working size are returned as-is, so a frame
+    resized once can be shared by every stage without further copies.
+    """
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    width, height = WORKING_SIZE
+    if image.shape[:2] == (height, width):
+        return image
+    return cv2.resize(image, WORKING_SIZE)
+
+
+def decode_upload(contents: bytes, classifier_size: int):
+    """
+    Decode an upload once and derive every array the image pipeline needs.
+
+    Returns:
+        tuple: (classifier input of shape (classifier_size, classifier_size, 3),
+                RGB array at WORKING_SIZE for depth estimation and masking)
+    """
+    rgb = decode_image(contents)
+    logger.debug(f"Decoded image of shape {rgb.shape}")
+    return to_classifier_input(rgb, classifier_size), to_working_array(rgb)
@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceEngine:
+    """
+    Common interface for running the food classifier on different runtimes.
+
+    ``predict`` takes a float32 batch of shape (N, height, width, 3) scaled to
+    [0, 1] and returns an (N, num_classes) array of probabilities.
+    """
+
+    name = "base"
+
+    def predict(self, batch: np.ndarray, **kwargs) -> np.ndarray:
+        raise NotImplementedError
+
+
+class KerasEngine(InferenceEngine):
+    """Runs the original Keras model with full TensorFlow."""
+
+    name = "keras"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch: np.ndarray, **kwargs) -> np.ndarray:
+        kwargs.setdefault("verbose", 0)
+        return self.model.predict(batch, **kwargs)
+
+
+def _load_tflite_interpreter(model_path: str, num_threads: Optional[int]):
+    """Prefer the standalone tflite_runtime wheel and fall back to tf.lite."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tensorflow.lite import Interpreter
+        except ImportError:
+            raise ImportError("TFLite engine requires tflite-runtime or tensorflow to be installed")
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteEngine(InferenceEngine):
+    """Runs an exported .tflite model (optionally int8 dynamic-range quantized)."""
+
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.interpreter = _load_tflite_interpreter(model_path, num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        # A TFLite interpreter must not be invoked from several threads at once
+        self._lock = threading.Lock()
+
+    def predict(self, batch: np.ndarray, **kwargs) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=self._input["dtype"])
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                # Re-plan tensors only when the batch size actually changes
+                self.interpreter.resize_tensor_input(self._input["index"], list(batch.shape))
+                self.interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self._input["index"], batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+
+class OnnxEngine(InferenceEngine):
+    """Runs an exported .onnx model with ONNX Runtime on CPU."""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("ONNX engine requires onnxruntime to be installed")
+        self.model_path = model_path
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray, **kwargs) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self._input_name: batch})[0]
+
+
+ENGINES = {
+    "tflite": TFLiteEngine,
+    "onnx": OnnxEngine,
+}
+
+
+def load_inference_engine(engine: str, model_path: str, num_threads: Optional[int] = None) -> InferenceEngine:
+    """
+    Load an exported classifier with the given runtime.
+
+    Args:
+        engine: "tflite" or "onnx"
+        model_path: Path to the exported model file
+        num_threads: Intra-op threads for the runtime (None lets it decide)
+
+    Raises:
+        ValueError: If the engine is unknown
+        FileNotFoundError: If the exported model doesn't exist
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}'. Choose one of {['keras'] + list(ENGINES)}")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"Exported model not found at {model_path}; create it with utils/export_classifier.py"
+        )
+    logger.info(f"Loading {engine} classifier from {model_path}")
+    return ENGINES[engine](model_path, num_threads=num_threads)
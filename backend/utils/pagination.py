@@ -0,0 +1,42 @@
+import base64
+import json
+from typing import Any, List
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        *values: JSON-serializable sort key values (datetimes as ISO strings)
+
+    Returns:
+        URL-safe string to pass back as ``cursor`` for the next page
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    Args:
+        cursor: The cursor string
+        size: Number of sort key values expected
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or has the wrong size
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return values